@@ -3,6 +3,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
 from app.config import get_settings
+from init.postgres_migrations import create_database_if_not_exists
 
 settings = get_settings()
 
@@ -57,6 +58,8 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    create_database_if_not_exists()
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -2,12 +2,21 @@
 # Description: Main FastAPI application
 
 import toml, time, uuid
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 # from fastapi.middleware.cors import CORSMiddleware
 from app.logger import get_logger
 from app.config import get_settings
 from app.routers import main_router
+from app.utils.metrics import get_metrics
+from app.utils.llm import get_llm_gateway
+from app.utils.mongodb import get_async_mongodb_client
+from app.utils.postgres.base import async_engine, async_read_engine
+from app.utils.request import RequestCancelledError
+from app.utils.workload import WorkloadRejectedError
 
 # Get the settings
 settings = get_settings()
@@ -19,6 +28,20 @@ logger = get_logger()
 with open("pyproject.toml", "r") as file:
     config = toml.load(file)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Dependencies and routes without a workload class share this pool
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_MAX_WORKERS
+    logger.info(f"Thread pool limited to {settings.THREADPOOL_MAX_WORKERS} workers")
+    
+    yield
+    
+    await get_llm_gateway().aclose()
+    await get_async_mongodb_client().close()
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
 app = FastAPI(
     title=config["tool"]["poetry"]["name"],
     description=config["tool"]["poetry"]["description"],
@@ -26,6 +49,7 @@ app = FastAPI(
     openapi_url="/api/openapi.json" if settings.ENV == "development" else None,
     docs_url="/api/docs" if settings.ENV == "development" else None,
     redoc_url="/api/redoc" if settings.ENV == "development" else None,
+    lifespan=lifespan,
 )
 
 # Advanced Middleware
@@ -65,7 +89,28 @@ app.add_middleware(LoggingMiddleware)
 # Include routers
 app.include_router(main_router)
 
+@app.exception_handler(RequestCancelledError)
+async def request_cancelled_handler(request: Request, exc: RequestCancelledError):
+    """Answer requests whose upstream work was cancelled (the client is usually gone already)."""
+    if exc.reason == "deadline":
+        return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded."})
+    return JSONResponse(status_code=499, content={"detail": "Client closed request."})
+
+@app.exception_handler(WorkloadRejectedError)
+async def workload_rejected_handler(request: Request, exc: WorkloadRejectedError):
+    """Shed requests whose workload class is saturated instead of queueing them behind it."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Server is busy, please try again later."},
+        headers={"Retry-After": str(settings.WORKLOAD_RETRY_AFTER_SECONDS)},
+    )
+
 @app.get("/health", tags=["Health"], include_in_schema=False)
 def health_check():
     """Health check endpoint for monitoring."""
     return {"status": "ok"}
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics():
+    """In-process metrics (LLM latency, tokens, queueing and errors)."""
+    return get_metrics().snapshot()
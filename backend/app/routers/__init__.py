@@ -1,10 +1,11 @@
 # Path: app/routers/__init__.py
 # Description: This file contains the main router of the application.
 
-from fastapi import APIRouter
-from . import exams, subjects, references, chat, metadata, mindmap
+from fastapi import APIRouter, Depends
+from app.utils.request import bind_request_context
+from . import exams, subjects, references, chat, metadata, mindmap, usage
 
-main_router = APIRouter(prefix="/api/v1")
+main_router = APIRouter(prefix="/api/v1", dependencies=[Depends(bind_request_context)])
 
 main_router.include_router(subjects.router)
 main_router.include_router(exams.router)
@@ -12,3 +13,4 @@ main_router.include_router(references.router)
 main_router.include_router(chat.router)
 main_router.include_router(metadata.router)
 main_router.include_router(mindmap.router)
+main_router.include_router(usage.router)
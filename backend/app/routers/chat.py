@@ -2,15 +2,18 @@
 # Description: This file contains the router for the Chat API.
 
 import uuid, time
-from typing import List, Iterator
+from typing import List, Iterator, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Path, status
 from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session, joinedload
-from openai import OpenAI
 from app.utils.postgres import Reference, Exam, Chunks, get_db
 from app.utils.models import ChatRequest
 from app.utils.mongodb import get_mongodb_client
 from app.utils.milvus import get_milvus_client
+from app.utils.cache import get_context_cache
+from app.utils.llm import get_llm_gateway, LLMUnavailableError
+from app.utils.request import RequestCancelledError, cancellation_scope
+from app.utils.workload import WorkloadRejectedError, get_workload_pool, workload_route
 from app.logger import get_logger
 from app.config import get_settings
 
@@ -26,6 +29,9 @@ mongodb_client = get_mongodb_client()
 # Initialize Milvus client
 milvus_client = get_milvus_client()
 
+# Initialize context cache
+context_cache = get_context_cache()
+
 # Define the prompt template
 CHAT_PROMPT = """You are a helpful study assistant developed by You Education. 
 User has an upcoming exam for {exam_name} of subject {subject_name} and wants to prepare for it.
@@ -39,21 +45,13 @@ Please provide a detailed, accurate response based on the provided context. Incl
 reference materials where relevant.
 """
 
-# Initialize OpenAI client for chat completions
-oai_llm_client = OpenAI(
-    api_key=settings.CHAT_LLM_API_KEY,
-    base_url=settings.CHAT_LLM_BASE_URL,
-)
-
-# Initialize OpenAI client for embeddings
-oai_client = OpenAI(
-    api_key=settings.EMBEDDINGS_API_KEY,
-    base_url=settings.EMBEDDINGS_BASE_URL,
-)
+# Get LLM gateway for chat completions and embeddings
+llm_gateway = get_llm_gateway()
 
 router = APIRouter(
     prefix="/exams/{exam_id}/chat",
-    tags=["Chat"]
+    tags=["Chat"],
+    route_class=workload_route("chat")
 )
 
 @router.post(
@@ -61,11 +59,13 @@ router = APIRouter(
     responses={
         200: {"description": "Chat response streamed successfully"},
         404: {"description": "Not found - Exam or references not found"},
-        500: {"description": "Internal server error"}
+        500: {"description": "Internal server error"},
+        503: {"description": "Service unavailable - Chat model is overloaded"}
     },
-    summary="Chat with references"
+    summary="Chat with references",
+    dependencies=[Depends(cancellation_scope(settings.CHAT_REQUEST_DEADLINE_SECONDS))],
 )
-def chat_with_references(
+async def chat_with_references(
     request: ChatRequest,
     exam_id: uuid.UUID = Path(...),
     db: Session = Depends(get_db)
@@ -73,6 +73,8 @@ def chat_with_references(
     """
     Chat with references for a specific exam.
     
+    Database and context work runs in the thread pool; the wait for the model does not hold a thread.
+    
     Parameters:
         - **request**: ChatRequest containing the message and reference IDs
         - **exam_id**: UUID of the exam the references belong to
@@ -80,91 +82,7 @@ def chat_with_references(
     Returns a streaming response with the AI's reply.
     """
     try:
-        # Check if exam exists and load that with its subject relationship
-        exam = (
-            db.query(Exam)
-            .options(joinedload(Exam.subject))
-            .filter(Exam.id == exam_id)
-            .first()
-        )
-        if not exam:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Exam with ID {exam_id} not found."
-            )
-        
-        # Validate that all references exist and belong to this exam
-        references = (
-            db.query(Reference)
-            .filter(Reference.id.in_(request.reference_ids))
-            .filter(Reference.exam_id == exam_id)
-            .all()
-        )
-        
-        if len(references) != len(request.reference_ids):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="One or more references not found for this exam."
-            )
-        
-        # Get relevant chunks using Milvus similarity search
-        # query_embedding = oai_client.embeddings.create(
-        #     input=request.message,
-        #     model=settings.EMBEDDINGS_MODEL_NAME,
-        # ).data[0].embedding
-        
-        # Search for top 10 most relevant chunks
-        # top_chunks = milvus_client.search_vector(
-        #     query_vector=query_embedding,
-        #     reference_ids=[str(ref.id) for ref in references],
-        #     limit=5,
-        #     threshold=0.4,
-        # )
-        # if not top_chunks:
-        #     logger.warning("No relevant chunks found.")
-        
-        # Create context from relevant chunks
-        # context_parts = []
-        # for result in top_chunks:
-        #     chunk_id = result.entity.id
-        #     # Get reference info
-        #     chunk = db.query(Chunks).filter(Chunks.id == chunk_id).first()
-        #     reference = db.query(Reference).filter(Reference.id == chunk.reference_id).first()
-        
-        #     # Get chunk content from MongoDB
-        #     mongo_chunk = mongodb_client.get_chunk(chunk_id)
-        
-        #     # Format context part
-        #     context_part = (
-        #         f"Reference Type: {reference.file_type}\n"
-        #         f"Reference Name: {reference.file_name}\n"
-        #         f"Reference Content:\n{mongo_chunk.content}\n\n\n"
-        #     )
-        #     context_parts.append(context_part)
-        
-        # FIXME: For now, just get all chunks of all references given by user
-        context_parts = []
-        for ref in references:
-            # Get reference info
-            reference = db.query(Reference).filter(Reference.id == ref.id).first()
-            
-            # Get all chunks for this reference
-            chunks = db.query(Chunks).filter(Chunks.reference_id == reference.id).all()
-            
-            # Get chunk content from MongoDB
-            for chunk in chunks:
-                mongo_chunk = mongodb_client.get_chunk(chunk.id)
-                
-                # Format context part
-                context_part = (
-                    f"Reference Type: {reference.file_type}\n"
-                    f"Reference Name: {reference.file_name}\n"
-                    f"Reference Content:\n{mongo_chunk.content}\n\n\n"
-                )
-                context_parts.append(context_part)
-        
-        # Join all context parts
-        context = "".join(context_parts)
+        exam, context = await get_workload_pool("chat").run(load_chat_context, request, exam_id, db)
         
         # Build conversation history
         messages = []
@@ -193,13 +111,13 @@ def chat_with_references(
         # )
         return JSONResponse(
             content={
-                "response": generate_final_answer(messages),
+                "response": await generate_final_answer(messages),
             },
             status_code=status.HTTP_200_OK
         )
     
-    except HTTPException:
-        # Re-raise HTTP exceptions
+    except (HTTPException, RequestCancelledError, WorkloadRejectedError):
+        # Re-raise HTTP exceptions, cancellations and shed requests
         raise
     
     except Exception as e:
@@ -209,6 +127,132 @@ def chat_with_references(
             detail="Failed to process chat request."
         )
 
+def load_chat_context(request: ChatRequest, exam_id: uuid.UUID, db: Session) -> Tuple[Exam, str]:
+    """
+    Load the exam of a chat and build the context of its references.
+    
+    Args:
+        request: The chat request
+        exam_id: UUID of the exam the references belong to
+        db: Database session
+    
+    Returns:
+        The exam, with its subject loaded, and the context string
+    
+    Raises:
+        HTTPException: If the exam or one of the references does not exist
+    """
+    # Check if exam exists and load that with its subject relationship
+    exam = (
+        db.query(Exam)
+        .options(joinedload(Exam.subject))
+        .filter(Exam.id == exam_id)
+        .first()
+    )
+    if not exam:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Exam with ID {exam_id} not found."
+        )
+    
+    # Validate that all references exist and belong to this exam
+    references = (
+        db.query(Reference)
+        .filter(Reference.id.in_(request.reference_ids))
+        .filter(Reference.exam_id == exam_id)
+        .all()
+    )
+    
+    if len(references) != len(request.reference_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="One or more references not found for this exam."
+        )
+    
+    # Get relevant chunks using Milvus similarity search
+    # query_embedding = llm_gateway.create_embeddings([request.message])[0]
+    
+    # Search for top 10 most relevant chunks
+    # top_chunks = milvus_client.search_vector(
+    #     query_vector=query_embedding,
+    #     reference_ids=[str(ref.id) for ref in references],
+    #     limit=5,
+    #     threshold=0.4,
+    # )
+    # if not top_chunks:
+    #     logger.warning("No relevant chunks found.")
+    
+    # Create context from relevant chunks
+    # context_parts = []
+    # for result in top_chunks:
+    #     chunk_id = result.entity.id
+    #     # Get reference info
+    #     chunk = db.query(Chunks).filter(Chunks.id == chunk_id).first()
+    #     reference = db.query(Reference).filter(Reference.id == chunk.reference_id).first()
+    
+    #     # Get chunk content from MongoDB
+    #     mongo_chunk = mongodb_client.get_chunk(chunk_id)
+    
+    #     # Format context part
+    #     context_part = (
+    #         f"Reference Type: {reference.file_type}\n"
+    #         f"Reference Name: {reference.file_name}\n"
+    #         f"Reference Content:\n{mongo_chunk.content}\n\n\n"
+    #     )
+    #     context_parts.append(context_part)
+    
+    # FIXME: For now, just get all chunks of all references given by user
+    context = context_cache.get_or_build(
+        exam_id=exam_id,
+        reference_ids=[ref.id for ref in references],
+        build=lambda: build_context(references, db),
+    )
+    
+    return exam, context
+
+def build_context(references: List[Reference], db: Session) -> str:
+    """
+    Build the context string from all chunks of the given references.
+    
+    Args:
+        references: References to include in the context
+        db: Database session
+    
+    Returns:
+        Context string with the content of every chunk
+    """
+    references_by_id = {ref.id: ref for ref in references}
+    
+    # Get all chunks of all references in one query
+    chunks = (
+        db.query(Chunks)
+        .filter(Chunks.reference_id.in_(list(references_by_id)))
+        .order_by(Chunks.reference_id, Chunks.chunk_number)
+        .all()
+    )
+    
+    # Get chunk content from MongoDB in one query
+    mongo_chunks = mongodb_client.get_chunks([chunk.id for chunk in chunks])
+    
+    context_parts = []
+    for chunk in chunks:
+        reference = references_by_id[chunk.reference_id]
+        mongo_chunk = mongo_chunks.get(str(chunk.id))
+        if mongo_chunk is None:
+            logger.warning(f"Chunk {chunk.id} not found in MongoDB.")
+            continue
+        
+        # Format context part
+        context_part = (
+            f"Reference Type: {reference.file_type}\n"
+            f"Reference Name: {reference.file_name}\n"
+            f"Reference Content:\n{mongo_chunk.content}\n\n\n"
+        )
+        context_parts.append(context_part)
+    
+    # Join all context parts
+    return "".join(context_parts)
+
 def stream_chat_response(messages: List[dict]) -> Iterator[str]:
     """
     Stream the chat response from the AI model using SSE format.
@@ -220,16 +264,9 @@ def stream_chat_response(messages: List[dict]) -> Iterator[str]:
         Iterator of SSE-formatted text chunks
     """
     try:
-        # Create streaming response from OpenAI
-        response_stream = oai_llm_client.chat.completions.create(
-            model=settings.CHAT_LLM_MODEL_NAME,
-            messages=messages,
-            stream=True
-        )
-        
-        for chunk in response_stream:
-            if chunk.choices and chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
+        # Create streaming response through the LLM gateway
+        for content in llm_gateway.stream_chat_completion("chat", messages):
+            if content:
                 # Format as SSE - ensure content is properly JSON-escaped
                 # to preserve all whitespace characters
                 import json
@@ -246,7 +283,7 @@ def stream_chat_response(messages: List[dict]) -> Iterator[str]:
         yield f"data: Error: {str(e)}\n\n"
         yield "data: [DONE]\n\n"
 
-def generate_final_answer(messages: List[dict]) -> str:
+async def generate_final_answer(messages: List[dict]) -> str:
     """
     Generate the final answer from the AI model.
     
@@ -257,15 +294,21 @@ def generate_final_answer(messages: List[dict]) -> str:
         Final answer string
     """
     try:
-        # Create a single response from OpenAI
-        response = oai_llm_client.chat.completions.create(
-            model=settings.CHAT_LLM_MODEL_NAME,
-            messages=messages,
-            stream=False
-        )
+        # Create a single response through the LLM gateway
+        response = await llm_gateway.achat_completion("chat", messages)
         
         return response.choices[0].message.content
     
+    except RequestCancelledError:
+        raise
+    
+    except LLMUnavailableError as e:
+        logger.error(f"Chat LLM unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Chat model is busy, please try again later."
+        )
+    
     except Exception as e:
         logger.error(f"Error generating final answer: {str(e)}")
         raise HTTPException(
@@ -2,13 +2,15 @@
 # Description: This file contains the routers for the Exams API.
 
 import uuid
+from typing import List, Optional, Tuple
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session, joinedload
-from app.utils.postgres import Exam, Subject, get_db
+from app.utils.postgres import Exam, Subject, InvalidCursorError, get_db, get_read_db, keyset_page
 from app.utils.models import (
     SubjectItem,
     ExamItem,
+    ExamBucketEnum,
     ExamCreateRequest,
     ExamCreateResponse,
     GetExamResponse,
@@ -16,15 +18,19 @@ from app.utils.models import (
     UpdateExamRequest,
     UpdateExamResponse,
 )
+from app.utils.workload import workload_route
 from app.logger import get_logger
+from app.config import get_settings
 from app.utils.mongodb import get_mongodb_client
 
 logger = get_logger()
+settings = get_settings()
 mongodb_client = get_mongodb_client()
 
 router = APIRouter(
     prefix="/exams",
-    tags=["Exams"]
+    tags=["Exams"],
+    route_class=workload_route("crud")
 )
 
 @router.post(
@@ -138,7 +144,7 @@ def create_exam(
 )
 def get_exam(
     exam_id: uuid.UUID,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> GetExamResponse:
     """
     Retrieve an exam by its ID.
@@ -186,68 +192,130 @@ def get_exam(
             detail="Failed to retrieve exam."
         )
 
+def list_exam_bucket(
+    db: Session,
+    bucket: ExamBucketEnum,
+    now: datetime,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[ExamItem], Optional[str]]:
+    """
+    Get one page of the upcoming or previous exams.
+    
+    The split and the ordering are done in SQL on the `exam_datetime` index: upcoming exams
+    ascending from now, previous exams descending from now.
+    
+    Args:
+        db: Database session
+        bucket: The bucket to list
+        now: The instant separating upcoming from previous exams
+        limit: Maximum number of exams in the page
+        cursor: Cursor returned with the bucket's previous page
+    
+    Returns:
+        The exams of the page, and the cursor of the bucket's next page or None
+    
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    query = db.query(
+        Exam.id,
+        Exam.name,
+        Exam.description,
+        Exam.exam_datetime,
+        Exam.total_hours_to_dedicate,
+        Subject.id.label("subject_id"),
+        Subject.name.label("subject_name"),
+        Subject.color.label("subject_color"),
+    ).join(Subject, Exam.subject_id == Subject.id)
+    
+    if bucket == ExamBucketEnum.UPCOMING:
+        query = query.filter(Exam.exam_datetime >= now)
+    else:
+        query = query.filter(Exam.exam_datetime < now)
+    
+    exams, next_cursor = keyset_page(
+        query,
+        [Exam.exam_datetime, Exam.id],
+        limit,
+        cursor,
+        descending=bucket == ExamBucketEnum.PREVIOUS,
+    )
+    
+    exam_items = [
+        ExamItem(
+            id=exam.id,
+            name=exam.name,
+            description=exam.description,
+            exam_datetime=exam.exam_datetime,
+            total_hours_to_dedicate=exam.total_hours_to_dedicate,
+            subject=SubjectItem(
+                id=exam.subject_id,
+                name=exam.subject_name,
+                color=exam.subject_color
+            )
+        )
+        for exam in exams
+    ]
+    return exam_items, next_cursor
+
 @router.get(
     "",
     response_model=ListExamResponse,
     responses={
         200: {"description": "Exams listed successfully"},
+        400: {"description": "Bad request - Invalid cursor or cursor without bucket"},
         500: {"description": "Internal server error - Unexpected error occurred"}
     },
     summary="List all exams",
 )
 def list_exams(
-    db: Session = Depends(get_db)
+    bucket: Optional[ExamBucketEnum] = Query(None, description="Only list upcoming or previous exams"),
+    limit: int = Query(settings.LIST_PAGE_DEFAULT_LIMIT, ge=1, le=settings.LIST_PAGE_MAX_LIMIT, description="Maximum number of exams per bucket"),
+    cursor: Optional[str] = Query(None, description="Next cursor of the bucket's previous page, requires `bucket`"),
+    db: Session = Depends(get_read_db)
 ) -> ListExamResponse:
     """
-    List all exams categorized by upcoming and previous.
+    List exams categorized by upcoming and previous, each bucket paginated independently.
+    
+    - **bucket**: `upcoming` or `previous` to page through one bucket; both first pages if omitted
+    - **limit**: Maximum number of exams per bucket in the page
+    - **cursor**: Cursor of the page, from the bucket's next cursor of the previous one
     
     Returns two arrays:
     - **upcoming_exams**: Exams scheduled for the future, sorted by date (ascending)
     - **previous_exams**: Past exams, sorted by date (descending/most recent first)
     """
     try:
-        # Get all exams from database, joining with subjects
-        exams = (
-            db.query(Exam)
-            .options(joinedload(Exam.subject))
-            .all()
-        )
-
+        if cursor and bucket is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A cursor requires a bucket."
+            )
+        
         now = datetime.now(timezone.utc)
-        upcoming_exam_items = []
-        previous_exam_items = []
-
-        for exam in exams:
-            # Ensure exam_datetime is timezone-aware for comparison
-            exam_dt_aware = exam.exam_datetime
-            
-            # Create ExamItem from the SQLAlchemy model
-            exam_item = ExamItem(
-                id=exam.id,
-                name=exam.name,
-                description=exam.description,
-                exam_datetime=exam.exam_datetime,
-                total_hours_to_dedicate=exam.total_hours_to_dedicate,
-                subject=SubjectItem(
-                    id=exam.subject.id,
-                    name=exam.subject.name,
-                    color=exam.subject.color
-                )
+        response = ListExamResponse(upcoming_exams=[], previous_exams=[])
+        
+        if bucket in (None, ExamBucketEnum.UPCOMING):
+            response.upcoming_exams, response.upcoming_next_cursor = list_exam_bucket(
+                db, ExamBucketEnum.UPCOMING, now, limit, cursor
+            )
+        
+        if bucket in (None, ExamBucketEnum.PREVIOUS):
+            response.previous_exams, response.previous_next_cursor = list_exam_bucket(
+                db, ExamBucketEnum.PREVIOUS, now, limit, cursor
             )
-            
-            # Categorize based on date
-            if exam_dt_aware >= now:
-                upcoming_exam_items.append(exam_item)
-            else:
-                previous_exam_items.append(exam_item)
-
-        # Sort exams by date
-        upcoming_exam_items.sort(key=lambda x: x.exam_datetime)
-        previous_exam_items.sort(key=lambda x: x.exam_datetime, reverse=True)
-
-        return ListExamResponse(
-            upcoming_exams=upcoming_exam_items,
-            previous_exams=previous_exam_items
+        
+        return response
+    
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor."
         )
 
     except Exception as e:
@@ -1,26 +1,49 @@
 # Path: app/routers/metadata.py
 # Description: Router for extracting metadata from YouTube videos and websites
 
-import re
-import requests
-from bs4 import BeautifulSoup
+import httpx
 from fastapi import APIRouter, HTTPException, status
 from app.utils.models import (
     YouTubeMetadataRequest,
     YouTubeMetadataResponse,
+    YouTubeMetadataBatchRequest,
+    YouTubeMetadataBatchItem,
+    YouTubeMetadataBatchResponse,
     WebsiteMetadataRequest,
     WebsiteMetadataResponse,
+    WebsiteMetadataBatchRequest,
+    WebsiteMetadataBatchItem,
+    WebsiteMetadataBatchResponse,
 )
-from app.utils.youtube import get_youtube_client
+from app.utils.youtube import get_youtube_search_service, extract_video_id
+from app.utils.website import get_website_metadata_service
+from app.config import get_settings
+from app.utils.workload import workload_route
 from app.logger import get_logger
 
-# Get logger
+# Get settings and logger
+settings = get_settings()
 logger = get_logger()
 
+# Get cached, quota-aware YouTube service
+youtube_search_service = get_youtube_search_service()
+
+# Get cached website metadata service with a pooled HTTP session
+website_metadata_service = get_website_metadata_service()
+
+def check_batch_size(urls: list) -> None:
+    """Reject batches larger than `METADATA_BATCH_MAX_URLS`."""
+    if len(urls) > settings.METADATA_BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.METADATA_BATCH_MAX_URLS} URLs can be requested at once."
+        )
+
 # Initialize router
 router = APIRouter(
     prefix="/metadata",
-    tags=["Metadata"]
+    tags=["Metadata"],
+    route_class=workload_route("ingestion")
 )
 
 @router.post(
@@ -39,26 +62,14 @@ def extract_youtube_metadata(request: YouTubeMetadataRequest) -> YouTubeMetadata
     
     Parameters:
         - **url**: A valid YouTube video URL
-        
+    
     Returns:
         - **title**: The title of the YouTube video
         - **description**: The description of the YouTube video
     """
     try:
         # Extract video ID from URL
-        video_id = None
-        youtube_patterns = [
-            r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/watch\?v=([^&\s]+)',
-            r'(?:https?:\/\/)?(?:www\.)?youtu\.be\/([^\?\s]+)',
-            r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/embed\/([^\?\s]+)',
-            r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/shorts\/([^\?\s]+)'
-        ]
-        
-        for pattern in youtube_patterns:
-            match = re.search(pattern, request.url)
-            if match:
-                video_id = match.group(1)
-                break
+        video_id = extract_video_id(request.url)
         
         if not video_id:
             raise HTTPException(
@@ -66,30 +77,19 @@ def extract_youtube_metadata(request: YouTubeMetadataRequest) -> YouTubeMetadata
                 detail="Invalid YouTube URL. Could not extract video ID."
             )
         
-        # Get YouTube client
-        youtube = get_youtube_client()
+        # Get video details from the cache or the YouTube API
+        snippet = youtube_search_service.get_video_snippets([video_id]).get(video_id)
         
-        # Call the YouTube API to get video details
-        response = youtube.videos().list(
-            part="snippet",
-            id=video_id
-        ).execute()
-        
-        # Check if any videos were found
-        if not response.get("items"):
+        # Check if the video was found
+        if snippet is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="YouTube video not found or unavailable."
             )
         
-        # Extract title and description
-        snippet = response["items"][0]["snippet"]
-        title = snippet["title"]
-        description = snippet["description"]
-        
         return YouTubeMetadataResponse(
-            title=title,
-            description=description
+            title=snippet["title"],
+            description=snippet["description"]
         )
     
     except HTTPException:
@@ -119,24 +119,17 @@ def extract_website_metadata(request: WebsiteMetadataRequest) -> WebsiteMetadata
     
     Parameters:
         - **url**: A valid website URL
-        
+    
     Returns:
         - **title**: The title of the website
     """
     try:
-        # Make a request to the website
-        response = requests.get(request.url, timeout=10)
-        response.raise_for_status()  # Raise an exception for HTTP errors
+        # Get the metadata from the cache or the website
+        metadata = website_metadata_service.get_metadata(request.url)
         
-        # Parse the HTML using BeautifulSoup
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Get the title
-        title = soup.title.string if soup.title else "Untitled website"
-        
-        return WebsiteMetadataResponse(title=title)
+        return WebsiteMetadataResponse(**metadata)
     
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error requesting website: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -149,3 +142,103 @@ def extract_website_metadata(request: WebsiteMetadataRequest) -> WebsiteMetadata
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to extract website metadata."
         )
+
+@router.post(
+    "/youtube/batch",
+    response_model=YouTubeMetadataBatchResponse,
+    responses={
+        200: {"description": "YouTube metadata extracted, with per-URL errors"},
+        400: {"description": "Bad request - Too many URLs"},
+        500: {"description": "Internal server error"}
+    },
+    summary="Extract metadata from several YouTube videos"
+)
+def extract_youtube_metadata_batch(request: YouTubeMetadataBatchRequest) -> YouTubeMetadataBatchResponse:
+    """
+    Extract title and description from several YouTube video URLs.
+    
+    Video IDs are looked up together, so uncached videos cost one YouTube API call per 50 IDs.
+    URLs that are invalid or whose video is unavailable get an `error` instead of metadata.
+    
+    Parameters:
+        - **urls**: YouTube video URLs
+    
+    Returns:
+        - **results**: The metadata of each URL, in request order
+    """
+    check_batch_size(request.urls)
+    
+    try:
+        video_ids = {url: extract_video_id(url) for url in request.urls}
+        
+        # Get video details from the cache or the YouTube API in as few calls as possible
+        snippets = youtube_search_service.get_video_snippets([video_id for video_id in video_ids.values() if video_id])
+        
+        results = []
+        for url in request.urls:
+            video_id = video_ids[url]
+            if not video_id:
+                results.append(YouTubeMetadataBatchItem(url=url, error="Invalid YouTube URL. Could not extract video ID."))
+            elif video_id not in snippets:
+                results.append(YouTubeMetadataBatchItem(url=url, error="YouTube video not found or unavailable."))
+            else:
+                results.append(YouTubeMetadataBatchItem(
+                    url=url,
+                    title=snippets[video_id]["title"],
+                    description=snippets[video_id]["description"]
+                ))
+        
+        return YouTubeMetadataBatchResponse(results=results)
+    
+    except Exception as e:
+        logger.error(f"Error extracting YouTube metadata batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to extract YouTube metadata."
+        )
+
+@router.post(
+    "/website/batch",
+    response_model=WebsiteMetadataBatchResponse,
+    responses={
+        200: {"description": "Website metadata extracted, with per-URL errors"},
+        400: {"description": "Bad request - Too many URLs"},
+        500: {"description": "Internal server error"}
+    },
+    summary="Extract metadata from several websites"
+)
+def extract_website_metadata_batch(request: WebsiteMetadataBatchRequest) -> WebsiteMetadataBatchResponse:
+    """
+    Extract title, description and favicon from several website URLs.
+    
+    Websites are fetched concurrently over pooled connections and cached by canonical URL. URLs that
+    cannot be accessed get an `error` instead of metadata.
+    
+    Parameters:
+        - **urls**: Website URLs
+    
+    Returns:
+        - **results**: The metadata of each URL, in request order
+    """
+    check_batch_size(request.urls)
+    
+    try:
+        metadata = website_metadata_service.get_metadata_batch(request.urls)
+        
+        results = []
+        for url in request.urls:
+            if isinstance(metadata[url], httpx.HTTPError):
+                results.append(WebsiteMetadataBatchItem(url=url, error="Failed to access the website."))
+            elif isinstance(metadata[url], Exception):
+                results.append(WebsiteMetadataBatchItem(url=url, error="Failed to extract website metadata."))
+            else:
+                results.append(WebsiteMetadataBatchItem(url=url, **metadata[url]))
+        
+        return WebsiteMetadataBatchResponse(results=results)
+    
+    except Exception as e:
+        logger.error(f"Error extracting website metadata batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to extract website metadata."
+        )
@@ -1,14 +1,28 @@
 # Path: app/routers/mindmap.py
 # Description: This file contains the routers for the Mindmap API.
 
-import uuid, json
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session
-from openai import OpenAI
-from app.utils.postgres import Reference, Exam, Chunks, get_db
-from app.utils.mongodb import get_mongodb_client
-from app.utils.youtube import get_youtube_client
+import uuid, json, time, asyncio
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.postgres import Reference, Exam, get_async_db
+from app.utils.mongodb import get_async_mongodb_client
+from app.utils.mindmap import (
+    get_mindmap_job_manager,
+    get_leaf_notes,
+    compute_etag,
+    etag_matches,
+    aload_exam_fingerprint,
+    aload_mindmap,
+    load_subtree,
+    load_node,
+)
+from app.utils.models import MindmapJobResponse, MindmapNodeNotesResponse
+from app.utils.llm import LLMUnavailableError
+from app.utils.request import RequestCancelledError, cancellation_scope
+from app.utils.workload import WorkloadRejectedError, get_workload_pool, workload_route
 from app.logger import get_logger
 from app.config import get_settings
 
@@ -19,361 +33,455 @@ logger = get_logger()
 # Get app config
 settings = get_settings()
 
-# Initialize OpenAI client
-oai_llm_client = OpenAI(
-    api_key=settings.MINDMAP_LLM_API_KEY,
-    base_url=settings.MINDMAP_LLM_BASE_URL,
-)
-
-# Initialize MongoDB client
-mongodb_client = get_mongodb_client()
+# Initialize async MongoDB client
+async_mongodb_client = get_async_mongodb_client()
 
-# Get YouTube client
-youtube_client = get_youtube_client()
+# Get background mindmap job manager
+mindmap_job_manager = get_mindmap_job_manager()
 
 # Initialize FastAPI router
 router = APIRouter(
     prefix="/exams/{exam_id}/mindmap",
-    tags=["Mindmap"]
+    tags=["Mindmap"],
+    route_class=workload_route("mindmap")
 )
 
-MINDMAP_GENERATOR_PROMPT = """You are an expert educational content organizer. Your task is to create a hierarchical mindmap based on the provided educational content chunks.
-
-The mindmap should have the following structure:
-1. A main topic derived from the overall content
-2. Subtopics that represent key concepts or areas
-3. Further subdivisions as needed to create a comprehensive learning path
-
-IMPORTANT: For the smallest subdivisions (leaf nodes), mark them with "is_last_subtopic": true. These leaf nodes will be used to search YouTube for relevant educational videos.
-
-Format your response as a JSON object following this structure:
-{
-    "title": "Main Topic",
-    "is_last_subtopic": false,
-    "subtopics": [
-        {
-        "title": "Subtopic 1",
-        "is_last_subtopic": false,
-        "subtopics": [
-            {
-                "title": "Specific Concept 1",
-                "is_last_subtopic": true
-            }
-        ]
-        }
-    ]
-}
-
-Make sure titles are concise, clear, and would work well as YouTube search terms.
-"""
-
-# MINDMAP_REFINER_PROMPT = """You are an expert educational content curator. You have been provided with:
-# 1. An initial mindmap structure
-# 2. YouTube video results for each leaf node in the mindmap
-
-# Your task is to refine the mindmap and integrate the most relevant YouTube resources for each leaf node.
-
-# For each leaf node (where "is_last_subtopic" is true), select up to 3 of the most relevant YouTube videos and integrate them into the final mindmap.
-
-# Return your response as a JSON object following this structure:
-# {
-#     "title": "Main Topic",
-#     "is_last_subtopic": false,
-#     "subtopics": [
-#         {
-#         "title": "Subtopic 1",
-#         "is_last_subtopic": false,
-#         "subtopics": [
-#             {
-#             "title": "Specific Concept 1",
-#             "is_last_subtopic": true,
-#             "resources": [
-#                 {
-#                     "type": "youtube",
-#                     "data": {
-#                         "url": "https://youtu.be/video-id",
-#                         "title": "Video Title",
-#                         "description": "Brief description of the video"
-#                     }
-#                 }
-#             ]
-#             }
-#         ]
-#         }
-#     ]
-# }
-
-# Ensure the integrated resources are highly relevant to the specific leaf node topics.
-# """
-
-MINDMAP_REFINER_PROMPT = """You are an expert educational content curator. You have been provided with:
-1. An initial mindmap structure
-2. YouTube video results for each leaf node in the mindmap
-3. Notes of the user
-
-Your task is to refine the mindmap and integrate the most relevant YouTube resources for each leaf node. Also add short notes for each leaf node.
-
-For each leaf node (where "is_last_subtopic" is true), select up to 3 of the most relevant YouTube videos and integrate them into the final mindmap.
-
-Return your response as a JSON object following this structure:
-{
-    "title": "Main Topic",
-    "is_last_subtopic": false,
-    "subtopics": [
-        {
-        "title": "Subtopic 1",
-        "is_last_subtopic": false,
-        "subtopics": [
-            {
-            "title": "Specific Concept 1",
-            "is_last_subtopic": true,
-            "resources": [
-                {
-                    "type": "youtube",
-                    "data": {
-                        "url": "https://youtu.be/video-id",
-                        "title": "Video Title",
-                        "description": "Brief description of the video"
-                    }
-                },
-                {
-                    "type": "notes",
-                    "data": "...multiline notes..."
-                }
-            ]
-            }
-        ]
-        }
-    ]
-}
-
-Ensure the integrated resources are highly relevant to the specific leaf node topics.
-"""
-
-def search_youtube(query: str, max_results: int = 3) -> List[Dict[str, Any]]:
+def build_job_response(job: dict) -> MindmapJobResponse:
     """
-    Search YouTube for videos related to the given query
+    Build the API response of a mindmap job document
     
     Args:
-        query: The search term
-        max_results: Maximum number of results to return
+        job: The job document from MongoDB
         
     Returns:
-        List of video information dictionaries
+        The job response
     """
-    request = youtube_client.search().list(
-        q=query,
-        part="snippet",
-        type="video",
-        maxResults=max_results
+    return MindmapJobResponse(
+        job_id=job["_id"],
+        exam_id=job["exam_id"],
+        status=job["status"],
+        stage=job["stage"],
+        completed=job.get("completed"),
+        total=job.get("total"),
+        error=job.get("error"),
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        finished_at=job.get("finished_at"),
     )
+
+@router.get(
+    "",
+    # response_model=MindmapResponse,
+    response_model=dict,
+    responses={
+        200: {"description": "Mindmap retrieved successfully"},
+        202: {"description": "Mindmap generation job started or already running"},
+        304: {"description": "Mindmap not modified since the given ETag"},
+        404: {"description": "Not found - Exam not found or no references available"},
+        500: {"description": "Internal server error"}
+    },
+    summary="Get or generate a mindmap for an exam",
+)
+
+async def get_mindmap(
+    response: Response,
+    exam_id: uuid.UUID = Path(...),
+    refresh: bool = Query(False, description="Whether to generate a new mindmap"),
+    rebuild: bool = Query(False, description="Whether to regenerate the mindmap from scratch instead of updating it"),
+    no_cache: bool = Query(False, description="Whether to call the model even for prompts it has answered before"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get or generate a mindmap for a specific exam.
+    
+    Parameters:
+        - **exam_id**: UUID of the exam
+        - **refresh**: Whether to force regeneration of the mindmap (default: False)
+        - **rebuild**: Whether to regenerate from scratch; otherwise a refresh only processes the references added or removed since the last generation (default: False)
+        - **no_cache**: Whether to bypass the LLM response cache, e.g. to get a different mindmap for unchanged content (default: False)
     
-    response = request.execute()
+    Returns the mindmap structure with resources for study. If the mindmap has to be generated,
+    responds with 202 and the generation job instead; poll `/jobs/{job_id}` until it completes.
+    Concurrent requests for the same exam share one job.
     
-    results = []
-    for item in response.get("items", []):
-        video_id = item["id"]["videoId"]
-        title = item["snippet"]["title"]
-        description = item["snippet"]["description"]
+    A stored mindmap comes with an `ETag`; send it back in `If-None-Match` to get a 304 while it is
+    unchanged. If the exam's references changed since it was built, `X-Mindmap-Stale` is `true`. With
+    the "regenerate" stale policy, an update job is also started and its ID sent in `X-Mindmap-Job-Id`.
+    """
+    try:
+        # Check if exam exists
+        exam = (await db.execute(select(Exam.id).where(Exam.id == exam_id))).first()
+        
+        if not exam:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Exam with ID {exam_id} not found."
+            )
+        
+        # If not refresh, try to get existing mindmap from MongoDB
+        if not refresh and not rebuild:
+            existing_mindmap = await async_mongodb_client.get_mindmap(exam_id)
+            if existing_mindmap:
+                # Mindmaps saved before fingerprinting have no fingerprint and count as stale
+                stale = existing_mindmap.get("fingerprint") != await aload_exam_fingerprint(db, exam_id)
+                if not existing_mindmap.get("etag"):
+                    existing_mindmap = await aload_mindmap(exam_id, existing_mindmap)
+                    existing_mindmap["etag"] = compute_etag(existing_mindmap["mindmap"])
+                
+                headers = {
+                    "ETag": existing_mindmap["etag"],
+                    "Cache-Control": "no-cache",
+                    "X-Mindmap-Stale": "true" if stale else "false",
+                }
+                
+                if stale and settings.MINDMAP_STALE_POLICY == "regenerate":
+                    # Serve the stale mindmap while it is updated in the background
+                    job, _ = await get_workload_pool("mindmap").run(mindmap_job_manager.submit, exam_id)
+                    headers["X-Mindmap-Job-Id"] = job["_id"]
+                
+                if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+                    logger.info(f"Mindmap for exam {exam_id} not modified")
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+                
+                logger.info(f"Returning existing mindmap for exam {exam_id}")
+                response.headers.update(headers)
+                return (await aload_mindmap(exam_id, existing_mindmap))["mindmap"]
+        
+        # A mindmap can only be generated from references
+        reference = (await db.execute(select(Reference.id).where(Reference.exam_id == exam_id).limit(1))).first()
+        
+        if not reference:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No references found for exam {exam_id}."
+            )
         
-        results.append({
-            "url": f"https://youtu.be/{video_id}",
-            "title": title,
-            "description": description
-        })
+        # Start a generation job, or join the one already running for this exam
+        job, _ = await get_workload_pool("mindmap").run(
+            mindmap_job_manager.submit,
+            exam_id,
+            rebuild=rebuild,
+            bypass_cache=no_cache,
+        )
+            
+        response.status_code = status.HTTP_202_ACCEPTED
+        return build_job_response(job).model_dump(mode="json")
+            
+    except (HTTPException, WorkloadRejectedError):
+        # Re-raise HTTP exceptions and shed requests
+        raise
     
-    return results
+    except Exception as e:
+        logger.error(f"Error in mindmap generation: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process mindmap request: {str(e)}"
+        )
 
-def extract_leaf_nodes(mindmap: Dict[str, Any]) -> List[Dict[str, Any]]:
+async def stream_job_events(job: dict, events: "asyncio.Queue[dict]") -> AsyncIterator[str]:
     """
-    Extract all leaf nodes from the mindmap
+    Stream the events of a mindmap job as newline-delimited JSON
+    
+    Waiting for events does not hold a thread, so idle streams cost nothing but their connection.
     
     Args:
-        mindmap: The mindmap structure
-        
-    Returns:
-        List of leaf nodes with their paths
+        job: The job document
+        events: Queue the job's worker thread puts its events on through the event loop
+    
+    Yields:
+        One JSON event per line, ending with a "done" or "error" event
     """
-    leaf_nodes = []
-    
-    def traverse(node, path=[]):
-        if node.get("is_last_subtopic", False):
-            leaf_nodes.append({
-                "node": node,
-                "path": path + [node["title"]]
-            })
-        else:
-            for subtopic in node.get("subtopics", []):
-                traverse(subtopic, path + [node["title"]])
-    
-    traverse(mindmap)
-    return leaf_nodes
+    yield json.dumps({"event": "job", **build_job_response(job).model_dump(mode="json")}) + "\n"
+    
+    # The job never outlives its deadline, stop waiting for a job whose worker died
+    give_up_at = time.monotonic() + settings.MINDMAP_JOB_DEADLINE_SECONDS + settings.MINDMAP_JOB_ABANDON_GRACE_SECONDS
+    while True:
+        try:
+            event = await asyncio.wait_for(events.get(), timeout=settings.MINDMAP_STREAM_KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            if time.monotonic() > give_up_at:
+                yield json.dumps({"event": "error", "detail": "Mindmap generation was interrupted."}) + "\n"
+                return
+            
+            # Keep proxies from closing an idle connection
+            yield json.dumps({"event": "keepalive"}) + "\n"
+            continue
+        
+        yield json.dumps(event, default=str) + "\n"
+        if event["event"] in ("done", "error"):
+            return
 
-def find_videos_for_leaf_nodes(leaf_nodes: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+async def check_mindmap_sources(exam_id: uuid.UUID, db: AsyncSession) -> None:
     """
-    Search YouTube for videos for each leaf node
+    Check that an exam exists and has references to build a mindmap from
     
     Args:
-        leaf_nodes: List of leaf nodes
-        
-    Returns:
-        Dictionary mapping paths to video results
+        exam_id: UUID of the exam
+        db: Async database session
+    
+    Raises:
+        HTTPException: If the exam does not exist or has no references
     """
-    results = {}
+    exam = (await db.execute(select(Exam.id).where(Exam.id == exam_id))).first()
     
-    for leaf in leaf_nodes:
-        node_title = leaf["node"]["title"]
-        path_str = " > ".join(leaf["path"])
-        
-        logger.info(f"Searching YouTube for: {node_title}")
-        videos = search_youtube(node_title)
-        
-        results[path_str] = videos
+    if not exam:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Exam with ID {exam_id} not found."
+        )
+    
+    reference = (await db.execute(select(Reference.id).where(Reference.exam_id == exam_id).limit(1))).first()
     
-    return results
+    if not reference:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No references found for exam {exam_id}."
+        )
 
 @router.get(
-    "",
-    # response_model=MindmapResponse,
-    response_model=dict,
+    "/stream",
     responses={
-        200: {"description": "Mindmap retrieved or generated successfully"},
+        200: {"description": "Mindmap generation events streamed as newline-delimited JSON"},
+        202: {"description": "Mindmap generation job already running"},
         404: {"description": "Not found - Exam not found or no references available"},
         500: {"description": "Internal server error"}
     },
-    summary="Get or generate a mindmap for an exam"
+    summary="Generate a mindmap for an exam and stream it as it is built",
 )
-
-def get_mindmap(
+async def stream_mindmap(
     exam_id: uuid.UUID = Path(...),
-    refresh: bool = Query(False, description="Whether to generate a new mindmap"),
-    db: Session = Depends(get_db)
+    rebuild: bool = Query(False, description="Whether to regenerate the mindmap from scratch instead of updating it"),
+    no_cache: bool = Query(False, description="Whether to call the model even for prompts it has answered before"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get or generate a mindmap for a specific exam.
+    Generate a mindmap for a specific exam and stream it as newline-delimited JSON events.
     
     Parameters:
         - **exam_id**: UUID of the exam
-        - **refresh**: Whether to force regeneration of the mindmap (default: False)
+        - **rebuild**: Whether to regenerate from scratch instead of only processing changed references (default: False)
+        - **no_cache**: Whether to bypass the LLM response cache (default: False)
     
-    Returns the mindmap structure with resources for study.
+    Events, one JSON object per line with its name in `event`:
+        - **job**: The generation job, first
+        - **stage**: The job entered a stage or made progress within one
+        - **outline**: A top-level subtopic of the outline, as soon as the model has written it
+        - **skeleton**: The whole outline, before videos are searched
+        - **leaf**: The first videos found for the leaf at `node_path`
+        - **subtree**: The final top-level subtopic at `index`, with its resources
+        - **done**: The final mindmap, last
+        - **error**: Generation failed, last
+    
+    Disconnecting does not stop the job; its result is saved as usual. If a job is already running
+    for the exam, responds with 202 and that job instead; poll `/jobs/{job_id}` until it completes.
     """
     try:
-        # Check if exam exists and load related subject
-        exam = (
-            db.query(Exam)
-            .filter(Exam.id == exam_id)
-            .first()
+        await check_mindmap_sources(exam_id, db)
+        
+        # Events are put from the job's worker thread
+        loop = asyncio.get_running_loop()
+        events: "asyncio.Queue[dict]" = asyncio.Queue()
+        job, started = await get_workload_pool("mindmap").run(
+            mindmap_job_manager.submit,
+            exam_id,
+            rebuild=rebuild,
+            listener=lambda event: loop.call_soon_threadsafe(events.put_nowait, event),
+            bypass_cache=no_cache,
         )
         
-        if not exam:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Exam with ID {exam_id} not found."
+        if not started:
+            # Events of a job are only delivered to the request that started it
+            return Response(
+                content=build_job_response(job).model_dump_json(),
+                status_code=status.HTTP_202_ACCEPTED,
+                media_type="application/json",
             )
         
-        # If not refresh, try to get existing mindmap from MongoDB
-        if not refresh:
-            existing_mindmap = mongodb_client.get_mindmap(exam_id)
-            if existing_mindmap:
-                logger.info(f"Returning existing mindmap for exam {exam_id}")
-                return existing_mindmap["mindmap"]
-        
-        # If we need to generate a new mindmap, first get all references for this exam
-        references = (
-            db.query(Reference)
-            .filter(Reference.exam_id == exam_id)
-            .all()
+        return StreamingResponse(stream_job_events(job, events), media_type="application/x-ndjson")
+    
+    except (HTTPException, WorkloadRejectedError):
+        # Re-raise HTTP exceptions and shed requests
+        raise
+    
+    except Exception as e:
+        logger.error(f"Error in mindmap streaming: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process mindmap request: {str(e)}"
         )
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=MindmapJobResponse,
+    responses={
+        200: {"description": "Mindmap job retrieved successfully"},
+        404: {"description": "Not found - Job not found"},
+        500: {"description": "Internal server error"}
+    },
+    summary="Get the progress of a mindmap generation job",
+)
+async def get_mindmap_job(
+    exam_id: uuid.UUID = Path(...),
+    job_id: str = Path(...),
+) -> MindmapJobResponse:
+    """
+    Get the status and current stage of a mindmap generation job.
+    
+    Parameters:
+        - **exam_id**: UUID of the exam
+        - **job_id**: ID of the job returned by the mindmap endpoint
+    
+    Once the status is `completed`, the mindmap endpoint returns the new mindmap.
+    """
+    try:
+        job = await mindmap_job_manager.get_job(job_id)
         
-        if not references:
+        if not job or job["exam_id"] != str(exam_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No references found for exam {exam_id}."
+                detail=f"Mindmap job with ID {job_id} not found."
             )
         
-        # Get all chunks for all references in order
-        all_chunks_content = []
-        for reference in references:
-            chunks = (
-                db.query(Chunks)
-                .filter(Chunks.reference_id == reference.id)
-                .order_by(Chunks.chunk_number)
-                .all()
+        return build_job_response(job)
+    
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    
+    except Exception as e:
+        logger.error(f"Error retrieving mindmap job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve mindmap job."
+        )
+
+@router.get(
+    "/nodes",
+    response_model=dict,
+    responses={
+        200: {"description": "Mindmap nodes retrieved successfully"},
+        404: {"description": "Not found - Mindmap or node not found"},
+        500: {"description": "Internal server error"}
+    },
+    summary="Get the top levels of a mindmap or of one of its subtrees",
+)
+async def get_mindmap_nodes(
+    exam_id: uuid.UUID = Path(...),
+    path: str = Query("", description="Dot-separated subtopic indices of the subtree's root, e.g. 0.2; empty for the whole mindmap"),
+    depth: int = Query(settings.MINDMAP_NODES_DEFAULT_DEPTH, ge=0, description="Number of levels to return below the subtree's root"),
+):
+    """
+    Get a subtree of the exam's mindmap, down to a number of levels, for expanding nodes lazily.
+    
+    Parameters:
+        - **exam_id**: UUID of the exam
+        - **path**: Dot-separated subtopic indices of the subtree's root (default: the whole mindmap)
+        - **depth**: Number of levels to return below the subtree's root
+    
+    Every node carries its `path`. Nodes with subtopics carry their number in `child_count`; their
+    `subtopics` are empty when they lie below the requested depth, fetch them with their `path`.
+    """
+    try:
+        existing_mindmap = await async_mongodb_client.get_mindmap(exam_id)
+        if not existing_mindmap:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Mindmap for exam {exam_id} not found."
             )
-            
-            for chunk in chunks:
-                # Get chunk content from MongoDB
-                try:
-                    chunk_doc = mongodb_client.get_chunk(chunk.id)
-                    all_chunks_content.append(chunk_doc.content)
-                except Exception as e:
-                    logger.error(f"Error getting chunk content: {str(e)}")
         
-        if not all_chunks_content:
+        subtree = await load_subtree(exam_id, existing_mindmap, path, depth)
+        if subtree is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No chunk content found for exam {exam_id}."
+                detail=f"Mindmap node {path} not found."
             )
         
-        # Generate initial mindmap using the LLM
-        logger.info(f"Generating initial mindmap for exam {exam_id}")
-        content_for_llm = "\n\n".join(all_chunks_content)
-        
-        try:
-            response = oai_llm_client.chat.completions.create(
-                model=settings.MINDMAP_LLM_MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": MINDMAP_GENERATOR_PROMPT},
-                    {"role": "user", "content": f"Generate a mindmap for the following content:\n\n{content_for_llm}"}
-                ],
-                response_format={"type": "json_object"}
+        return subtree
+    
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    
+    except Exception as e:
+        logger.error(f"Error retrieving mindmap nodes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve mindmap nodes."
+        )
+
+@router.get(
+    "/nodes/{node_path}/notes",
+    response_model=MindmapNodeNotesResponse,
+    responses={
+        200: {"description": "Notes retrieved or generated successfully"},
+        400: {"description": "Bad request - Node is not a leaf"},
+        404: {"description": "Not found - Mindmap or node not found"},
+        500: {"description": "Internal server error"},
+        503: {"description": "Service unavailable - Mindmap model is overloaded"}
+    },
+    summary="Get or generate the notes of a mindmap leaf",
+    dependencies=[Depends(cancellation_scope(settings.MINDMAP_NOTES_REQUEST_DEADLINE_SECONDS))],
+)
+async def get_mindmap_node_notes(
+    exam_id: uuid.UUID = Path(...),
+    node_path: str = Path(..., description="Dot-separated subtopic indices from the root, e.g. 0.2.1"),
+    db: AsyncSession = Depends(get_async_db)
+) -> MindmapNodeNotesResponse:
+    """
+    Get the notes of a leaf of the exam's mindmap.
+    
+    Parameters:
+        - **exam_id**: UUID of the exam
+        - **node_path**: Dot-separated subtopic indices from the root down to the leaf
+    
+    Notes are generated from the chunks most related to the leaf on first request and cached.
+    """
+    try:
+        existing_mindmap = await async_mongodb_client.get_mindmap(exam_id)
+        if not existing_mindmap:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Mindmap for exam {exam_id} not found."
             )
-            
-            # Parse the initial mindmap
-            initial_mindmap = response.choices[0].message.content
-            initial_mindmap = json.loads(initial_mindmap) if isinstance(initial_mindmap, str) else initial_mindmap
-            
-            # Extract leaf nodes and search YouTube for each
-            leaf_nodes = extract_leaf_nodes(initial_mindmap)
-            video_results = find_videos_for_leaf_nodes(leaf_nodes)
-            
-            # Refine the mindmap with video results
-            logger.info(f"Refining mindmap with video results for exam {exam_id}")
-            
-            refine_response = oai_llm_client.chat.completions.create(
-                model=settings.MINDMAP_LLM_MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": MINDMAP_REFINER_PROMPT},
-                    # {"role": "user", "content": f"Initial mindmap:\n{initial_mindmap}\n\nVideo results:\n{video_results}"}
-                    {"role": "user", "content": f"Initial mindmap:\n{initial_mindmap}\n\nVideo results:\n{video_results}\n\nNotes:\n{content_for_llm}"}
-                ],
-                response_format={"type": "json_object"}
+        
+        resolved = await load_node(exam_id, existing_mindmap, node_path)
+        if resolved is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Mindmap node {node_path} not found."
             )
-            
-            # Parse the final mindmap
-            final_mindmap = refine_response.choices[0].message.content
-            final_mindmap = json.loads(final_mindmap) if isinstance(final_mindmap, str) else final_mindmap
-            
-            # Save to MongoDB for future use
-            mongodb_client.insert_mindmap(exam_id, final_mindmap)
-            
-            return final_mindmap
-            
-        except Exception as e:
-            logger.error(f"Error generating mindmap: {str(e)}")
+        
+        node, titles = resolved
+        if not node.get("is_last_subtopic", False):
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to generate mindmap: {str(e)}"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Mindmap node {node_path} is not a leaf."
             )
-            
-    except HTTPException:
-        # Re-raise HTTP exceptions
+        
+        notes, cached = await get_leaf_notes(db, exam_id, node, titles)
+        
+        return MindmapNodeNotesResponse(
+            node_path=node_path,
+            title=node["title"],
+            notes=notes,
+            cached=cached,
+        )
+    
+    except (HTTPException, RequestCancelledError, WorkloadRejectedError):
+        # Re-raise HTTP exceptions, cancellations and shed requests
         raise
     
+    except LLMUnavailableError as e:
+        logger.error(f"Mindmap LLM unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Mindmap model is busy, please try again later."
+        )
+    
     except Exception as e:
-        logger.error(f"Error in mindmap generation: {str(e)}")
+        logger.error(f"Error retrieving mindmap notes: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to process mindmap request: {str(e)}"
+            detail="Failed to retrieve mindmap notes."
         )
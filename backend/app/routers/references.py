@@ -2,9 +2,12 @@
 # Description: This file contains the routers for the References API.
 
 import io, uuid, re, tempfile
-from openai import OpenAI
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Path, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Path, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from langchain_core.documents import Document
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_community.document_loaders import (
     TextLoader,
@@ -16,7 +19,16 @@ from langchain_community.document_loaders import (
     # UnstructuredURLLoader,
     SeleniumURLLoader,
 )
-from app.utils.postgres import Reference, Exam, Chunks, get_db
+from app.utils.postgres import (
+    Reference,
+    Exam,
+    Chunks,
+    InvalidCursorError,
+    get_db,
+    get_read_db,
+    get_async_db,
+    keyset_page,
+)
 from app.utils.models import (
     ReferencesTypeEnum,
     ReferenceCreateRequest,
@@ -30,7 +42,10 @@ from app.utils.models import (
 )
 from app.utils.minio.client import get_minio_client
 from app.utils.milvus import get_milvus_client
-from app.utils.mongodb import get_mongodb_client
+from app.utils.mongodb import get_mongodb_client, get_async_mongodb_client
+from app.utils.cache import get_context_cache
+from app.utils.llm import get_llm_gateway
+from app.utils.workload import WorkloadRejectedError, get_workload_pool, workload_route
 from app.logger import get_logger
 from app.config import get_settings
 
@@ -43,22 +58,24 @@ settings = get_settings()
 # Initialize MinIO client
 minio_client = get_minio_client()
 
-# Initialize OpenAI client for generating embeddings
-oai_emb_client = OpenAI(
-    api_key=settings.EMBEDDINGS_API_KEY,
-    base_url=settings.EMBEDDINGS_BASE_URL,
-)
+# Get LLM gateway for generating embeddings
+llm_gateway = get_llm_gateway()
 
-# Initialize MongoDB client
+# Initialize MongoDB clients
 mongodb_client = get_mongodb_client()
+async_mongodb_client = get_async_mongodb_client()
 
 # Initialize Milvus client
 milvus_client = get_milvus_client()
 
+# Initialize context cache
+context_cache = get_context_cache()
+
 # Initialize FastAPI router
 router = APIRouter(
     prefix="/exams/{exam_id}/references",
-    tags=["References"]
+    tags=["References"],
+    route_class=workload_route("crud")
 )
 
 # Content type mapping for file uploads
@@ -111,6 +128,97 @@ def detect_url_type(url: str) -> ReferencesTypeEnum:
     # If no match, assume it's a regular website
     return ReferencesTypeEnum.WEBSITE_URL
 
+def load_file_documents(file_type: ReferencesTypeEnum, content: bytes) -> List[Document]:
+    """
+    Parse an uploaded file with the document loader of its type.
+    
+    Args:
+        file_type: Type of the file
+        content: Content of the file
+    
+    Returns:
+        The parsed documents, one per chunk
+    """
+    loader_class = LANGCHAIN_LOADERS_MAPPING[file_type]
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        tmp.write(content)
+        tmp.flush()
+        loader: BaseLoader = loader_class(tmp.name)
+    return loader.load()
+
+def load_url_documents(url_type: ReferencesTypeEnum, url: str) -> List[Document]:
+    """
+    Scrape a website or fetch the transcript of a YouTube video.
+    
+    Args:
+        url_type: Type of the URL
+        url: The URL
+    
+    Returns:
+        The scraped documents, one per chunk
+    """
+    loader_class = LANGCHAIN_LOADERS_MAPPING[url_type]
+    if url_type == ReferencesTypeEnum.WEBSITE_URL:
+        loader: BaseLoader = loader_class([url])
+    elif url_type == ReferencesTypeEnum.YT_VIDEO_URL:
+        if 'youtu.be' in url:
+            video_id = url.split('/')[-1].split('?')[0]
+        elif 'youtube.com/shorts' in url:
+            video_id = url.split('/')[-1].split('?')[0]
+        else:
+            video_id = re.search(r"(?<=v=)[^&]+", str(url)).group(0)
+        loader: BaseLoader = loader_class(video_id)
+    return loader.load()
+
+def index_chunk(chunk_id: str, reference_id: str, content: str) -> None:
+    """
+    Embed a chunk and insert its vector into Milvus.
+    
+    Args:
+        chunk_id: ID of the chunk
+        reference_id: ID of the chunk's reference
+        content: Content of the chunk
+    """
+    embedding = llm_gateway.create_embeddings([content])[0]
+    milvus_client.insert_vector(MilvusChunkRecord(
+        chunk_id=chunk_id,
+        reference_id=reference_id,
+        embedding=embedding,
+    ))
+
+async def store_chunks(db: AsyncSession, reference: Reference, documents: List[Document]) -> None:
+    """
+    Store the chunks of a new reference in PostgreSQL, MongoDB and Milvus.
+    
+    Blocking SDK calls run on the ingestion workload's threads.
+    
+    Args:
+        db: Async database session
+        reference: The reference, already committed
+        documents: The parsed documents, one per chunk
+    """
+    for i, chunk in enumerate(documents):
+        # Create postgres record
+        chunk_record = Chunks(
+            reference_id=reference.id,
+            chunk_number=i,
+            total_chunks=len(documents),
+        )
+        db.add(chunk_record)
+        await db.commit()
+        await db.refresh(chunk_record)
+        
+        # Create MongoDB document
+        mongodb_chunk = MongoDbChunkDocument(
+            chunk_id=str(chunk_record.id),
+            content=chunk.page_content,
+        )
+        await async_mongodb_client.insert_chunk(mongodb_chunk)
+        logger.debug(f"Inserted chunk into MongoDB: {mongodb_chunk}")
+        
+        # Generate embedding and create Milvus record
+        await get_workload_pool("ingestion").run(index_chunk, str(chunk_record.id), str(reference.id), chunk.page_content)
+
 @router.post(
     "/upload",
     status_code=status.HTTP_201_CREATED,
@@ -123,10 +231,10 @@ def detect_url_type(url: str) -> ReferencesTypeEnum:
     },
     summary="Upload a reference file"
 )
-def upload_reference(
+async def upload_reference(
     file: UploadFile = File(...),
     exam_id: uuid.UUID = Path(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ReferenceUploadResponse:
     """
     Upload a reference file for an exam.
@@ -143,7 +251,7 @@ def upload_reference(
     """
     try:
         # Check if exam exists
-        exam = db.query(Exam).filter(Exam.id == exam_id).first()
+        exam = (await db.execute(select(Exam.id).where(Exam.id == exam_id))).first()
         if not exam:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -152,11 +260,12 @@ def upload_reference(
         
         # Check if the reference with the same name already exists
         existing_reference = (
-            db.query(Reference)
-            .filter(Reference.exam_id == exam_id)
-            .filter(Reference.file_name == file.filename)
-            .first()
-        )
+            await db.execute(
+                select(Reference.id)
+                .where(Reference.exam_id == exam_id)
+                .where(Reference.file_name == file.filename)
+            )
+        ).first()
         
         if existing_reference:
             raise HTTPException(
@@ -176,13 +285,11 @@ def upload_reference(
         file_type = ReferencesTypeEnum(file_ext)
         
         # Load the document and parse it
+        content = await file.read()
         try:
-            loader_class = LANGCHAIN_LOADERS_MAPPING[file_type]
-            with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                tmp.write(file.file.read())
-                tmp.flush()
-                loader: BaseLoader = loader_class(tmp.name)
-            documents = loader.load()
+            documents = await get_workload_pool("ingestion").run(load_file_documents, file_type, content)
+        except WorkloadRejectedError:
+            raise
         except Exception as e:
             logger.error(f"Error parsing file: {str(e)}")
             raise HTTPException(
@@ -199,54 +306,23 @@ def upload_reference(
         
         # Commit the reference to the database
         db.add(reference)
-        db.commit()
-        db.refresh(reference)
+        await db.commit()
+        await db.refresh(reference)
         
         # Process each chunk
-        for i, chunk in enumerate(documents):
-            # Create postgres record
-            chunk_record = Chunks(
-                reference_id=reference.id,
-                chunk_number=i,
-                total_chunks=len(documents),
-            )
-            db.add(chunk_record)
-            db.commit()
-            db.refresh(chunk_record)
-            
-            # Create MongoDB document
-            mongodb_chunk = MongoDbChunkDocument(
-                chunk_id=str(chunk_record.id),
-                content=chunk.page_content,
-            )
-            mongodb_client.insert_chunk(mongodb_chunk)
-            logger.debug(f"Inserted chunk into MongoDB: {mongodb_chunk}")
-
-            # Generate embedding
-            embedding = oai_emb_client.embeddings.create(
-                input=chunk.page_content, 
-                model=settings.EMBEDDINGS_MODEL_NAME
-            ).data[0].embedding
-            
-            # Create Milvus record
-            milvus_record = MilvusChunkRecord(
-                chunk_id=str(chunk_record.id),
-                reference_id=str(reference.id),
-                embedding=embedding,
-            )
-            milvus_client.insert_vector(milvus_record)
+        await store_chunks(db, reference, documents)
         
         # Upload to MinIO
         if CONTENT_TYPE_MAPPING[file_type]:
             try:
-                # Reset file position to the beginning
-                file.file.seek(0)
-                
-                minio_client.upload_file(
-                    file_data=io.BytesIO(file.file.read()),
+                await get_workload_pool("ingestion").run(
+                    minio_client.upload_file,
+                    file_data=io.BytesIO(content),
                     object_name=f"{exam_id}/{file.filename}",
                     content_type=CONTENT_TYPE_MAPPING[file_type],
                 )
+            except WorkloadRejectedError:
+                raise
             except Exception as e:
                 logger.error(f"Error uploading file to MinIO: {str(e)}")
                 raise HTTPException(
@@ -254,18 +330,21 @@ def upload_reference(
                     detail="Failed to upload file to storage."
                 )
         
+        # Invalidate cached chat contexts of this exam
+        await get_workload_pool("ingestion").run(context_cache.invalidate_exam, exam_id)
+        
         return ReferenceUploadResponse(
             id=reference.id,
             type=file_type,
             name=file.filename
         )
     
-    except HTTPException:
-        # Re-raise HTTP exceptions
+    except (HTTPException, WorkloadRejectedError):
+        # Re-raise HTTP exceptions and shed requests
         raise
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error uploading reference: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -284,10 +363,10 @@ def upload_reference(
     },
     summary="Create a reference via URL"
 )
-def create_reference(
+async def create_reference(
     request: ReferenceCreateRequest,
     exam_id: uuid.UUID = Path(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ReferenceCreateResponse:
     """
     Create a reference using a URL for an exam.
@@ -299,7 +378,7 @@ def create_reference(
     """
     try:
         # Check if exam exists
-        exam = db.query(Exam).filter(Exam.id == exam_id).first()
+        exam = (await db.execute(select(Exam.id).where(Exam.id == exam_id))).first()
         if not exam:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -308,11 +387,12 @@ def create_reference(
         
         # Check if the reference with the same name already exists
         existing_reference = (
-            db.query(Reference)
-            .filter(Reference.exam_id == exam_id)
-            .filter(Reference.file_name == request.url)
-            .first()
-        )
+            await db.execute(
+                select(Reference.id)
+                .where(Reference.exam_id == exam_id)
+                .where(Reference.file_name == request.url)
+            )
+        ).first()
         
         if existing_reference:
             raise HTTPException(
@@ -325,18 +405,9 @@ def create_reference(
         
         # Scrape the content from the URL
         try:
-            loader_class = LANGCHAIN_LOADERS_MAPPING[url_type]
-            if url_type == ReferencesTypeEnum.WEBSITE_URL:
-                loader: BaseLoader = loader_class([request.url])
-            elif url_type == ReferencesTypeEnum.YT_VIDEO_URL:
-                if 'youtu.be' in request.url:
-                    video_id = request.url.split('/')[-1].split('?')[0]
-                elif 'youtube.com/shorts' in request.url:
-                    video_id = request.url.split('/')[-1].split('?')[0]
-                else:
-                    video_id = re.search(r"(?<=v=)[^&]+", str(request.url)).group(0)
-                loader: BaseLoader = loader_class(video_id)
-            documents = loader.load()
+            documents = await get_workload_pool("ingestion").run(load_url_documents, url_type, request.url)
+        except WorkloadRejectedError:
+            raise
         except Exception as e:
             logger.error(f"Error scraping URL: {str(e)}")
             raise HTTPException(
@@ -352,42 +423,14 @@ def create_reference(
         )
         
         db.add(reference)
-        db.commit()
-        db.refresh(reference)
+        await db.commit()
+        await db.refresh(reference)
         
         # Process each chunk
-        for i, chunk in enumerate(documents):
-            # Create postgres record
-            chunk_record = Chunks(
-                reference_id=reference.id,
-                chunk_number=i,
-                total_chunks=len(documents),
-            )
-            db.add(chunk_record)
-            db.commit()
-            db.refresh(chunk_record)
-            
-            # Create MongoDB document
-            mongodb_chunk = MongoDbChunkDocument(
-                chunk_id=str(chunk_record.id),
-                content=chunk.page_content,
-            )
-            mongodb_client.insert_chunk(mongodb_chunk)
-            logger.debug(f"Inserted chunk into MongoDB: {mongodb_chunk}")
-
-            # Generate embedding
-            embedding = oai_emb_client.embeddings.create(
-                input=chunk.page_content,
-                model=settings.EMBEDDINGS_MODEL_NAME
-            ).data[0].embedding
-            
-            # Create Milvus record
-            milvus_record = MilvusChunkRecord(
-                chunk_id=str(chunk_record.id),
-                reference_id=str(reference.id),
-                embedding=embedding,
-            )
-            milvus_client.insert_vector(milvus_record)
+        await store_chunks(db, reference, documents)
+        
+        # Invalidate cached chat contexts of this exam
+        await get_workload_pool("ingestion").run(context_cache.invalidate_exam, exam_id)
         
         return ReferenceCreateResponse(
             id=reference.id,
@@ -395,12 +438,12 @@ def create_reference(
             name=request.url
         )
     
-    except HTTPException:
-        # Re-raise HTTP exceptions
+    except (HTTPException, WorkloadRejectedError):
+        # Re-raise HTTP exceptions and shed requests
         raise
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating reference: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -412,6 +455,7 @@ def create_reference(
     response_model=ListReferenceResponse,
     responses={
         200: {"description": "References listed successfully"},
+        400: {"description": "Bad request - Invalid cursor"},
         404: {"description": "Not found - Exam not found"},
         500: {"description": "Internal server error"}
     },
@@ -419,27 +463,32 @@ def create_reference(
 )
 def list_references(
     exam_id: uuid.UUID = Path(...),
-    db: Session = Depends(get_db)
+    limit: int = Query(settings.LIST_PAGE_DEFAULT_LIMIT, ge=1, le=settings.LIST_PAGE_MAX_LIMIT, description="Maximum number of references"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    db: Session = Depends(get_read_db)
 ) -> ListReferenceResponse:
     """
-    List all references associated with a specific exam.
+    List the references associated with a specific exam by name, one page at a time.
     
     - **exam_id**: UUID of the exam to list references for
+    - **limit**: Maximum number of references in the page
+    - **cursor**: Cursor of the page, from `next_cursor` of the previous one
     """
     try:
         # Check if exam exists
-        exam = db.query(Exam).filter(Exam.id == exam_id).first()
+        exam = db.query(Exam.id).filter(Exam.id == exam_id).first()
         if not exam:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Exam with ID {exam_id} not found."
             )
         
-        # Get references for this exam
-        references = (
-            db.query(Reference)
-            .filter(Reference.exam_id == exam_id)
-            .all()
+        # Get one page of references for this exam, selecting only the listed columns
+        references, next_cursor = keyset_page(
+            db.query(Reference.id, Reference.file_type, Reference.file_name).filter(Reference.exam_id == exam_id),
+            [Reference.file_name, Reference.id],
+            limit,
+            cursor,
         )
         
         reference_items = [
@@ -450,12 +499,18 @@ def list_references(
             ) for ref in references
         ]
         
-        return ListReferenceResponse(references=reference_items)
+        return ListReferenceResponse(references=reference_items, next_cursor=next_cursor)
     
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor."
+        )
+    
     except Exception as e:
         logger.error(f"Error listing references: {str(e)}")
         raise HTTPException(
@@ -602,6 +657,9 @@ def delete_reference(
         # Delete the reference from the database
         db.delete(reference)
         db.commit()
+        
+        # Invalidate cached chat contexts of this exam
+        context_cache.invalidate_exam(exam_id)
     
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -2,9 +2,10 @@
 # Description: This file contains the routers for the Subjects API.
 
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.utils.postgres import Subject, get_db
+from app.utils.postgres import Subject, InvalidCursorError, get_db, get_read_db, keyset_page
 from app.utils.models import (
     SubjectItem,
     SubjectCreateRequest,
@@ -13,13 +14,17 @@ from app.utils.models import (
     UpdateSubjectRequest,
     UpdateSubjectResponse,
 )
+from app.utils.workload import workload_route
 from app.logger import get_logger
+from app.config import get_settings
 
 logger = get_logger()
+settings = get_settings()
 
 router = APIRouter(
     prefix="/subjects",
-    tags=["Subjects"]
+    tags=["Subjects"],
+    route_class=workload_route("crud")
 )
 
 @router.post(
@@ -87,21 +92,29 @@ def create_subject(
     response_model=ListSubjectResponse,
     responses={
         200: {"description": "List of subjects retrieved successfully"},
+        400: {"description": "Bad request - Invalid cursor"},
         500: {"description": "Internal server error - Unexpected error occurred"}
     },
     summary="List all subjects",
 )
 def list_subjects(
-    db: Session = Depends(get_db)
+    limit: int = Query(settings.LIST_PAGE_DEFAULT_LIMIT, ge=1, le=settings.LIST_PAGE_MAX_LIMIT, description="Maximum number of subjects"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    db: Session = Depends(get_read_db)
 ) -> ListSubjectResponse:
     """
-    List all available subjects.
+    List available subjects by name, one page at a time.
+    
+    - **limit**: Maximum number of subjects in the page
+    - **cursor**: Cursor of the page, from `next_cursor` of the previous one
     """
     try:
-        # Get all subjects from database
-        subjects = (
-            db.query(Subject)
-            .all()
+        # Get one page of subjects, selecting only the listed columns
+        subjects, next_cursor = keyset_page(
+            db.query(Subject.id, Subject.name, Subject.color),
+            [Subject.name],
+            limit,
+            cursor,
         )
         
         subject_items = [
@@ -113,7 +126,13 @@ def list_subjects(
             for subject in subjects
         ]
         
-        return ListSubjectResponse(subjects=subject_items)
+        return ListSubjectResponse(subjects=subject_items, next_cursor=next_cursor)
+    
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor."
+        )
     
     except Exception as e:
         logger.error(f"Error listing subjects: {str(e)}")
@@ -0,0 +1,186 @@
+# Path: app/routers/usage.py
+# Description: This file contains the router for the Usage telemetry API.
+
+import uuid
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.utils.postgres import UsageRecord, get_db
+from app.utils.models import (
+    UsageGroupByEnum,
+    UsageRollupItem,
+    ListUsageResponse,
+    ExamUsageResponse,
+)
+from app.utils.workload import workload_route
+from app.logger import get_logger
+
+logger = get_logger()
+
+router = APIRouter(
+    prefix="/usage",
+    tags=["Usage"],
+    route_class=workload_route("crud")
+)
+
+# Columns used for each grouping dimension
+GROUP_BY_COLUMNS = {
+    UsageGroupByEnum.EXAM: UsageRecord.exam_id,
+    UsageGroupByEnum.ROUTE: UsageRecord.route,
+    UsageGroupByEnum.MODEL: UsageRecord.model,
+    UsageGroupByEnum.KIND: UsageRecord.kind,
+}
+
+# Rollup field names for each grouping dimension
+GROUP_BY_FIELDS = {
+    UsageGroupByEnum.EXAM: "exam_id",
+    UsageGroupByEnum.ROUTE: "route",
+    UsageGroupByEnum.MODEL: "model",
+    UsageGroupByEnum.KIND: "kind",
+}
+
+def rollup_usage(
+    db: Session,
+    group_by: List[UsageGroupByEnum],
+    exam_id: Optional[uuid.UUID] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[UsageRollupItem]:
+    """
+    Aggregate usage records in PostgreSQL.
+    
+    Args:
+        db: Database session
+        group_by: Dimensions to group by (empty for a grand total)
+        exam_id: Only include records of this exam
+        since: Only include records created at or after this time
+        until: Only include records created before this time
+    
+    Returns:
+        One rollup item per group, most expensive (by tokens) first
+    """
+    group_columns = [GROUP_BY_COLUMNS[dimension] for dimension in group_by]
+    total_tokens = func.sum(UsageRecord.prompt_tokens) + func.sum(UsageRecord.completion_tokens)
+    
+    query = db.query(
+        *group_columns,
+        func.count(UsageRecord.id),
+        func.coalesce(func.sum(UsageRecord.prompt_tokens), 0),
+        func.coalesce(func.sum(UsageRecord.completion_tokens), 0),
+        func.coalesce(func.sum(UsageRecord.quota_units), 0),
+        func.coalesce(func.sum(UsageRecord.latency_ms), 0),
+    )
+    
+    if exam_id:
+        query = query.filter(UsageRecord.exam_id == exam_id)
+    if since:
+        query = query.filter(UsageRecord.created_at >= since)
+    if until:
+        query = query.filter(UsageRecord.created_at < until)
+    if group_columns:
+        query = query.group_by(*group_columns).order_by(total_tokens.desc().nullslast())
+    
+    items = []
+    for row in query.all():
+        group_values = row[:len(group_columns)]
+        calls, prompt_tokens, completion_tokens, quota_units, latency_ms = row[len(group_columns):]
+        items.append(
+            UsageRollupItem(
+                **{
+                    GROUP_BY_FIELDS[dimension]: value
+                    for dimension, value in zip(group_by, group_values)
+                },
+                calls=calls,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                quota_units=quota_units,
+                total_latency_ms=latency_ms,
+            )
+        )
+    
+    return items
+
+@router.get(
+    "",
+    response_model=ListUsageResponse,
+    responses={
+        200: {"description": "Usage rollups retrieved successfully"},
+        500: {"description": "Internal server error - Unexpected error occurred"}
+    },
+    summary="Query usage rollups",
+)
+def list_usage(
+    group_by: List[UsageGroupByEnum] = Query([UsageGroupByEnum.EXAM], description="Dimensions to group by"),
+    exam_id: Optional[uuid.UUID] = Query(None, description="Only include usage of this exam"),
+    since: Optional[datetime] = Query(None, description="Only include usage at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only include usage before this time"),
+    db: Session = Depends(get_db)
+) -> ListUsageResponse:
+    """
+    Aggregate LLM tokens, embedding tokens and YouTube quota units.
+    
+    - **group_by**: Any of exam, route, model and kind (repeatable)
+    - **exam_id**: Optional exam filter
+    - **since** / **until**: Optional time window
+    """
+    try:
+        items = rollup_usage(db, group_by, exam_id=exam_id, since=since, until=until)
+        
+        return ListUsageResponse(
+            since=since,
+            until=until,
+            group_by=group_by,
+            items=items,
+        )
+    
+    except Exception as e:
+        logger.error(f"Error listing usage: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list usage."
+        )
+
+@router.get(
+    "/exams/{exam_id}",
+    response_model=ExamUsageResponse,
+    responses={
+        200: {"description": "Exam usage rollup retrieved successfully"},
+        500: {"description": "Internal server error - Unexpected error occurred"}
+    },
+    summary="Get the usage rollup of an exam",
+)
+def get_exam_usage(
+    exam_id: uuid.UUID,
+    since: Optional[datetime] = Query(None, description="Only include usage at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only include usage before this time"),
+    db: Session = Depends(get_db)
+) -> ExamUsageResponse:
+    """
+    Get the total usage of an exam and its breakdown by route, model and kind.
+    
+    - **exam_id**: UUID of the exam
+    """
+    try:
+        total = rollup_usage(db, [], exam_id=exam_id, since=since, until=until)[0]
+        by_route = rollup_usage(
+            db,
+            [UsageGroupByEnum.ROUTE, UsageGroupByEnum.MODEL, UsageGroupByEnum.KIND],
+            exam_id=exam_id,
+            since=since,
+            until=until,
+        )
+        
+        return ExamUsageResponse(
+            exam_id=exam_id,
+            total=total,
+            by_route=by_route,
+        )
+    
+    except Exception as e:
+        logger.error(f"Error retrieving exam usage: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve exam usage."
+        )
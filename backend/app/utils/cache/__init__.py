@@ -0,0 +1,8 @@
+from .lru import LRUCache
+from .context import ContextCache, get_context_cache
+
+__all__ = [
+    "LRUCache",
+    "ContextCache",
+    "get_context_cache",
+]
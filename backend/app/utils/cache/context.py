@@ -0,0 +1,135 @@
+# Path: app/utils/cache/context.py
+# Description: Cache for the exam context snapshots that are sent to the chat LLM.
+
+import time, uuid, hashlib, threading
+from functools import lru_cache
+from typing import Callable, Iterable
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.mongodb import get_mongodb_client
+from .lru import LRUCache
+
+settings = get_settings()
+logger = get_logger()
+
+class ContextCache:
+    """
+    Caches the context string built from an exam's references.
+    
+    Entries are keyed by (exam_id, sorted reference_ids, content version). The content version
+    of an exam is bumped whenever one of its references is added or removed, so stale snapshots
+    are never served. When `CONTEXT_CACHE_SHARED` is enabled, versions and snapshots are also
+    kept in MongoDB so every worker sees the same invalidations. Workers remember the shared
+    version of an exam for `CONTEXT_CACHE_VERSION_TTL_SECONDS`, so an invalidation made by another
+    worker may take that long to be seen; the invalidating worker re-reads it on its next lookup.
+    """
+    
+    def __init__(self):
+        """Initialize the in-process LRU and, if enabled, the shared MongoDB layer."""
+        self.local = LRUCache(
+            max_entries=settings.CONTEXT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.CONTEXT_CACHE_MAX_BYTES,
+        )
+        self.shared = settings.CONTEXT_CACHE_SHARED
+        self._versions: dict[str, int] = {}
+        self._shared_versions: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self.mongodb_client = get_mongodb_client() if self.shared else None
+        logger.info(f"Context cache initialized (shared={self.shared})")
+    
+    def get_or_build(
+        self,
+        exam_id: uuid.UUID,
+        reference_ids: Iterable[uuid.UUID],
+        build: Callable[[], str],
+    ) -> str:
+        """
+        Return the cached context for the given references, building it on a miss.
+        
+        Args:
+            exam_id: UUID of the exam the references belong to
+            reference_ids: UUIDs of the references included in the context
+            build: Function that builds the context string from the databases
+            
+        Returns:
+            The context string
+        """
+        key = self._make_key(exam_id, reference_ids)
+        
+        context = self.local.get(key)
+        if context is not None:
+            logger.debug(f"Context cache hit for exam {exam_id}")
+            return context
+        
+        if self.shared:
+            context = self.mongodb_client.get_context_snapshot(self._shared_key(key))
+            if context is not None:
+                logger.debug(f"Shared context cache hit for exam {exam_id}")
+                self.local.set(key, context)
+                return context
+        
+        logger.debug(f"Context cache miss for exam {exam_id}")
+        context = build()
+        self.local.set(key, context)
+        
+        if self.shared and len(context.encode("utf-8")) <= settings.CONTEXT_CACHE_MAX_BYTES:
+            try:
+                self.mongodb_client.insert_context_snapshot(self._shared_key(key), str(exam_id), context)
+            except Exception as e:
+                logger.warning(f"Failed to store shared context snapshot (continuing anyway): {str(e)}")
+        
+        return context
+    
+    def invalidate_exam(self, exam_id: uuid.UUID) -> None:
+        """
+        Invalidate every cached context of an exam.
+        
+        Args:
+            exam_id: UUID of the exam whose references changed
+        """
+        exam_key = str(exam_id)
+        with self._lock:
+            self._versions[exam_key] = self._versions.get(exam_key, 0) + 1
+        
+        removed = self.local.delete_where(lambda key: key[0] == exam_key)
+        logger.debug(f"Invalidated {removed} cached contexts for exam {exam_id}")
+        
+        if self.shared:
+            self.mongodb_client.bump_context_version(exam_key)
+            # Read the bumped version back on the next lookup instead of waiting for the TTL
+            with self._lock:
+                self._shared_versions.pop(exam_key, None)
+    
+    def _make_key(self, exam_id: uuid.UUID, reference_ids: Iterable[uuid.UUID]) -> tuple[str, int, str]:
+        exam_key = str(exam_id)
+        references_hash = hashlib.sha1(
+            ",".join(sorted(str(ref_id) for ref_id in reference_ids)).encode("utf-8")
+        ).hexdigest()
+        return (exam_key, self._get_version(exam_key), references_hash)
+    
+    def _shared_key(self, key: tuple[str, int, str]) -> str:
+        return ":".join(str(part) for part in key)
+    
+    def _get_version(self, exam_key: str) -> int:
+        if self.shared:
+            return self._get_shared_version(exam_key)
+        with self._lock:
+            return self._versions.get(exam_key, 0)
+    
+    def _get_shared_version(self, exam_key: str) -> int:
+        # Avoids a MongoDB round trip on every lookup, at the cost of the staleness window above
+        now = time.monotonic()
+        with self._lock:
+            cached = self._shared_versions.get(exam_key)
+        if cached is not None and now - cached[1] < settings.CONTEXT_CACHE_VERSION_TTL_SECONDS:
+            return cached[0]
+        
+        version = self.mongodb_client.get_context_version(exam_key)
+        with self._lock:
+            self._shared_versions[exam_key] = (version, now)
+        return version
+
+@lru_cache
+def get_context_cache() -> ContextCache:
+    """Get a singleton instance of the context cache."""
+    return ContextCache()
@@ -0,0 +1,118 @@
+# Path: app/utils/cache/lru.py
+# Description: Thread-safe in-process LRU cache bounded by entry count, total byte size and optional TTL.
+
+import sys, time, threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+def default_sizeof(value: Any) -> int:
+    """Approximate the memory footprint of a cached value in bytes."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return sys.getsizeof(value)
+
+class LRUCache:
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sizeof: Callable[[Any], int] = default_sizeof,
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of entries kept in the cache
+            max_bytes: Maximum total size of all cached values (None for unbounded)
+            ttl_seconds: Time after which an entry expires (None for no expiry)
+            sizeof: Function used to measure the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for `key`, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, _, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                self._pop(key)
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`, evicting least recently used entries as needed."""
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            
+            # A single value larger than the whole budget is never cached
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._pop(oldest_key)
+    
+    def delete(self, key: Hashable) -> None:
+        """Remove `key` from the cache if present."""
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+    
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove every entry whose key matches `predicate`.
+        
+        Returns:
+            Number of removed entries
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._pop(key)
+            return len(keys)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> dict:
+        """Return current size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+    
+    def _pop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
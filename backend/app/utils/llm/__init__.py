@@ -0,0 +1,16 @@
+from .client import LLMGateway, get_llm_gateway
+from .errors import (
+    LLMGatewayError,
+    LLMUnavailableError,
+    LLMOverloadedError,
+    LLMCircuitOpenError,
+)
+
+__all__ = [
+    "LLMGateway",
+    "get_llm_gateway",
+    "LLMGatewayError",
+    "LLMUnavailableError",
+    "LLMOverloadedError",
+    "LLMCircuitOpenError",
+]
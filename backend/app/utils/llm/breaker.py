@@ -0,0 +1,73 @@
+# Path: app/utils/llm/breaker.py
+# Description: Circuit breaker protecting callers from a failing LLM provider.
+
+import time, threading
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+    
+    - closed: calls pass through; consecutive failures are counted
+    - open: calls are rejected until `reset_timeout` seconds have passed
+    - half-open: a single trial call is let through; success closes the circuit, failure re-opens it
+    """
+    
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize the breaker.
+        
+        Args:
+            name: Name used in logs and metrics (usually the provider base URL)
+            failure_threshold: Consecutive failures after which the circuit opens
+            reset_timeout: Seconds to wait before letting a trial call through
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+    
+    def allow(self) -> bool:
+        """Return True if a call may be attempted now."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+    
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+    
+    def record_abandoned(self) -> None:
+        """Forget a call that ended without an outcome, e.g. a cancelled one, freeing a trial slot."""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit once the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+    
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
@@ -0,0 +1,624 @@
+# Path: app/utils/llm/client.py
+# Description: Single gateway for all LLM and embedding calls with pooled transports, timeouts, retries,
+#              per-model concurrency caps, circuit breaking and latency/token metrics.
+
+import time, random, asyncio, threading
+import httpx
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Optional
+from openai import (
+    OpenAI,
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    APIStatusError,
+    RateLimitError,
+)
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.cache import LRUCache
+from app.utils.metrics import get_metrics
+from app.utils.usage import get_usage_recorder
+from app.utils.request import CancelToken, RequestCancelledError, get_cancel_token
+from .breaker import CircuitBreaker
+from .slots import ConcurrencySlots, SlotLease
+from .errors import LLMGatewayError, LLMOverloadedError, LLMCircuitOpenError
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+usage_recorder = get_usage_recorder()
+
+@dataclass(frozen=True)
+class ModelProfile:
+    name: str
+    base_url: str
+    api_key: str
+    model: str
+    max_concurrency: int
+
+def _is_retryable(error: Exception) -> bool:
+    """Connection problems, timeouts, rate limits and 5xx responses are worth retrying."""
+    if isinstance(error, (APIConnectionError, APITimeoutError, RateLimitError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500
+    return False
+
+class LLMGateway:
+    def __init__(self):
+        """Initialize the model profiles; transports and clients are created lazily."""
+        self.profiles = {
+            "chat": ModelProfile(
+                name="chat",
+                base_url=settings.CHAT_LLM_BASE_URL,
+                api_key=settings.CHAT_LLM_API_KEY,
+                model=settings.CHAT_LLM_MODEL_NAME,
+                max_concurrency=settings.CHAT_LLM_MAX_CONCURRENCY,
+            ),
+            "mindmap": ModelProfile(
+                name="mindmap",
+                base_url=settings.MINDMAP_LLM_BASE_URL,
+                api_key=settings.MINDMAP_LLM_API_KEY,
+                model=settings.MINDMAP_LLM_MODEL_NAME,
+                max_concurrency=settings.MINDMAP_LLM_MAX_CONCURRENCY,
+            ),
+            "embeddings": ModelProfile(
+                name="embeddings",
+                base_url=settings.EMBEDDINGS_BASE_URL,
+                api_key=settings.EMBEDDINGS_API_KEY,
+                model=settings.EMBEDDINGS_MODEL_NAME,
+                max_concurrency=settings.EMBEDDINGS_MAX_CONCURRENCY,
+            ),
+        }
+        self._slots = {
+            name: ConcurrencySlots(profile.max_concurrency)
+            for name, profile in self.profiles.items()
+        }
+        self._transports: dict[str, httpx.Client] = {}
+        self._clients: dict[tuple[str, str], OpenAI] = {}
+        self._async_transports: dict[str, httpx.AsyncClient] = {}
+        self._async_clients: dict[tuple[str, str], AsyncOpenAI] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        
+        # Embeddings of short, repeated texts such as mindmap leaf paths and video titles
+        self.embedding_cache = LRUCache(
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            sizeof=lambda embedding: len(embedding) * 8,
+        )
+        logger.info("LLM gateway initialized")
+    
+    def chat_completion(self, profile: str, messages: List[dict], **kwargs):
+        """
+        Create a chat completion.
+        
+        Args:
+            profile: Name of the model profile ("chat" or "mindmap")
+            messages: Messages to send to the model
+            kwargs: Extra arguments passed to `chat.completions.create`
+        
+        Returns:
+            The chat completion returned by the provider
+        """
+        model_profile = self.profiles[profile]
+        client = self._get_client(model_profile)
+        
+        if get_cancel_token() is not None:
+            # Stream internally so the HTTP call can be aborted as soon as the request is cancelled
+            return self._collect_stream(model_profile, messages, **kwargs)
+        
+        start_time = time.perf_counter()
+        response = self._call(
+            model_profile,
+            lambda timeout: client.chat.completions.create(
+                model=model_profile.model,
+                messages=messages,
+                stream=False,
+                timeout=timeout,
+                **kwargs
+            ),
+        )
+        self._record_usage(model_profile, response.usage, time.perf_counter() - start_time)
+        return response
+    
+    async def achat_completion(self, profile: str, messages: List[dict], **kwargs):
+        """
+        Create a chat completion without blocking a thread while the model answers.
+        
+        Shares the concurrency cap, circuit breaker and retry policy of `chat_completion`. If the
+        current request gets cancelled, the in-flight HTTP call is aborted.
+        
+        Args:
+            profile: Name of the model profile ("chat" or "mindmap")
+            messages: Messages to send to the model
+            kwargs: Extra arguments passed to `chat.completions.create`
+        
+        Returns:
+            The chat completion returned by the provider
+        """
+        model_profile = self.profiles[profile]
+        client = self._get_async_client(model_profile)
+        breaker = self._get_breaker(model_profile.base_url)
+        token = get_cancel_token()
+        
+        lease = await self._aacquire(model_profile, token)
+        try:
+            start_time = time.perf_counter()
+            response = await self._aattempt_with_retries(
+                model_profile,
+                breaker,
+                lease,
+                lambda timeout: client.chat.completions.create(
+                    model=model_profile.model,
+                    messages=messages,
+                    stream=False,
+                    timeout=timeout,
+                    **kwargs
+                ),
+                token,
+            )
+            self._record_usage(model_profile, response.usage, time.perf_counter() - start_time)
+            return response
+        finally:
+            lease.release()
+    
+    def stream_chat_completion(self, profile: str, messages: List[dict], **kwargs) -> Iterator[str]:
+        """
+        Create a streaming chat completion and yield content deltas.
+        
+        The concurrency slot of the model is held until the stream is exhausted or closed.
+        
+        Args:
+            profile: Name of the model profile ("chat" or "mindmap")
+            messages: Messages to send to the model
+            kwargs: Extra arguments passed to `chat.completions.create`
+        
+        Returns:
+            Iterator of content deltas
+        """
+        model_profile = self.profiles[profile]
+        for chunk in self._stream_chunks(model_profile, messages, **kwargs):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    def create_embeddings(self, inputs: List[str], cache: bool = False) -> List[List[float]]:
+        """
+        Create embeddings for a batch of texts.
+        
+        Args:
+            inputs: Texts to embed
+            cache: Whether to serve repeated texts from the in-process embedding cache
+        
+        Returns:
+            One embedding vector per input, in the same order
+        """
+        if not cache:
+            return self._embed(inputs)
+        
+        model = self.profiles["embeddings"].model
+        embeddings = {text: self.embedding_cache.get((model, text)) for text in dict.fromkeys(inputs)}
+        misses = [text for text, embedding in embeddings.items() if embedding is None]
+        metrics.increment("embedding_cache_requests_total", len(embeddings) - len(misses), result="hit")
+        metrics.increment("embedding_cache_requests_total", len(misses), result="miss")
+        
+        # Embed every missing text in one call
+        if misses:
+            for text, embedding in zip(misses, self._embed(misses)):
+                self.embedding_cache.set((model, text), embedding)
+                embeddings[text] = embedding
+        
+        return [embeddings[text] for text in inputs]
+    
+    def _embed(self, inputs: List[str]) -> List[List[float]]:
+        model_profile = self.profiles["embeddings"]
+        client = self._get_client(model_profile)
+        
+        start_time = time.perf_counter()
+        response = self._call(
+            model_profile,
+            lambda timeout: client.embeddings.create(
+                input=inputs,
+                model=model_profile.model,
+                timeout=timeout,
+            ),
+        )
+        self._record_usage(model_profile, response.usage, time.perf_counter() - start_time)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    
+    def _stream_chunks(self, model_profile: ModelProfile, messages: List[dict], **kwargs):
+        """
+        Yield raw chunks of a streaming chat completion.
+        
+        The concurrency slot is held until the stream ends. If the current request gets cancelled,
+        the HTTP response is closed immediately, which aborts generation on the provider side.
+        """
+        client = self._get_client(model_profile)
+        breaker = self._get_breaker(model_profile.base_url)
+        token = get_cancel_token()
+        
+        if settings.LLM_STREAM_INCLUDE_USAGE:
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        
+        lease = self._acquire(model_profile, token)
+        try:
+            start_time = time.perf_counter()
+            stream = self._attempt_with_retries(
+                model_profile,
+                breaker,
+                lease,
+                lambda timeout: client.chat.completions.create(
+                    model=model_profile.model,
+                    messages=messages,
+                    stream=True,
+                    timeout=timeout,
+                    **kwargs
+                ),
+                token,
+            )
+            unregister = token.add_callback(stream.close) if token else (lambda: None)
+            usage = None
+            try:
+                for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    yield chunk
+            except Exception:
+                if token is not None and token.cancelled:
+                    self._raise_cancelled(model_profile, token)
+                raise
+            finally:
+                unregister()
+                stream.close()
+                latency = time.perf_counter() - start_time
+                metrics.observe(
+                    "llm_stream_duration_seconds",
+                    latency,
+                    profile=model_profile.name,
+                    model=model_profile.model,
+                )
+                self._record_usage(model_profile, usage, latency)
+            
+            # A closed stream may end the iteration silently
+            if token is not None and token.cancelled:
+                self._raise_cancelled(model_profile, token)
+        finally:
+            lease.release()
+    
+    def _collect_stream(self, model_profile: ModelProfile, messages: List[dict], **kwargs) -> ChatCompletion:
+        """Consume a streaming completion and assemble it into a regular ChatCompletion."""
+        content_parts = []
+        finish_reason = "stop"
+        completion_id, created, model, usage = "", int(time.time()), model_profile.model, None
+        
+        for chunk in self._stream_chunks(model_profile, messages, **kwargs):
+            completion_id, created, model = chunk.id, chunk.created, chunk.model
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices:
+                if chunk.choices[0].delta.content:
+                    content_parts.append(chunk.choices[0].delta.content)
+                if chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
+        
+        return ChatCompletion.model_construct(
+            id=completion_id,
+            object="chat.completion",
+            created=created,
+            model=model,
+            usage=usage,
+            choices=[
+                Choice.model_construct(
+                    index=0,
+                    finish_reason=finish_reason,
+                    message=ChatCompletionMessage.model_construct(
+                        role="assistant",
+                        content="".join(content_parts),
+                    ),
+                )
+            ],
+        )
+    
+    def _call(self, model_profile: ModelProfile, fn):
+        """Run `fn(timeout)` under the model's concurrency cap, circuit breaker and retry policy."""
+        breaker = self._get_breaker(model_profile.base_url)
+        token = get_cancel_token()
+        lease = self._acquire(model_profile, token)
+        try:
+            return self._attempt_with_retries(model_profile, breaker, lease, fn, token)
+        finally:
+            lease.release()
+    
+    def _attempt_with_retries(
+        self,
+        model_profile: ModelProfile,
+        breaker: CircuitBreaker,
+        lease: SlotLease,
+        fn,
+        token: Optional[CancelToken] = None,
+    ):
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            timeout = self._before_attempt(model_profile, breaker, token)
+            
+            start_time = time.perf_counter()
+            try:
+                result = fn(timeout)
+            except Exception as e:
+                delay = self._after_failure(model_profile, breaker, e, attempt, start_time, token)
+                # Back off without holding the slot, so that queued calls can use it meanwhile
+                lease.release()
+                if token is not None:
+                    if token.wait(delay):
+                        self._raise_cancelled(model_profile, token)
+                else:
+                    time.sleep(delay)
+                self._acquire(model_profile, token, lease)
+                continue
+            
+            self._after_success(model_profile, breaker, start_time)
+            return result
+        
+        raise LLMGatewayError("Unreachable retry loop exit")
+    
+    async def _aattempt_with_retries(
+        self,
+        model_profile: ModelProfile,
+        breaker: CircuitBreaker,
+        lease: SlotLease,
+        fn,
+        token: Optional[CancelToken] = None,
+    ):
+        """Async counterpart of `_attempt_with_retries`; `fn(timeout)` returns an awaitable."""
+        loop = asyncio.get_running_loop()
+        
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            timeout = self._before_attempt(model_profile, breaker, token)
+            
+            start_time = time.perf_counter()
+            task = asyncio.ensure_future(fn(timeout))
+            # Tokens are cancelled from other threads too, e.g. by their deadline
+            unregister = token.add_callback(lambda: loop.call_soon_threadsafe(task.cancel)) if token else (lambda: None)
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                # Cancelled by the token or from outside, e.g. on shutdown; either way without an outcome
+                breaker.record_abandoned()
+                if token is not None and token.cancelled:
+                    self._raise_cancelled(model_profile, token)
+                raise
+            except Exception as e:
+                delay = self._after_failure(model_profile, breaker, e, attempt, start_time, token)
+                lease.release()
+                if await self._abackoff(delay, token):
+                    self._raise_cancelled(model_profile, token)
+                await self._aacquire(model_profile, token, lease)
+                continue
+            finally:
+                unregister()
+            
+            self._after_success(model_profile, breaker, start_time)
+            return result
+        
+        raise LLMGatewayError("Unreachable retry loop exit")
+    
+    async def _abackoff(self, delay: float, token: Optional[CancelToken]) -> bool:
+        """Async counterpart of `token.wait(delay)`: sleep, waking early if the token gets cancelled."""
+        if token is None:
+            await asyncio.sleep(delay)
+            return False
+        
+        loop = asyncio.get_running_loop()
+        cancelled = loop.create_future()
+        unregister = token.add_callback(
+            lambda: loop.call_soon_threadsafe(lambda: cancelled.done() or cancelled.set_result(None))
+        )
+        try:
+            await asyncio.wait_for(cancelled, delay)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            unregister()
+        return token.cancelled
+    
+    def _before_attempt(self, model_profile: ModelProfile, breaker: CircuitBreaker, token: Optional[CancelToken]) -> float:
+        """Check the request and the circuit before an attempt, and return the attempt's timeout."""
+        # Never start upstream work for a request that is already gone
+        timeout = settings.LLM_TIMEOUT_SECONDS
+        if token is not None:
+            if token.cancelled:
+                self._raise_cancelled(model_profile, token)
+            remaining = token.remaining()
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+        
+        if not breaker.allow():
+            metrics.increment("llm_circuit_rejections_total", profile=model_profile.name, model=model_profile.model)
+            raise LLMCircuitOpenError(f"Circuit open for {model_profile.base_url}")
+        return timeout
+    
+    def _after_failure(
+        self,
+        model_profile: ModelProfile,
+        breaker: CircuitBreaker,
+        error: Exception,
+        attempt: int,
+        start_time: float,
+        token: Optional[CancelToken],
+    ) -> float:
+        """Record a failed attempt and return the delay before the next one, or raise if there is none."""
+        labels = {"profile": model_profile.name, "model": model_profile.model}
+        metrics.observe("llm_call_latency_seconds", time.perf_counter() - start_time, **labels)
+        if token is not None and token.cancelled:
+            breaker.record_abandoned()
+            self._raise_cancelled(model_profile, token)
+        
+        retryable = _is_retryable(error)
+        if retryable:
+            breaker.record_failure()
+        else:
+            # The provider answered, it just rejected this particular request
+            breaker.record_success()
+        metrics.increment("llm_call_errors_total", retryable=retryable, **labels)
+        
+        if not retryable or attempt == settings.LLM_MAX_RETRIES:
+            logger.error(f"LLM call to {model_profile.name} failed after {attempt + 1} attempts: {str(error)}")
+            raise error
+        
+        # Full jitter exponential backoff
+        delay = random.uniform(
+            0, min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2 ** attempt)
+        )
+        logger.warning(f"LLM call to {model_profile.name} failed ({str(error)}), retrying in {delay:.2f}s")
+        return delay
+    
+    def _after_success(self, model_profile: ModelProfile, breaker: CircuitBreaker, start_time: float) -> None:
+        labels = {"profile": model_profile.name, "model": model_profile.model}
+        breaker.record_success()
+        metrics.observe("llm_call_latency_seconds", time.perf_counter() - start_time, **labels)
+        metrics.increment("llm_calls_total", **labels)
+    
+    def _acquire(
+        self,
+        model_profile: ModelProfile,
+        token: Optional[CancelToken] = None,
+        lease: Optional[SlotLease] = None,
+    ) -> SlotLease:
+        """
+        Wait for a concurrency slot of the model, behind the calls already queued for one.
+        
+        Args:
+            model_profile: The model whose slot to take
+            token: Cancel token of the current request, which makes it leave the queue
+            lease: A released lease to take the slot into, e.g. after backing off
+        
+        Returns:
+            The lease holding the slot
+        
+        Raises:
+            LLMOverloadedError: If no slot frees up within the queue timeout
+        """
+        lease = lease or SlotLease(self._slots[model_profile.name])
+        start_time = time.perf_counter()
+        lease.acquire(settings.LLM_QUEUE_TIMEOUT_SECONDS, token)
+        self._check_acquired(model_profile, lease, token, start_time)
+        return lease
+    
+    async def _aacquire(
+        self,
+        model_profile: ModelProfile,
+        token: Optional[CancelToken] = None,
+        lease: Optional[SlotLease] = None,
+    ) -> SlotLease:
+        """Async counterpart of `_acquire`, waiting in the same queue without blocking the loop."""
+        lease = lease or SlotLease(self._slots[model_profile.name])
+        start_time = time.perf_counter()
+        await lease.aacquire(settings.LLM_QUEUE_TIMEOUT_SECONDS, token)
+        self._check_acquired(model_profile, lease, token, start_time)
+        return lease
+    
+    def _check_acquired(
+        self,
+        model_profile: ModelProfile,
+        lease: SlotLease,
+        token: Optional[CancelToken],
+        start_time: float,
+    ) -> None:
+        metrics.observe("llm_queue_wait_seconds", time.perf_counter() - start_time, profile=model_profile.name)
+        if token is not None and token.cancelled:
+            lease.release()
+            self._raise_cancelled(model_profile, token)
+        if not lease.held:
+            metrics.increment("llm_overloaded_total", profile=model_profile.name)
+            raise LLMOverloadedError(f"No free concurrency slot for {model_profile.name}")
+    
+    def _raise_cancelled(self, model_profile: ModelProfile, token: CancelToken) -> None:
+        metrics.increment("llm_calls_cancelled_total", profile=model_profile.name, reason=token.reason)
+        raise RequestCancelledError(token.reason)
+    
+    def _record_usage(self, model_profile: ModelProfile, usage, latency: float) -> None:
+        prompt_tokens = (usage.prompt_tokens or 0) if usage else 0
+        completion_tokens = (getattr(usage, "completion_tokens", 0) or 0) if usage else 0
+        
+        labels = {"profile": model_profile.name, "model": model_profile.model}
+        metrics.increment("llm_prompt_tokens_total", prompt_tokens, **labels)
+        metrics.increment("llm_completion_tokens_total", completion_tokens, **labels)
+        
+        if model_profile.name == "embeddings":
+            usage_recorder.record_embedding(model_profile.model, prompt_tokens, latency)
+        else:
+            usage_recorder.record_completion(model_profile.model, prompt_tokens, completion_tokens, latency)
+    
+    def _get_transport(self, base_url: str) -> httpx.Client:
+        with self._lock:
+            if base_url not in self._transports:
+                self._transports[base_url] = httpx.Client(
+                    http2=True,
+                    timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS),
+                    limits=httpx.Limits(
+                        max_connections=settings.LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    ),
+                )
+            return self._transports[base_url]
+    
+    def _get_client(self, model_profile: ModelProfile) -> OpenAI:
+        key = (model_profile.base_url, model_profile.api_key)
+        transport = self._get_transport(model_profile.base_url)
+        with self._lock:
+            if key not in self._clients:
+                # Retries are handled by the gateway so they can respect the circuit breaker
+                self._clients[key] = OpenAI(
+                    api_key=model_profile.api_key,
+                    base_url=model_profile.base_url,
+                    http_client=transport,
+                    max_retries=0,
+                )
+            return self._clients[key]
+    
+    def _get_async_client(self, model_profile: ModelProfile) -> AsyncOpenAI:
+        key = (model_profile.base_url, model_profile.api_key)
+        with self._lock:
+            if model_profile.base_url not in self._async_transports:
+                self._async_transports[model_profile.base_url] = httpx.AsyncClient(
+                    http2=True,
+                    timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS),
+                    limits=httpx.Limits(
+                        max_connections=settings.LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    ),
+                )
+            if key not in self._async_clients:
+                self._async_clients[key] = AsyncOpenAI(
+                    api_key=model_profile.api_key,
+                    base_url=model_profile.base_url,
+                    http_client=self._async_transports[model_profile.base_url],
+                    max_retries=0,
+                )
+            return self._async_clients[key]
+    
+    async def aclose(self) -> None:
+        """Close the async transports, which are bound to the event loop that created them."""
+        with self._lock:
+            transports = list(self._async_transports.values())
+            self._async_transports.clear()
+            self._async_clients.clear()
+        for transport in transports:
+            await transport.aclose()
+    
+    def _get_breaker(self, base_url: str) -> CircuitBreaker:
+        with self._lock:
+            if base_url not in self._breakers:
+                self._breakers[base_url] = CircuitBreaker(
+                    name=base_url,
+                    failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+                    reset_timeout=settings.LLM_CIRCUIT_RESET_SECONDS,
+                )
+            return self._breakers[base_url]
+
+@lru_cache
+def get_llm_gateway() -> LLMGateway:
+    """Get a singleton instance of the LLM gateway."""
+    return LLMGateway()
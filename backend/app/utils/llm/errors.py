@@ -0,0 +1,14 @@
+# Path: app/utils/llm/errors.py
+# Description: Exceptions raised by the LLM gateway.
+
+class LLMGatewayError(Exception):
+    """Base class for errors raised by the LLM gateway."""
+
+class LLMUnavailableError(LLMGatewayError):
+    """The provider cannot take the call right now; callers should answer with 503."""
+
+class LLMOverloadedError(LLMUnavailableError):
+    """No concurrency slot for the model became free within the queue timeout."""
+
+class LLMCircuitOpenError(LLMUnavailableError):
+    """The circuit breaker of the provider is open after repeated failures."""
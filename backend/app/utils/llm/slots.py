@@ -0,0 +1,125 @@
+# Path: app/utils/llm/slots.py
+# Description: Per-model concurrency slots shared by blocking and async callers, granted in arrival order.
+
+import asyncio, threading
+from collections import deque
+from typing import Callable, Deque, Optional
+from app.utils.request import CancelToken
+
+class _Waiter:
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.granted = False
+
+class ConcurrencySlots:
+    """
+    Counting semaphore that threads and event loops can wait on together.
+    
+    Waiters queue in arrival order and a released slot is handed to the oldest one directly, so
+    no caller can overtake another that is already waiting, whichever side they wait from.
+    """
+    
+    def __init__(self, limit: int):
+        """
+        Initialize the slots.
+        
+        Args:
+            limit: Number of slots, i.e. the maximum number of concurrent holders
+        """
+        self._free = limit
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout: float, token: Optional[CancelToken] = None) -> bool:
+        """
+        Take a slot, blocking until one is granted, `timeout` seconds pass or `token` gets cancelled.
+        
+        Returns:
+            True if a slot was taken
+        """
+        event = threading.Event()
+        waiter = self._enqueue(event.set)
+        if waiter is None:
+            return True
+        
+        unregister = token.add_callback(event.set) if token is not None else (lambda: None)
+        try:
+            event.wait(timeout)
+        finally:
+            unregister()
+        return self._settle(waiter)
+    
+    async def aacquire(self, timeout: float, token: Optional[CancelToken] = None) -> bool:
+        """Async counterpart of `acquire`, waiting in the same queue without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        woken = loop.create_future()
+        
+        def wake() -> None:
+            # Releases and cancellations may come from other threads
+            loop.call_soon_threadsafe(lambda: woken.done() or woken.set_result(None))
+        
+        waiter = self._enqueue(wake)
+        if waiter is None:
+            return True
+        
+        unregister = token.add_callback(wake) if token is not None else (lambda: None)
+        try:
+            await asyncio.wait_for(woken, timeout)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # The caller went away while queued; pass on a slot granted meanwhile
+            if self._settle(waiter):
+                self.release()
+            raise
+        finally:
+            unregister()
+        return self._settle(waiter)
+    
+    def release(self) -> None:
+        """Give a slot back, handing it to the oldest waiter if there is one."""
+        with self._lock:
+            if not self._waiters:
+                self._free += 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        waiter.wake()
+    
+    def _enqueue(self, wake: Callable[[], None]) -> Optional[_Waiter]:
+        """Take a free slot if nobody is waiting, otherwise queue up; returns the waiter, if queued."""
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return None
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+            return waiter
+    
+    def _settle(self, waiter: _Waiter) -> bool:
+        """Leave the queue after waking up; returns whether the waiter was granted a slot."""
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+            return waiter.granted
+
+class SlotLease:
+    """A caller's hold on one slot, which it may hand back and take again, e.g. while backing off."""
+    
+    def __init__(self, slots: ConcurrencySlots):
+        self.slots = slots
+        self.held = False
+    
+    def acquire(self, timeout: float, token: Optional[CancelToken] = None) -> bool:
+        self.held = self.slots.acquire(timeout, token)
+        return self.held
+    
+    async def aacquire(self, timeout: float, token: Optional[CancelToken] = None) -> bool:
+        self.held = await self.slots.aacquire(timeout, token)
+        return self.held
+    
+    def release(self) -> None:
+        """Give the slot back; does nothing if it is not held."""
+        if self.held:
+            self.held = False
+            self.slots.release()
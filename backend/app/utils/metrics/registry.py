@@ -0,0 +1,70 @@
+# Path: app/utils/metrics/registry.py
+# Description: Minimal in-process metrics registry with labelled counters and timing summaries.
+
+import threading
+from functools import lru_cache
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+class MetricsRegistry:
+    def __init__(self):
+        """Initialize empty counter and summary stores."""
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._summaries: dict[tuple[str, tuple], dict] = {}
+        self._lock = threading.Lock()
+    
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Increment a counter.
+        
+        Args:
+            name: Name of the counter
+            value: Amount to add
+            labels: Labels identifying the counter series
+        """
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def observe(self, name: str, value: float, **labels) -> None:
+        """
+        Record an observation (e.g. a latency in seconds) in a summary.
+        
+        Args:
+            name: Name of the summary
+            value: Observed value
+            labels: Labels identifying the summary series
+        """
+        key = (name, _labels_key(labels))
+        with self._lock:
+            summary = self._summaries.setdefault(key, {"count": 0, "sum": 0.0, "max": 0.0})
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+    
+    def snapshot(self) -> dict:
+        """Return a JSON serializable copy of all counters and summaries."""
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self._counters.items()
+                ],
+                "summaries": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": summary["count"],
+                        "sum": summary["sum"],
+                        "avg": summary["sum"] / summary["count"],
+                        "max": summary["max"],
+                    }
+                    for (name, labels), summary in self._summaries.items()
+                ],
+            }
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    """Get a singleton instance of the metrics registry."""
+    return MetricsRegistry()
@@ -0,0 +1,49 @@
+from .pipeline import (
+    MindmapGenerationError,
+    extract_leaf_nodes,
+    find_videos_for_leaf_nodes,
+    generate_mindmap,
+    load_exam_content,
+)
+from .jobs import MindmapJobManager, get_mindmap_job_manager
+from .notes import get_leaf_notes, resolve_node_path
+from .fingerprint import compute_etag, etag_matches, load_exam_fingerprint, aload_exam_fingerprint
+from .nodes import (
+    flatten_mindmap,
+    assemble_mindmap,
+    load_mindmap,
+    load_subtree,
+    load_node,
+    aload_mindmap,
+)
+from .streaming import EventCallback, SubtopicStreamParser, emit_event
+from .validation import MindmapOutputError, parse_mindmap_json, repair_mindmap, salvage_json
+
+__all__ = [
+    "MindmapGenerationError",
+    "extract_leaf_nodes",
+    "find_videos_for_leaf_nodes",
+    "generate_mindmap",
+    "load_exam_content",
+    "MindmapJobManager",
+    "get_mindmap_job_manager",
+    "get_leaf_notes",
+    "resolve_node_path",
+    "compute_etag",
+    "etag_matches",
+    "load_exam_fingerprint",
+    "aload_exam_fingerprint",
+    "flatten_mindmap",
+    "assemble_mindmap",
+    "load_mindmap",
+    "load_subtree",
+    "load_node",
+    "aload_mindmap",
+    "EventCallback",
+    "SubtopicStreamParser",
+    "emit_event",
+    "MindmapOutputError",
+    "parse_mindmap_json",
+    "repair_mindmap",
+    "salvage_json",
+]
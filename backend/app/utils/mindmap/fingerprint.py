@@ -0,0 +1,93 @@
+# Path: app/utils/mindmap/fingerprint.py
+# Description: Fingerprints of an exam's content and entity tags of stored mindmaps.
+
+import uuid, json, hashlib
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.utils.postgres import Reference, Chunks
+
+def compute_fingerprint(chunk_ids_by_reference: Dict[str, List[str]]) -> str:
+    """
+    Fingerprint a set of references and their chunks.
+    
+    Args:
+        chunk_ids_by_reference: Chunk IDs of each reference, in chunk order
+    
+    Returns:
+        Hex digest that changes whenever a reference or chunk is added, removed or reordered
+    """
+    digest = hashlib.sha1()
+    for reference_id in sorted(chunk_ids_by_reference):
+        digest.update(reference_id.encode("utf-8"))
+        for chunk_id in chunk_ids_by_reference[reference_id]:
+            digest.update(b":" + chunk_id.encode("utf-8"))
+        digest.update(b";")
+    return digest.hexdigest()
+
+def load_exam_fingerprint(db: Session, exam_id: uuid.UUID) -> str:
+    """
+    Fingerprint the current references and chunks of an exam.
+    
+    Only chunk IDs are read, so this is cheap enough to run on every mindmap request.
+    
+    Args:
+        db: Database session
+        exam_id: UUID of the exam
+    
+    Returns:
+        The fingerprint of the exam's content
+    """
+    return _fingerprint_rows(db.execute(_exam_chunk_ids(exam_id)).all())
+
+async def aload_exam_fingerprint(db: AsyncSession, exam_id: uuid.UUID) -> str:
+    """Async counterpart of `load_exam_fingerprint`."""
+    return _fingerprint_rows((await db.execute(_exam_chunk_ids(exam_id))).all())
+
+def _exam_chunk_ids(exam_id: uuid.UUID):
+    return (
+        select(Chunks.reference_id, Chunks.id)
+        .join(Reference, Reference.id == Chunks.reference_id)
+        .where(Reference.exam_id == exam_id)
+        .order_by(Chunks.reference_id, Chunks.chunk_number)
+    )
+
+def _fingerprint_rows(rows: Iterable[Tuple[uuid.UUID, uuid.UUID]]) -> str:
+    chunk_ids_by_reference: Dict[str, List[str]] = {}
+    for reference_id, chunk_id in rows:
+        chunk_ids_by_reference.setdefault(str(reference_id), []).append(str(chunk_id))
+    return compute_fingerprint(chunk_ids_by_reference)
+
+def compute_etag(mindmap: Dict[str, Any]) -> str:
+    """
+    Compute the entity tag of a mindmap from its content.
+    
+    Args:
+        mindmap: The mindmap
+    
+    Returns:
+        A strong, quoted entity tag
+    """
+    content = json.dumps(mindmap, sort_keys=True, separators=(",", ":"), default=str)
+    return f'"{hashlib.sha1(content.encode("utf-8")).hexdigest()}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an `If-None-Match` header against an entity tag, using weak comparison.
+    
+    Args:
+        if_none_match: Value of the header
+        etag: Current entity tag
+    
+    Returns:
+        True if the client's copy is current
+    """
+    if if_none_match.strip() == "*":
+        return True
+    
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+    
+    return any(opaque(tag) == opaque(etag) for tag in if_none_match.split(","))
@@ -0,0 +1,173 @@
+# Path: app/utils/mindmap/incremental.py
+# Description: Source tracking on mindmap nodes and deterministic merging and pruning of subtrees.
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Maximum number of videos attached to a leaf without the refiner
+MAX_VIDEOS_PER_LEAF = 3
+
+def normalize_title(title: str) -> str:
+    """Normalize a node title so that equivalent titles match."""
+    return " ".join(title.lower().split())
+
+def _is_leaf(node: Dict[str, Any]) -> bool:
+    return node.get("is_last_subtopic", False)
+
+def _union(*source_lists: Iterable[str]) -> List[str]:
+    return sorted(set().union(*source_lists))
+
+def tag_sources(node: Dict[str, Any], reference_id: str) -> None:
+    """
+    Mark every node of a subtree as generated from one reference.
+    
+    Args:
+        node: Root of the subtree
+        reference_id: ID of the reference the subtree was generated from
+    """
+    node["sources"] = [reference_id]
+    for subtopic in node.get("subtopics", []):
+        tag_sources(subtopic, reference_id)
+
+def propagate_sources(node: Dict[str, Any]) -> List[str]:
+    """
+    Set the sources of every inner node to the union of its children's sources.
+    
+    Args:
+        node: Root of the subtree
+    
+    Returns:
+        The sources of the root
+    """
+    if not _is_leaf(node):
+        node["sources"] = _union(*(propagate_sources(subtopic) for subtopic in node.get("subtopics", [])))
+    return node.get("sources", [])
+
+def copy_sources(source_tree: Dict[str, Any], target_tree: Dict[str, Any]) -> None:
+    """
+    Copy leaf sources between two versions of a mindmap, e.g. before and after refinement.
+    
+    Leaves are matched by their title path, then by title alone if that is unambiguous. Leaves that
+    match nothing are left without sources.
+    
+    Args:
+        source_tree: Mindmap whose leaves carry sources
+        target_tree: Mindmap to copy the sources to
+    """
+    by_path: Dict[tuple, List[str]] = {}
+    by_title: Dict[str, Optional[List[str]]] = {}
+    
+    def collect(node: Dict[str, Any], path: tuple) -> None:
+        path = path + (normalize_title(node["title"]),)
+        if _is_leaf(node):
+            if "sources" in node:
+                by_path[path] = node["sources"]
+                # A title used by several leaves cannot be matched on its own
+                by_title[path[-1]] = None if path[-1] in by_title else node["sources"]
+        else:
+            for subtopic in node.get("subtopics", []):
+                collect(subtopic, path)
+    
+    def apply(node: Dict[str, Any], path: tuple) -> None:
+        path = path + (normalize_title(node["title"]),)
+        if _is_leaf(node):
+            sources = by_path.get(path) or by_title.get(path[-1])
+            if sources:
+                node["sources"] = sources
+        else:
+            for subtopic in node.get("subtopics", []):
+                apply(subtopic, path)
+    
+    collect(source_tree, ())
+    apply(target_tree, ())
+    propagate_sources(target_tree)
+
+def has_complete_sources(node: Dict[str, Any]) -> bool:
+    """True if every leaf of the subtree knows which references it came from."""
+    if _is_leaf(node):
+        return bool(node.get("sources"))
+    return all(has_complete_sources(subtopic) for subtopic in node.get("subtopics", []))
+
+def prune_references(node: Dict[str, Any], removed_ids: Set[str]) -> bool:
+    """
+    Remove the contributions of deleted references from a subtree.
+    
+    Leaves generated only from removed references are dropped, as are inner nodes left without
+    subtopics. Other nodes keep their resources.
+    
+    Args:
+        node: Root of the subtree
+        removed_ids: IDs of the removed references
+    
+    Returns:
+        False if nothing is left of the subtree
+    """
+    if _is_leaf(node):
+        node["sources"] = [source for source in node.get("sources", []) if source not in removed_ids]
+        return bool(node["sources"])
+    
+    node["subtopics"] = [
+        subtopic for subtopic in node.get("subtopics", [])
+        if prune_references(subtopic, removed_ids)
+    ]
+    node["sources"] = _union(*(subtopic.get("sources", []) for subtopic in node["subtopics"]))
+    return bool(node["subtopics"])
+
+def _find_subtopic(node: Dict[str, Any], title: str) -> Optional[Dict[str, Any]]:
+    normalized = normalize_title(title)
+    for subtopic in node.get("subtopics", []):
+        if normalize_title(subtopic["title"]) == normalized:
+            return subtopic
+    return None
+
+def _merge_nodes(target: Dict[str, Any], node: Dict[str, Any]) -> None:
+    target["sources"] = _union(target.get("sources", []), node.get("sources", []))
+    
+    # A leaf on either side keeps the existing node (and its resources) as it is
+    if _is_leaf(target) or _is_leaf(node):
+        return
+    
+    for subtopic in node.get("subtopics", []):
+        match = _find_subtopic(target, subtopic["title"])
+        if match is not None:
+            _merge_nodes(match, subtopic)
+        else:
+            target.setdefault("subtopics", []).append(subtopic)
+
+def merge_outline_into(tree: Dict[str, Any], outline: Dict[str, Any]) -> None:
+    """
+    Merge the outline of new content into an existing mindmap.
+    
+    Subtopics are matched by title; matching subtrees are merged recursively and everything else
+    is appended, so existing nodes and their resources are never rewritten.
+    
+    Args:
+        tree: The existing mindmap, modified in place
+        outline: Outline of the new content
+    """
+    if normalize_title(tree["title"]) == normalize_title(outline["title"]):
+        _merge_nodes(tree, outline)
+        return
+    
+    match = _find_subtopic(tree, outline["title"])
+    if match is not None:
+        _merge_nodes(match, outline)
+    else:
+        tree.setdefault("subtopics", []).append(outline)
+    tree["sources"] = _union(tree.get("sources", []), outline.get("sources", []))
+
+def attach_resources(leaf: Dict[str, Any], videos: List[Dict[str, Any]], include_notes: bool = True) -> None:
+    """
+    Attach videos and notes to a new leaf without a refiner call.
+    
+    Args:
+        leaf: The leaf node, modified in place
+        videos: YouTube search results for the leaf, best first
+        include_notes: Whether to turn the leaf's outline notes into a notes resource
+    """
+    resources = [{"type": "youtube", "data": video} for video in videos[:MAX_VIDEOS_PER_LEAF]]
+    
+    notes = leaf.pop("notes", None)
+    if notes and include_notes:
+        resources.append({"type": "notes", "data": notes})
+    
+    leaf["resources"] = resources
@@ -0,0 +1,197 @@
+# Path: app/utils/mindmap/jobs.py
+# Description: Background mindmap generation jobs with progress tracking in MongoDB.
+
+import uuid, time, contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.llm import LLMUnavailableError
+from app.utils.metrics import get_metrics
+from app.utils.models import MindmapJobStatusEnum, MindmapJobStageEnum
+from app.utils.mongodb import get_mongodb_client, get_async_mongodb_client
+from app.utils.postgres.base import Session
+from app.utils.request import CancelToken, RequestCancelledError, set_cancel_token
+from .pipeline import MindmapGenerationError, generate_mindmap
+from .streaming import EventCallback, emit_event, set_event_sink
+from .response_cache import set_cache_bypass
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+
+# Attempts at inserting a job before giving up on the race with a concurrent submitter
+MAX_SUBMIT_ATTEMPTS = 3
+
+class MindmapJobManager:
+    """
+    Runs mindmap generation in the background, at most one active job per exam.
+    
+    Jobs are stored in MongoDB so that every worker sees the same state. A unique partial index on
+    `exam_id` over active jobs makes concurrent submissions for one exam collapse into one job.
+    """
+    
+    def __init__(self):
+        self.mongodb_client = get_mongodb_client()
+        self.async_mongodb_client = get_async_mongodb_client()
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.MINDMAP_JOB_CONCURRENCY,
+            thread_name_prefix="mindmap-job",
+        )
+    
+    def submit(
+        self,
+        exam_id: uuid.UUID,
+        rebuild: bool = False,
+        listener: Optional[EventCallback] = None,
+        bypass_cache: bool = False,
+    ) -> Tuple[dict, bool]:
+        """
+        Start a mindmap generation job for an exam, or join the one already running.
+        
+        Args:
+            exam_id: UUID of the exam
+            rebuild: Whether to regenerate the mindmap from scratch instead of updating it
+            listener: Called with every event of the job, if it is started by this call
+            bypass_cache: Whether the job should call the model even for prompts it has answered before
+        
+        Returns:
+            The active job document, and whether it was started by this call
+        """
+        for _ in range(MAX_SUBMIT_ATTEMPTS):
+            active_job = self.mongodb_client.get_active_mindmap_job(str(exam_id))
+            if active_job is not None:
+                if not self._is_abandoned(active_job):
+                    logger.info(f"Joining mindmap job {active_job['_id']} for exam {exam_id}")
+                    metrics.increment("mindmap_jobs_collapsed_total")
+                    return active_job, False
+                
+                # The worker running this job died without finishing it
+                logger.warning(f"Mindmap job {active_job['_id']} for exam {exam_id} was abandoned")
+                self._finish(active_job["_id"], MindmapJobStatusEnum.FAILED, error="Mindmap generation was interrupted.")
+            
+            now = datetime.now(timezone.utc)
+            job = {
+                "_id": str(uuid.uuid4()),
+                "exam_id": str(exam_id),
+                "active": True,
+                "status": MindmapJobStatusEnum.QUEUED.value,
+                "stage": MindmapJobStageEnum.QUEUED.value,
+                "created_at": now,
+                "updated_at": now,
+            }
+            
+            if self.mongodb_client.insert_mindmap_job(job):
+                # The deadline starts now so that time spent queued counts against it
+                token = CancelToken(settings.MINDMAP_JOB_DEADLINE_SECONDS)
+                
+                # Run in a copy of the current context so usage is attributed to the submitting route and exam
+                self.executor.submit(
+                    contextvars.copy_context().run, self._run, job["_id"], exam_id, rebuild, token, listener, bypass_cache
+                )
+                
+                logger.info(f"Started mindmap job {job['_id']} for exam {exam_id}")
+                metrics.increment("mindmap_jobs_started_total")
+                return job, True
+        
+        raise RuntimeError(f"Could not start or join a mindmap job for exam {exam_id}")
+    
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        """
+        Get a mindmap generation job.
+        
+        Args:
+            job_id: ID of the job
+        
+        Returns:
+            The job document or None if not found
+        """
+        return await self.async_mongodb_client.get_mindmap_job(job_id)
+    
+    def _run(
+        self,
+        job_id: str,
+        exam_id: uuid.UUID,
+        rebuild: bool,
+        token: CancelToken,
+        listener: Optional[EventCallback] = None,
+        bypass_cache: bool = False,
+    ) -> None:
+        set_cancel_token(token)
+        set_event_sink(listener)
+        set_cache_bypass(bypass_cache)
+        start_time = time.perf_counter()
+        
+        def progress(stage: MindmapJobStageEnum, completed: Optional[int] = None, total: Optional[int] = None) -> None:
+            try:
+                self.mongodb_client.update_mindmap_job(job_id, {
+                    "status": MindmapJobStatusEnum.RUNNING.value,
+                    "stage": stage.value,
+                    "completed": completed,
+                    "total": total,
+                })
+            except Exception as e:
+                # Progress reporting must never fail the job itself
+                logger.warning(f"Error updating progress of mindmap job {job_id}: {str(e)}")
+            emit_event("stage", stage=stage.value, completed=completed, total=total)
+        
+        db = Session()
+        try:
+            token.raise_if_cancelled()
+            mindmap = generate_mindmap(db, exam_id, progress, rebuild=rebuild)
+            self._finish(job_id, MindmapJobStatusEnum.COMPLETED)
+            emit_event("done", mindmap=mindmap)
+            logger.info(f"Mindmap job {job_id} for exam {exam_id} completed")
+        
+        except RequestCancelledError:
+            logger.warning(f"Mindmap job {job_id} for exam {exam_id} exceeded its deadline")
+            self._finish(job_id, MindmapJobStatusEnum.FAILED, error="Mindmap generation timed out.")
+        
+        except LLMUnavailableError as e:
+            logger.error(f"Mindmap LLM unavailable: {str(e)}")
+            self._finish(job_id, MindmapJobStatusEnum.FAILED, error="Mindmap model is busy, please try again later.")
+        
+        except MindmapGenerationError as e:
+            logger.error(f"Mindmap job {job_id} failed: {str(e)}")
+            self._finish(job_id, MindmapJobStatusEnum.FAILED, error=str(e))
+        
+        except Exception as e:
+            logger.error(f"Error generating mindmap: {str(e)}")
+            self._finish(job_id, MindmapJobStatusEnum.FAILED, error=f"Failed to generate mindmap: {str(e)}")
+        
+        finally:
+            db.close()
+            metrics.observe("mindmap_job_seconds", time.perf_counter() - start_time)
+    
+    def _finish(self, job_id: str, job_status: MindmapJobStatusEnum, error: Optional[str] = None) -> None:
+        metrics.increment("mindmap_jobs_finished_total", status=job_status.value)
+        try:
+            self.mongodb_client.update_mindmap_job(
+                job_id,
+                {
+                    "status": job_status.value,
+                    "stage": MindmapJobStageEnum.DONE.value,
+                    "error": error,
+                },
+                finished=True,
+            )
+        except Exception as e:
+            logger.error(f"Error finishing mindmap job {job_id}: {str(e)}")
+        
+        if error is not None:
+            emit_event("error", detail=error)
+    
+    def _is_abandoned(self, job: dict) -> bool:
+        # A live job never outlives its deadline, so an older active job has lost its worker
+        created_at = job["created_at"]
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        max_age = timedelta(seconds=settings.MINDMAP_JOB_DEADLINE_SECONDS + settings.MINDMAP_JOB_ABANDON_GRACE_SECONDS)
+        return datetime.now(timezone.utc) - created_at > max_age
+
+@lru_cache
+def get_mindmap_job_manager() -> MindmapJobManager:
+    """Get a singleton instance of the mindmap job manager."""
+    return MindmapJobManager()
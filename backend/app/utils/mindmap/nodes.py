@@ -0,0 +1,188 @@
+# Path: app/utils/mindmap/nodes.py
+# Description: Flattened storage of mindmap nodes and loading of whole mindmaps, subtrees and single nodes.
+
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.mongodb import get_mongodb_client, get_async_mongodb_client
+from .notes import resolve_node_path
+
+mongodb_client = get_mongodb_client()
+async_mongodb_client = get_async_mongodb_client()
+
+# Bookkeeping fields of a stored node, not part of the mindmap format
+NODE_FIELDS = ("path", "parent_path", "depth", "position", "child_count")
+
+def flatten_mindmap(mindmap: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten a mindmap into one document per node.
+    
+    Every node gets its materialized path of subtopic indices ("" for the root, e.g. "0.2.1" below
+    it), the path of its parent, its depth and its position among its siblings. Nodes that have
+    subtopics get their number in `child_count`.
+    
+    Args:
+        mindmap: The mindmap
+    
+    Returns:
+        The nodes, parents before their children
+    """
+    nodes = []
+    
+    def visit(node: Dict[str, Any], path: str, parent_path: Optional[str], depth: int, position: int) -> None:
+        flat = {key: value for key, value in node.items() if key != "subtopics"}
+        flat.update(path=path, parent_path=parent_path, depth=depth, position=position)
+        if "subtopics" in node:
+            flat["child_count"] = len(node["subtopics"])
+        nodes.append(flat)
+        
+        for index, subtopic in enumerate(node.get("subtopics", [])):
+            visit(subtopic, f"{path}.{index}" if path else str(index), path, depth + 1, index)
+    
+    visit(mindmap, "", None, 0, 0)
+    return nodes
+
+def assemble_mindmap(nodes: List[Dict[str, Any]], keep_paths: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Rebuild a tree from flattened nodes.
+    
+    Args:
+        nodes: The nodes of a subtree, its root being the only node of the lowest depth
+        keep_paths: Whether to keep `path` and `child_count` on every node, e.g. for lazy expansion
+    
+    Returns:
+        The root of the subtree, or None without nodes
+    """
+    kept_fields = ("path", "child_count") if keep_paths else ()
+    nodes_by_path = {}
+    root = None
+    
+    for flat in sorted(nodes, key=lambda node: (node["depth"], node["position"])):
+        node = {key: value for key, value in flat.items() if key not in NODE_FIELDS or key in kept_fields}
+        # Children deeper than the fetched levels are left out, `child_count` tells there are more
+        if "child_count" in flat:
+            node["subtopics"] = []
+        nodes_by_path[flat["path"]] = node
+        
+        if root is None:
+            root = node
+            continue
+        
+        parent = nodes_by_path.get(flat["parent_path"])
+        if parent is not None:
+            parent["subtopics"].append(node)
+    
+    return root
+
+def load_mindmap(exam_id: uuid.UUID, document: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load the document of a mindmap with its whole tree in `mindmap`.
+    
+    Args:
+        exam_id: UUID of the exam
+        document: The mindmap document, if already retrieved
+    
+    Returns:
+        The mindmap document or None if not found
+    """
+    document = document or mongodb_client.get_mindmap(exam_id)
+    if document is None or document.get("mindmap") is not None:
+        return document
+    
+    nodes = mongodb_client.get_mindmap_nodes(exam_id, document["version"])
+    if not nodes and document.get("node_count"):
+        # Replaced twice since it was read, so its nodes are gone; read the current document once more
+        document = mongodb_client.get_mindmap(exam_id)
+        if document is None or document.get("mindmap") is not None:
+            return document
+        nodes = mongodb_client.get_mindmap_nodes(exam_id, document["version"])
+    
+    return {**document, "mindmap": assemble_mindmap(nodes)}
+
+async def aload_mindmap(exam_id: uuid.UUID, document: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Async counterpart of `load_mindmap`, for async endpoints."""
+    document = document or await async_mongodb_client.get_mindmap(exam_id)
+    if document is None or document.get("mindmap") is not None:
+        return document
+    
+    nodes = await async_mongodb_client.get_mindmap_nodes(exam_id, document["version"])
+    if not nodes and document.get("node_count"):
+        document = await async_mongodb_client.get_mindmap(exam_id)
+        if document is None or document.get("mindmap") is not None:
+            return document
+        nodes = await async_mongodb_client.get_mindmap_nodes(exam_id, document["version"])
+    
+    return {**document, "mindmap": assemble_mindmap(nodes)}
+
+def _depth_of(node_path: str) -> int:
+    return len(node_path.split(".")) if node_path else 0
+
+def _is_valid_path(node_path: str) -> bool:
+    return not node_path or all(part.isdigit() for part in node_path.split("."))
+
+async def load_subtree(
+    exam_id: uuid.UUID,
+    document: Dict[str, Any],
+    node_path: str = "",
+    depth: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load the subtree under a node of a mindmap, down to a number of levels.
+    
+    Args:
+        exam_id: UUID of the exam
+        document: The mindmap document
+        node_path: Path of the subtree's root, "" for the whole mindmap
+        depth: Number of levels to load below the subtree's root, all of them if None
+    
+    Returns:
+        The subtree with `path` and `child_count` on every node, or None if the node does not exist
+    """
+    if not _is_valid_path(node_path):
+        return None
+    
+    max_depth = None if depth is None else _depth_of(node_path) + depth
+    
+    if document.get("mindmap") is not None:
+        # Mindmaps saved before nodes were stored separately are filtered in place
+        nodes = [
+            node for node in flatten_mindmap(document["mindmap"])
+            if (not node_path or node["path"] == node_path or node["path"].startswith(node_path + "."))
+            and (max_depth is None or node["depth"] <= max_depth)
+        ]
+    else:
+        nodes = await async_mongodb_client.get_mindmap_nodes(exam_id, document["version"], root_path=node_path, max_depth=max_depth)
+    
+    return assemble_mindmap(nodes, keep_paths=True)
+
+async def load_node(
+    exam_id: uuid.UUID,
+    document: Dict[str, Any],
+    node_path: str,
+) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+    """
+    Load a single node of a mindmap by its path of child indices, e.g. "0.2.1".
+    
+    Only the node and its ancestors are read.
+    
+    Args:
+        exam_id: UUID of the exam
+        document: The mindmap document
+        node_path: Dot-separated subtopic indices from the root down to the node
+    
+    Returns:
+        The node without its subtopics and the titles from the root down to it, or None if the path
+        does not exist
+    """
+    if document.get("mindmap") is not None:
+        return resolve_node_path(document["mindmap"], node_path)
+    
+    if not node_path or not _is_valid_path(node_path):
+        return None
+    
+    parts = node_path.split(".")
+    ancestor_paths = [""] + [".".join(parts[:index]) for index in range(1, len(parts) + 1)]
+    nodes = await async_mongodb_client.get_mindmap_nodes(exam_id, document["version"], paths=ancestor_paths)
+    if len(nodes) != len(ancestor_paths):
+        return None
+    
+    return assemble_mindmap(nodes[-1:]), [node["title"] for node in nodes]
@@ -0,0 +1,136 @@
+# Path: app/utils/mindmap/notes.py
+# Description: On-demand notes generation for single mindmap leaves, cached in MongoDB.
+
+import uuid, hashlib
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.llm import get_llm_gateway
+from app.utils.metrics import get_metrics
+from app.utils.milvus import get_milvus_client
+from app.utils.mongodb import get_async_mongodb_client
+from app.utils.postgres import Reference
+from app.utils.workload import get_workload_pool
+from .prompts import MINDMAP_NOTES_PROMPT
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+llm_gateway = get_llm_gateway()
+milvus_client = get_milvus_client()
+async_mongodb_client = get_async_mongodb_client()
+
+def resolve_node_path(mindmap: Dict[str, Any], node_path: str) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+    """
+    Find a node of a mindmap by its path of child indices, e.g. "0.2.1".
+    
+    Args:
+        mindmap: The mindmap
+        node_path: Dot-separated subtopic indices from the root down to the node
+    
+    Returns:
+        The node and the titles from the root down to it, or None if the path does not exist
+    """
+    node = mindmap
+    titles = [mindmap["title"]]
+    for part in node_path.split("."):
+        if not part.isdigit():
+            return None
+        
+        subtopics = node.get("subtopics", [])
+        index = int(part)
+        if index >= len(subtopics):
+            return None
+        
+        node = subtopics[index]
+        titles.append(node["title"])
+    
+    return node, titles
+
+def _notes_key(exam_id: uuid.UUID, titles: List[str], sources: List[str]) -> str:
+    # Keyed by content rather than position, so notes survive updates that leave the leaf untouched
+    digest = hashlib.sha1("\x1f".join(titles + ["|"] + sorted(sources)).encode("utf-8")).hexdigest()
+    return f"{exam_id}:{digest}"
+
+def _search_leaf_chunk_ids(reference_ids: List[str], titles: List[str]) -> List[str]:
+    # Blocking embedding and Milvus SDK calls, run on the mindmap workload's threads
+    query_embedding = llm_gateway.create_embeddings([" > ".join(titles)], cache=True)[0]
+    hits = milvus_client.search_vector(
+        query_vector=query_embedding,
+        reference_ids=reference_ids,
+        limit=settings.MINDMAP_NOTES_CHUNKS,
+        threshold=settings.MINDMAP_NOTES_MAX_DISTANCE,
+    )
+    return [str(hit.id) for hit in hits]
+
+async def retrieve_leaf_chunks(db: AsyncSession, exam_id: uuid.UUID, leaf: Dict[str, Any], titles: List[str]) -> List[str]:
+    """
+    Retrieve the chunks most related to a leaf from its own references.
+    
+    Args:
+        db: Async database session
+        exam_id: UUID of the exam
+        leaf: The leaf node
+        titles: Titles from the root down to the leaf
+    
+    Returns:
+        Contents of the most similar chunks, most similar first
+    """
+    reference_ids = leaf.get("sources") or [
+        str(reference_id)
+        for reference_id in (await db.execute(select(Reference.id).where(Reference.exam_id == exam_id))).scalars()
+    ]
+    if not reference_ids:
+        return []
+    
+    chunk_ids = await get_workload_pool("mindmap").run(_search_leaf_chunk_ids, reference_ids, titles)
+    chunks = await async_mongodb_client.get_chunks(chunk_ids)
+    return [chunks[chunk_id].content for chunk_id in chunk_ids if chunk_id in chunks]
+
+async def get_leaf_notes(
+    db: AsyncSession,
+    exam_id: uuid.UUID,
+    leaf: Dict[str, Any],
+    titles: List[str],
+) -> Tuple[str, bool]:
+    """
+    Get the notes of a mindmap leaf, generating and caching them on first use.
+    
+    Args:
+        db: Async database session
+        exam_id: UUID of the exam
+        leaf: The leaf node
+        titles: Titles from the root down to the leaf
+    
+    Returns:
+        The notes, and whether they were already available
+    """
+    # Mindmaps generated with notes already carry them
+    for resource in leaf.get("resources", []):
+        if resource.get("type") == "notes" and resource.get("data"):
+            return resource["data"], True
+    
+    key = _notes_key(exam_id, titles, leaf.get("sources", []))
+    cached_notes = await async_mongodb_client.get_mindmap_notes(key)
+    if cached_notes is not None:
+        metrics.increment("mindmap_notes_requests_total", result="hit")
+        return cached_notes, True
+    
+    metrics.increment("mindmap_notes_requests_total", result="miss")
+    chunks = await retrieve_leaf_chunks(db, exam_id, leaf, titles)
+    excerpts = "\n\n".join(chunks) if chunks else "No related excerpts were found in the study material."
+    
+    logger.info(f"Generating notes for '{titles[-1]}' of exam {exam_id} from {len(chunks)} chunks")
+    response = await llm_gateway.achat_completion(
+        "mindmap",
+        messages=[
+            {"role": "system", "content": MINDMAP_NOTES_PROMPT},
+            {"role": "user", "content": f"Topic path:\n{' > '.join(titles)}\n\nExcerpts:\n{excerpts}"}
+        ]
+    )
+    notes = response.choices[0].message.content
+    
+    await async_mongodb_client.insert_mindmap_notes(key, exam_id, notes)
+    return notes, False
@@ -0,0 +1,969 @@
+# Path: app/utils/mindmap/pipeline.py
+# Description: Mindmap generation pipeline: content loading, LLM generation, YouTube search and refinement.
+
+import copy, uuid, json, contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.llm import get_llm_gateway
+from app.utils.metrics import get_metrics
+from app.utils.milvus import get_milvus_client
+from app.utils.models import MindmapJobStageEnum
+from app.utils.mongodb import get_mongodb_client
+from app.utils.postgres import Reference, Chunks
+from app.utils.request import RequestCancelledError, get_cancel_token
+from app.utils.youtube import get_youtube_search_service, normalize_search_query
+from .incremental import (
+    MAX_VIDEOS_PER_LEAF,
+    attach_resources,
+    copy_sources,
+    has_complete_sources,
+    merge_outline_into,
+    normalize_title,
+    propagate_sources,
+    prune_references,
+    tag_sources,
+)
+from .ranking import rank_videos
+from .fingerprint import compute_etag, load_exam_fingerprint
+from .nodes import flatten_mindmap, load_mindmap
+from .response_cache import cached_completion
+from .validation import TRUNCATED_KEY, MindmapOutputError, parse_mindmap_json, repair_mindmap
+from .streaming import SubtopicStreamParser, emit_event
+from .prompts import (
+    MINDMAP_GENERATOR_PROMPT,
+    MINDMAP_REFINER_PROMPT,
+    MINDMAP_VIDEO_REFINER_PROMPT,
+    MINDMAP_PARTIAL_PROMPT,
+    MINDMAP_MERGE_PROMPT,
+    MINDMAP_SUBTREE_PROMPT,
+)
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+llm_gateway = get_llm_gateway()
+milvus_client = get_milvus_client()
+mongodb_client = get_mongodb_client()
+youtube_search_service = get_youtube_search_service()
+
+# Bounded pool shared by all mindmap jobs for YouTube leaf searches
+youtube_search_executor = ThreadPoolExecutor(
+    max_workers=settings.YOUTUBE_SEARCH_CONCURRENCY,
+    thread_name_prefix="youtube-search",
+)
+
+# Bounded pool shared by all mindmap jobs for concurrent outline and refinement calls
+mindmap_llm_executor = ThreadPoolExecutor(
+    max_workers=settings.MINDMAP_LLM_MAX_CONCURRENCY,
+    thread_name_prefix="mindmap-llm",
+)
+
+# Rough characters-per-token ratio of English text, good enough to pick a generation mode
+CHARS_PER_TOKEN = 4
+
+# All mindmap LLM calls answer in JSON mode
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Called with the current stage and, where known, how many of its steps are done
+ProgressCallback = Callable[[MindmapJobStageEnum, Optional[int], Optional[int]], None]
+
+class MindmapGenerationError(Exception):
+    """Raised when a mindmap cannot be generated from the exam's content."""
+
+@dataclass
+class ContentGroup:
+    """Consecutive chunks of one reference, the unit of content sent to the LLM in one call."""
+    reference_id: str
+    reference_name: str
+    chunk_ids: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    
+    @property
+    def text(self) -> str:
+        return "\n\n".join(self.contents)
+
+def _no_progress(stage: MindmapJobStageEnum, completed: Optional[int] = None, total: Optional[int] = None) -> None:
+    pass
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text."""
+    return len(text) // CHARS_PER_TOKEN
+
+def _collect(futures: Dict[Future, Any], handle: Callable[[Any, Future], None]) -> None:
+    """
+    Wait for futures and pass each one to `handle` as soon as it completes.
+    
+    Stops waiting as soon as the job is cancelled and drops futures that have not started yet.
+    
+    Args:
+        futures: Futures mapped to the key passed to `handle`
+        handle: Called with the key and the completed future
+    """
+    token = get_cancel_token()
+    pending = set(futures)
+    try:
+        while pending:
+            if token is not None:
+                token.raise_if_cancelled()
+            
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                handle(futures[future], future)
+    finally:
+        for future in pending:
+            future.cancel()
+
+def _cached_json(messages: List[dict], complete: Callable[[], str], salvage: bool) -> Tuple[Dict[str, Any], bool]:
+    """
+    Answer a mindmap JSON request through the LLM response cache, salvaging truncated output.
+    
+    Args:
+        messages: Messages sent to the model
+        complete: Sends the request to the model and returns the response content
+        salvage: Whether to recover what is parsable from invalid output instead of failing
+    
+    Returns:
+        The parsed JSON object, and whether it came from the cache
+    """
+    try:
+        return cached_completion(
+            llm_gateway.profiles["mindmap"].model,
+            messages,
+            JSON_RESPONSE_FORMAT,
+            complete,
+            parse_mindmap_json,
+        )
+    except MindmapOutputError as e:
+        if not salvage or e.salvaged is None:
+            raise
+        
+        logger.warning(f"Salvaging truncated mindmap output: {str(e)}")
+        metrics.increment("mindmap_json_salvaged_total")
+        # Mark nodes cut off mid-way as incomplete before anything mistakes them for leaves
+        repair_mindmap(e.salvaged, salvaged=True)
+        return e.salvaged, False
+
+def _complete_json(system_prompt: str, user_content: str, salvage: bool = False) -> Dict[str, Any]:
+    """
+    Call the mindmap model in JSON mode and parse its answer.
+    
+    Identical requests are answered from the LLM response cache.
+    
+    Args:
+        system_prompt: The system prompt
+        user_content: The user message
+        salvage: Whether to recover what is parsable from invalid output instead of failing
+    
+    Returns:
+        The parsed JSON object
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+    
+    def complete() -> str:
+        response = llm_gateway.chat_completion("mindmap", messages=messages, response_format=JSON_RESPONSE_FORMAT)
+        content = response.choices[0].message.content
+        return content if isinstance(content, str) else json.dumps(content)
+    
+    parsed, _ = _cached_json(messages, complete, salvage)
+    return parsed
+
+def _stream_json(system_prompt: str, user_content: str) -> Dict[str, Any]:
+    """
+    Call the mindmap model in JSON mode, emitting each top-level subtopic as soon as it is complete.
+    
+    Identical requests are answered from the LLM response cache, emitting all subtopics at once.
+    Truncated output is salvaged.
+    
+    Args:
+        system_prompt: The system prompt
+        user_content: The user message
+    
+    Returns:
+        The parsed JSON object
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+    emitted = 0
+    
+    def complete() -> str:
+        nonlocal emitted
+        parser = SubtopicStreamParser()
+        deltas = []
+        for delta in llm_gateway.stream_chat_completion("mindmap", messages=messages, response_format=JSON_RESPONSE_FORMAT):
+            deltas.append(delta)
+            for subtopic in parser.feed(delta):
+                emit_event("outline", index=emitted, subtopic=subtopic)
+                emitted += 1
+        return "".join(deltas)
+    
+    parsed, cached = _cached_json(messages, complete, salvage=True)
+    if cached:
+        for index, subtopic in enumerate(parsed.get("subtopics", [])):
+            emit_event("outline", index=index, subtopic=subtopic)
+    return parsed
+
+def search_youtube(query: str, max_results: int = 3) -> List[Dict[str, Any]]:
+    """
+    Search YouTube for videos related to the given query
+    
+    Results are served from the persistent YouTube cache whenever possible.
+    
+    Args:
+        query: The search term
+        max_results: Maximum number of results to return
+    
+    Returns:
+        List of video information dictionaries
+    """
+    return youtube_search_service.search_videos(query, max_results=max_results)
+
+def extract_leaf_nodes(mindmap: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Extract all leaf nodes from the mindmap
+    
+    Args:
+        mindmap: The mindmap structure
+    
+    Returns:
+        List of leaf nodes with their title paths and their node paths of subtopic indices
+    """
+    leaf_nodes = []
+    
+    def traverse(node, path=[], indices=[]):
+        if node.get("is_last_subtopic", False):
+            leaf_nodes.append({
+                "node": node,
+                "path": path + [node["title"]],
+                "node_path": ".".join(indices)
+            })
+        else:
+            for index, subtopic in enumerate(node.get("subtopics", [])):
+                traverse(subtopic, path + [node["title"]], indices + [str(index)])
+    
+    traverse(mindmap)
+    return leaf_nodes
+
+def find_videos_for_leaf_nodes(
+    leaf_nodes: List[Dict[str, Any]],
+    progress: ProgressCallback = _no_progress,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Search YouTube for videos for each leaf node
+    
+    Identical leaf titles are searched once. Searches run concurrently on a bounded pool shared by
+    all jobs; a failed or timed out search leaves its leaves without videos instead of failing
+    the whole mindmap. A "leaf" event with the first results is emitted for every leaf as soon as
+    its search completes.
+    
+    Args:
+        leaf_nodes: List of leaf nodes
+        progress: Called with the number of finished searches as they complete
+    
+    Returns:
+        Dictionary mapping paths to video results
+    """
+    # Deduplicate leaf titles before searching
+    queries = {}
+    leaves_by_query = {}
+    for leaf in leaf_nodes:
+        query = normalize_search_query(leaf["node"]["title"])
+        queries.setdefault(query, leaf["node"]["title"])
+        leaves_by_query.setdefault(query, []).append(leaf)
+    
+    logger.info(f"Searching YouTube for {len(queries)} unique topics ({len(leaf_nodes)} leaf nodes)")
+    progress(MindmapJobStageEnum.SEARCHING_VIDEOS, 0, len(queries))
+    
+    # Fetch extra candidates when they are ranked locally, a search costs the same quota either way
+    max_results = settings.MINDMAP_VIDEO_CANDIDATES if settings.MINDMAP_VIDEO_RANKING == "embeddings" else MAX_VIDEOS_PER_LEAF
+    
+    # Run each search in a copy of the current context so it sees the job's cancel token and tags
+    futures = {
+        youtube_search_executor.submit(contextvars.copy_context().run, search_youtube, title, max_results): query
+        for query, title in queries.items()
+    }
+    
+    videos_by_query = {}
+    
+    def handle(query: str, future: Future) -> None:
+        try:
+            videos_by_query[query] = future.result()
+        except RequestCancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"YouTube search failed for '{queries[query]}' (continuing without videos): {str(e)}")
+            metrics.increment("youtube_search_failures_total")
+            videos_by_query[query] = []
+        
+        for leaf in leaves_by_query[query]:
+            emit_event("leaf", node_path=leaf["node_path"], videos=videos_by_query[query][:MAX_VIDEOS_PER_LEAF])
+        progress(MindmapJobStageEnum.SEARCHING_VIDEOS, len(videos_by_query), len(queries))
+    
+    _collect(futures, handle)
+    
+    results = {}
+    for leaf in leaf_nodes:
+        path_str = " > ".join(leaf["path"])
+        results[path_str] = videos_by_query.get(normalize_search_query(leaf["node"]["title"]), [])
+    
+    return results
+
+def select_videos(video_results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Pick the videos of each leaf according to `MINDMAP_VIDEO_RANKING`.
+    
+    With "embeddings", the candidates are ranked locally by similarity to the leaf path. Otherwise,
+    or if ranking fails, every candidate is kept for the refiner to choose from.
+    
+    Args:
+        video_results: Candidate videos of each leaf, keyed by path
+    
+    Returns:
+        The selected videos of each leaf, keyed by path
+    """
+    if settings.MINDMAP_VIDEO_RANKING != "embeddings" or not video_results:
+        return video_results
+    
+    try:
+        return rank_videos(video_results, MAX_VIDEOS_PER_LEAF)
+    except RequestCancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Ranking videos by embeddings failed (keeping search order): {str(e)}")
+        metrics.increment("mindmap_video_ranking_failures_total")
+        return video_results
+
+def load_exam_content(db: Session, exam_id: uuid.UUID) -> List[ContentGroup]:
+    """
+    Load the content of every chunk of an exam's references.
+    
+    Args:
+        db: Database session
+        exam_id: UUID of the exam
+    
+    Returns:
+        One content group per reference with chunks in order (references without content are omitted)
+    """
+    references = (
+        db.query(Reference)
+        .filter(Reference.exam_id == exam_id)
+        .order_by(Reference.file_name, Reference.id)
+        .all()
+    )
+    references_by_id = {reference.id: reference for reference in references}
+    
+    # Get all chunks of all references in one query
+    chunks = (
+        db.query(Chunks)
+        .filter(Chunks.reference_id.in_(list(references_by_id)))
+        .order_by(Chunks.reference_id, Chunks.chunk_number)
+        .all()
+    )
+    
+    # Get chunk content from MongoDB in one query
+    mongo_chunks = mongodb_client.get_chunks([chunk.id for chunk in chunks])
+    
+    groups = {
+        reference.id: ContentGroup(reference_id=str(reference.id), reference_name=reference.file_name)
+        for reference in references
+    }
+    for chunk in chunks:
+        mongo_chunk = mongo_chunks.get(str(chunk.id))
+        if mongo_chunk is None:
+            logger.error(f"Chunk {chunk.id} not found in MongoDB.")
+            continue
+        
+        groups[chunk.reference_id].chunk_ids.append(str(chunk.id))
+        groups[chunk.reference_id].contents.append(mongo_chunk.content)
+    
+    return [groups[reference.id] for reference in references if groups[reference.id].contents]
+
+def split_content_groups(groups: List[ContentGroup], max_tokens: int) -> List[ContentGroup]:
+    """
+    Split content groups so that none exceeds a token budget.
+    
+    Groups never span references; a single chunk larger than the budget becomes its own group.
+    
+    Args:
+        groups: Content groups, one per reference
+        max_tokens: Token budget of a group
+    
+    Returns:
+        The split content groups
+    """
+    split_groups = []
+    for group in groups:
+        current = ContentGroup(reference_id=group.reference_id, reference_name=group.reference_name)
+        current_tokens = 0
+        
+        for chunk_id, content in zip(group.chunk_ids, group.contents):
+            tokens = estimate_tokens(content)
+            if current.contents and current_tokens + tokens > max_tokens:
+                split_groups.append(current)
+                current = ContentGroup(reference_id=group.reference_id, reference_name=group.reference_name)
+                current_tokens = 0
+            
+            current.chunk_ids.append(chunk_id)
+            current.contents.append(content)
+            current_tokens += tokens
+        
+        if current.contents:
+            split_groups.append(current)
+    
+    return split_groups
+
+def generate_partial_outlines(
+    groups: List[ContentGroup],
+    progress: ProgressCallback = _no_progress,
+) -> List[Dict[str, Any]]:
+    """
+    Generate an outline for each content group concurrently.
+    
+    Every node of an outline is tagged with the reference of its group. Subtrees missing from
+    truncated outlines are requested again.
+    
+    Args:
+        groups: Content groups to outline
+        progress: Called with the number of finished outlines as they complete
+    
+    Returns:
+        The outlines, in the order of the groups
+    """
+    logger.info(f"Generating {len(groups)} partial outlines")
+    progress(MindmapJobStageEnum.GENERATING, 0, len(groups))
+    
+    # Run each call in a copy of the current context so it sees the job's cancel token and tags
+    futures = {
+        mindmap_llm_executor.submit(
+            contextvars.copy_context().run,
+            _complete_json,
+            MINDMAP_PARTIAL_PROMPT,
+            f"Reference Name: {group.reference_name}\n\nGenerate an outline for the following content:\n\n{group.text}",
+            True,
+        ): index
+        for index, group in enumerate(groups)
+    }
+    
+    outlines = {}
+    
+    def handle(index: int, future: Future) -> None:
+        outlines[index] = future.result()
+        progress(MindmapJobStageEnum.GENERATING, len(outlines), len(groups))
+    
+    _collect(futures, handle)
+    
+    for index, group in enumerate(groups):
+        complete_missing_subtrees(outlines[index], lambda subtree: group.text)
+        tag_sources(outlines[index], group.reference_id)
+    
+    return [outlines[index] for index in range(len(groups))]
+
+def merge_outlines(outlines: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge partial outlines into a single mindmap hierarchy.
+    
+    Args:
+        outlines: The partial outlines
+    
+    Returns:
+        The merged mindmap
+    """
+    if len(outlines) == 1:
+        return outlines[0]
+    
+    logger.info(f"Merging {len(outlines)} partial outlines")
+    partial_outlines = "\n\n".join(
+        f"Partial outline {index + 1}:\n{json.dumps(outline)}"
+        for index, outline in enumerate(outlines)
+    )
+    return _complete_json(MINDMAP_MERGE_PROMPT, f"Merge the following partial outlines:\n\n{partial_outlines}", salvage=True)
+
+def refine_subtree(
+    subtree: Dict[str, Any],
+    video_results: Dict[str, List[Dict[str, Any]]],
+    notes: str,
+) -> Dict[str, Any]:
+    """
+    Integrate videos and notes into one subtree of the mindmap with the refiner.
+    
+    Without `MINDMAP_INCLUDE_NOTES`, only videos are integrated; notes are generated per leaf on demand.
+    
+    Args:
+        subtree: The subtree to refine
+        video_results: Video results of the subtree's leaves, keyed by path
+        notes: Content the notes of the subtree's leaves are written from
+    
+    Returns:
+        The refined subtree
+    """
+    if not settings.MINDMAP_INCLUDE_NOTES:
+        return _complete_json(
+            MINDMAP_VIDEO_REFINER_PROMPT,
+            f"Initial mindmap:\n{subtree}\n\nVideo results:\n{video_results}"
+        )
+    
+    return _complete_json(
+        MINDMAP_REFINER_PROMPT,
+        f"Initial mindmap:\n{subtree}\n\nVideo results:\n{video_results}\n\nNotes:\n{notes}"
+    )
+
+def refine_mindmap(
+    mindmap: Dict[str, Any],
+    video_results: Dict[str, List[Dict[str, Any]]],
+    notes_for: Callable[[Dict[str, Any]], str],
+    progress: ProgressCallback = _no_progress,
+) -> Dict[str, Any]:
+    """
+    Refine every top-level subtree of the mindmap concurrently and stitch the results together.
+    
+    Each refiner call only receives its own subtree, the videos of its leaves and its notes. A
+    subtree whose refinement fails or comes back invalid keeps its structure and gets its videos
+    attached as searched.
+    A "subtree" event is emitted for every subtree as soon as it is refined.
+    
+    Args:
+        mindmap: The initial mindmap
+        video_results: Video results of every leaf, keyed by path
+        notes_for: Returns the notes content for a subtree
+        progress: Called with the number of refined subtrees as they complete
+    
+    Returns:
+        The refined mindmap
+    """
+    # A mindmap without subtopics is refined as a whole
+    subtrees = mindmap.get("subtopics", []) if not mindmap.get("is_last_subtopic", False) else []
+    if not subtrees:
+        progress(MindmapJobStageEnum.REFINING, None, None)
+        return refine_subtree(mindmap, video_results, notes_for(mindmap))
+    
+    def subtree_videos(subtree: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        videos = {}
+        for leaf in extract_leaf_nodes(subtree):
+            path_str = " > ".join([mindmap["title"]] + leaf["path"])
+            videos[path_str] = video_results.get(path_str, [])
+        return videos
+    
+    logger.info(f"Refining {len(subtrees)} subtrees")
+    progress(MindmapJobStageEnum.REFINING, 0, len(subtrees))
+    
+    # Run each call in a copy of the current context so it sees the job's cancel token and tags
+    futures = {
+        mindmap_llm_executor.submit(
+            contextvars.copy_context().run,
+            refine_subtree,
+            subtree,
+            subtree_videos(subtree),
+            notes_for(subtree),
+        ): index
+        for index, subtree in enumerate(subtrees)
+    }
+    
+    refined = {}
+    
+    def handle(index: int, future: Future) -> None:
+        try:
+            refined_subtree = future.result()
+            if repair_mindmap(refined_subtree):
+                raise MindmapOutputError("Refined subtree lost the subtopics of some nodes")
+            refined[index] = refined_subtree
+        except RequestCancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Refining subtree '{subtrees[index]['title']}' failed (keeping searched videos): {str(e)}")
+            metrics.increment("mindmap_refine_failures_total")
+            refined[index] = attach_videos(subtrees[index], video_results, [mindmap["title"]])
+        
+        emit_event("subtree", index=index, subtree=refined[index])
+        progress(MindmapJobStageEnum.REFINING, len(refined), len(subtrees))
+    
+    _collect(futures, handle)
+    
+    return {
+        "title": mindmap["title"],
+        "is_last_subtopic": False,
+        "subtopics": [refined[index] for index in range(len(subtrees))],
+    }
+
+def tag_sources_by_similarity(mindmap: Dict[str, Any], groups: List[ContentGroup]) -> None:
+    """
+    Tag the leaves of a mindmap generated from several references at once with the references of
+    their most similar chunks, and their ancestors with the union of those.
+    
+    Leaf paths are embedded in a single batched call, served from the embedding cache where possible.
+    Leaves without a similar enough chunk are left without sources.
+    
+    Args:
+        mindmap: The mindmap, modified in place
+        groups: Content the mindmap was generated from, one group per reference
+    """
+    leaves = extract_leaf_nodes(mindmap)
+    if not leaves:
+        return
+    
+    reference_ids = [group.reference_id for group in groups]
+    reference_of_chunk = {chunk_id: group.reference_id for group in groups for chunk_id in group.chunk_ids}
+    
+    try:
+        embeddings = llm_gateway.create_embeddings([" > ".join(leaf["path"]) for leaf in leaves], cache=True)
+        for leaf, embedding in zip(leaves, embeddings):
+            hits = milvus_client.search_vector(
+                query_vector=embedding,
+                reference_ids=reference_ids,
+                limit=settings.MINDMAP_NOTES_CHUNKS,
+                threshold=settings.MINDMAP_NOTES_MAX_DISTANCE,
+            )
+            sources = {reference_of_chunk[str(hit.id)] for hit in hits if str(hit.id) in reference_of_chunk}
+            if sources:
+                leaf["node"]["sources"] = sorted(sources)
+    except RequestCancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Tagging sources of mindmap '{mindmap['title']}' failed (sending subtrees all content): {str(e)}")
+        return
+    
+    propagate_sources(mindmap)
+
+def _content_of_sources(groups: List[ContentGroup], subtree: Dict[str, Any]) -> str:
+    # Content of the subtree's own references when they are known, within the budget of one outline call
+    sources = set(subtree.get("sources", []))
+    content = "\n\n".join(
+        content for group in groups if not sources or group.reference_id in sources for content in group.contents
+    )
+    return content[:settings.MINDMAP_MAP_GROUP_MAX_TOKENS * CHARS_PER_TOKEN]
+
+def complete_missing_subtrees(mindmap: Dict[str, Any], content_for: Callable[[Dict[str, Any]], str]) -> None:
+    """
+    Repair a generated mindmap and request the subtopics of its incomplete nodes again.
+    
+    Only incomplete nodes are requested, at most `MINDMAP_MAX_SUBTREE_REQUESTS` of them concurrently:
+    inner nodes left without subtopics, and nodes on the frontier of truncated output, whose existing
+    subtopics are sent along so that only the remaining ones are generated and appended. Nodes still
+    without subtopics afterwards become leaves, so that they still get videos.
+    
+    Args:
+        mindmap: The mindmap, modified in place
+        content_for: Returns the content the subtopics of a node are generated from
+    """
+    incomplete = repair_mindmap(mindmap)
+    if not incomplete:
+        return
+    
+    requested = incomplete[:settings.MINDMAP_MAX_SUBTREE_REQUESTS]
+    logger.info(f"Requesting {len(requested)} of {len(incomplete)} incomplete subtrees of mindmap '{mindmap['title']}' again")
+    
+    def subtree_request(item: Dict[str, Any]) -> str:
+        existing = "".join(f"- {subtopic['title']}\n" for subtopic in item["node"].get("subtopics", []))
+        existing = f"Existing subtopics:\n{existing}\n" if existing else ""
+        return f"Topic path:\n{' > '.join(item['path'])}\n\n{existing}Content:\n{content_for(item['node'])}"
+    
+    # Run each call in a copy of the current context so it sees the job's cancel token and tags
+    futures = {
+        mindmap_llm_executor.submit(
+            contextvars.copy_context().run,
+            _complete_json,
+            MINDMAP_SUBTREE_PROMPT,
+            subtree_request(item),
+            True,
+        ): index
+        for index, item in enumerate(requested)
+    }
+    
+    def handle(index: int, future: Future) -> None:
+        node = requested[index]["node"]
+        try:
+            subtree = future.result()
+            subtree["title"] = node["title"]
+            repair_mindmap(subtree)
+            existing_titles = {normalize_title(subtopic["title"]) for subtopic in node.get("subtopics", [])}
+            node["subtopics"] = node.get("subtopics", []) + [
+                subtopic for subtopic in subtree.get("subtopics", [])
+                if normalize_title(subtopic["title"]) not in existing_titles
+            ]
+            metrics.increment("mindmap_subtree_requests_total", result="completed")
+        except RequestCancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Requesting subtree '{node['title']}' again failed (keeping what it has): {str(e)}")
+            metrics.increment("mindmap_subtree_requests_total", result="failed")
+    
+    _collect(futures, handle)
+    
+    # Nodes beyond the limit or cut off again keep what they have
+    for item in repair_mindmap(mindmap):
+        node = item["node"]
+        node.pop(TRUNCATED_KEY, None)
+        if not node.get("subtopics"):
+            node["is_last_subtopic"] = True
+            node.pop("subtopics", None)
+
+def attach_videos(
+    subtree: Dict[str, Any],
+    video_results: Dict[str, List[Dict[str, Any]]],
+    parent_path: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Attach the selected videos to every leaf of a subtree without a refiner call.
+    
+    Args:
+        subtree: The subtree, left unchanged
+        video_results: Selected videos of every leaf, keyed by path
+        parent_path: Titles of the subtree's ancestors, none by default
+    
+    Returns:
+        A copy of the subtree with resources on its leaves
+    """
+    parent_path = parent_path or []
+    subtree = copy.deepcopy(subtree)
+    for leaf in extract_leaf_nodes(subtree):
+        videos = video_results.get(" > ".join(parent_path + leaf["path"]), [])
+        attach_resources(leaf["node"], videos, include_notes=settings.MINDMAP_INCLUDE_NOTES)
+    return subtree
+
+def generate_mindmap(
+    db: Session,
+    exam_id: uuid.UUID,
+    progress: ProgressCallback = _no_progress,
+    rebuild: bool = False,
+) -> Dict[str, Any]:
+    """
+    Generate or update the mindmap of an exam and save it to MongoDB.
+    
+    If a stored mindmap records which references it was built from, only the references added or
+    removed since are processed. Otherwise, or with `rebuild`, the mindmap is generated from scratch.
+    
+    Args:
+        db: Database session
+        exam_id: UUID of the exam
+        progress: Called whenever the pipeline enters a stage or makes progress within one
+        rebuild: Whether to ignore the stored mindmap
+    
+    Returns:
+        The final mindmap
+    
+    Raises:
+        MindmapGenerationError: If the exam has no chunk content
+    """
+    progress(MindmapJobStageEnum.LOADING_CONTENT, None, None)
+    # Taken before loading, so content changed during generation leaves the mindmap stale
+    fingerprint = load_exam_fingerprint(db, exam_id)
+    groups = load_exam_content(db, exam_id)
+    
+    if not groups:
+        raise MindmapGenerationError(f"No chunk content found for exam {exam_id}.")
+    
+    stored_mindmap = None if rebuild else load_mindmap(exam_id)
+    if stored_mindmap and stored_mindmap.get("provenance") is not None:
+        mindmap = update_mindmap(exam_id, stored_mindmap, groups, fingerprint, progress)
+        if mindmap is not None:
+            return mindmap
+        logger.info(f"Stored mindmap for exam {exam_id} cannot be updated in place, regenerating it")
+    
+    return build_mindmap(exam_id, groups, fingerprint, progress)
+
+def build_mindmap(
+    exam_id: uuid.UUID,
+    groups: List[ContentGroup],
+    fingerprint: str,
+    progress: ProgressCallback = _no_progress,
+) -> Dict[str, Any]:
+    """
+    Generate a mindmap from scratch and save it to MongoDB.
+    
+    Content that fits `MINDMAP_SINGLE_PASS_MAX_TOKENS` is outlined in a single call. Larger content
+    is split into groups of at most `MINDMAP_MAP_GROUP_MAX_TOKENS`, outlined concurrently and merged.
+    
+    A single-pass outline is streamed so that its top-level subtopics are emitted as "outline" events
+    while it is generated. The whole outline is emitted as a "skeleton" event before videos are searched.
+    
+    Args:
+        exam_id: UUID of the exam
+        groups: Content of the exam, one group per reference
+        fingerprint: Fingerprint of the exam's content, saved with the mindmap
+        progress: Called whenever the pipeline enters a stage or makes progress within one
+    
+    Returns:
+        The final mindmap
+    """
+    content_for_llm = "\n\n".join(content for group in groups for content in group.contents)
+    total_tokens = estimate_tokens(content_for_llm)
+    single_pass = total_tokens <= settings.MINDMAP_SINGLE_PASS_MAX_TOKENS
+    metrics.increment("mindmap_generations_total", mode="single_pass" if single_pass else "map_reduce")
+    
+    if single_pass:
+        # Generate initial mindmap using the LLM
+        logger.info(f"Generating initial mindmap for exam {exam_id} (~{total_tokens} tokens)")
+        progress(MindmapJobStageEnum.GENERATING, None, None)
+        initial_mindmap = _stream_json(
+            MINDMAP_GENERATOR_PROMPT,
+            f"Generate a mindmap for the following content:\n\n{content_for_llm}"
+        )
+        complete_missing_subtrees(initial_mindmap, lambda subtree: content_for_llm)
+        
+        # Content from several references is attributed leaf by leaf, by similarity to its chunks
+        if len(groups) == 1:
+            tag_sources(initial_mindmap, groups[0].reference_id)
+        else:
+            tag_sources_by_similarity(initial_mindmap, groups)
+        
+        def notes_for(subtree: Dict[str, Any]) -> str:
+            # Send each subtree the content of its own references when they are known
+            sources = set(subtree.get("sources", []))
+            if not sources:
+                return content_for_llm
+            return "\n\n".join(
+                content for group in groups if group.reference_id in sources for content in group.contents
+            )
+    else:
+        # Outline each part of the content separately, then merge the outlines
+        logger.info(f"Generating map-reduce mindmap for exam {exam_id} (~{total_tokens} tokens)")
+        outline_groups = split_content_groups(groups, settings.MINDMAP_MAP_GROUP_MAX_TOKENS)
+        outlines = generate_partial_outlines(outline_groups, progress)
+        progress(MindmapJobStageEnum.MERGING, None, None)
+        initial_mindmap = merge_outlines(outlines)
+        complete_missing_subtrees(initial_mindmap, lambda subtree: _content_of_sources(groups, subtree))
+        propagate_sources(initial_mindmap)
+        
+        # The full content does not fit the refiner either, leaves carry their notes instead
+        def notes_for(subtree: Dict[str, Any]) -> str:
+            return "The notes of each leaf node are in its \"notes\" field."
+    
+    emit_event("skeleton", mindmap=initial_mindmap)
+    
+    # Extract leaf nodes and search YouTube for each
+    leaf_nodes = extract_leaf_nodes(initial_mindmap)
+    video_results = select_videos(find_videos_for_leaf_nodes(leaf_nodes, progress))
+    
+    if settings.MINDMAP_VIDEO_RANKING == "embeddings" and not settings.MINDMAP_INCLUDE_NOTES:
+        # Videos are already picked and the refiner is only needed for notes
+        logger.info(f"Attaching ranked videos to mindmap for exam {exam_id}")
+        final_mindmap = attach_videos(initial_mindmap, video_results)
+        for index, subtree in enumerate(final_mindmap.get("subtopics", [])):
+            emit_event("subtree", index=index, subtree=subtree)
+    else:
+        # Refine the mindmap with video results
+        logger.info(f"Refining mindmap with video results for exam {exam_id}")
+        final_mindmap = refine_mindmap(initial_mindmap, video_results, notes_for, progress)
+    
+    # The refiner rewrites the tree, so carry the sources over from the initial mindmap
+    copy_sources(initial_mindmap, final_mindmap)
+    
+    # Save to MongoDB for future use
+    progress(MindmapJobStageEnum.SAVING, None, None)
+    save_mindmap(exam_id, final_mindmap, groups, fingerprint)
+    
+    return final_mindmap
+
+def update_mindmap(
+    exam_id: uuid.UUID,
+    stored_mindmap: Dict[str, Any],
+    groups: List[ContentGroup],
+    fingerprint: str,
+    progress: ProgressCallback = _no_progress,
+) -> Optional[Dict[str, Any]]:
+    """
+    Update a stored mindmap with the references added and removed since it was built.
+    
+    Removed references prune their own contributions. Added references are outlined on their own
+    and merged into the tree by title; only their new leaves are searched on YouTube. Untouched
+    leaves keep their resources.
+    
+    Args:
+        exam_id: UUID of the exam
+        stored_mindmap: The stored mindmap document, with its provenance
+        groups: Current content of the exam, one group per reference
+        fingerprint: Fingerprint of the exam's content, saved with the mindmap
+        progress: Called whenever the pipeline enters a stage or makes progress within one
+    
+    Returns:
+        The updated mindmap, or None if the stored mindmap cannot be updated in place
+    """
+    mindmap = stored_mindmap["mindmap"]
+    provenance = stored_mindmap["provenance"]
+    current = build_provenance(groups)
+    
+    # A reference whose chunks changed counts as removed and added again
+    removed_ids = {reference_id for reference_id, chunk_ids in provenance.items() if current.get(reference_id) != chunk_ids}
+    added_groups = [group for group in groups if provenance.get(group.reference_id) != group.chunk_ids]
+    
+    if not removed_ids and not added_groups:
+        logger.info(f"Mindmap for exam {exam_id} is up to date")
+        if stored_mindmap.get("fingerprint") != fingerprint:
+            save_mindmap(exam_id, mindmap, groups, fingerprint)
+        return mindmap
+    
+    # Pruning needs to know where every leaf came from
+    if removed_ids and not has_complete_sources(mindmap):
+        return None
+    
+    metrics.increment("mindmap_generations_total", mode="incremental")
+    logger.info(f"Updating mindmap for exam {exam_id}: {len(added_groups)} references added, {len(removed_ids)} removed")
+    
+    if removed_ids:
+        prune_references(mindmap, removed_ids)
+    
+    if added_groups:
+        outline_groups = split_content_groups(added_groups, settings.MINDMAP_MAP_GROUP_MAX_TOKENS)
+        outlines = generate_partial_outlines(outline_groups, progress)
+        
+        progress(MindmapJobStageEnum.MERGING, None, None)
+        for outline in outlines:
+            merge_outline_into(mindmap, outline)
+        emit_event("skeleton", mindmap=mindmap)
+        
+        # Only leaves without resources are new
+        new_leaf_nodes = [leaf for leaf in extract_leaf_nodes(mindmap) if "resources" not in leaf["node"]]
+        video_results = select_videos(find_videos_for_leaf_nodes(new_leaf_nodes, progress))
+        for leaf in new_leaf_nodes:
+            attach_resources(
+                leaf["node"],
+                video_results.get(" > ".join(leaf["path"]), []),
+                include_notes=settings.MINDMAP_INCLUDE_NOTES,
+            )
+    
+    progress(MindmapJobStageEnum.SAVING, None, None)
+    save_mindmap(exam_id, mindmap, groups, fingerprint)
+    
+    return mindmap
+
+def save_mindmap(
+    exam_id: uuid.UUID,
+    mindmap: Dict[str, Any],
+    groups: List[ContentGroup],
+    fingerprint: str,
+) -> None:
+    """
+    Save the nodes of a mindmap to MongoDB with its provenance, content fingerprint and entity tag.
+    
+    Args:
+        exam_id: UUID of the exam
+        mindmap: The mindmap
+        groups: Content the mindmap was built from, one group per reference
+        fingerprint: Fingerprint of the exam's content
+    """
+    mongodb_client.insert_mindmap(
+        exam_id,
+        flatten_mindmap(mindmap),
+        provenance=build_provenance(groups),
+        fingerprint=fingerprint,
+        etag=compute_etag(mindmap),
+    )
+
+def build_provenance(groups: List[ContentGroup]) -> Dict[str, List[str]]:
+    """
+    Record which chunks of which references a mindmap is built from.
+    
+    Args:
+        groups: Content of the exam, one group per reference
+    
+    Returns:
+        Dictionary mapping reference IDs to their chunk IDs
+    """
+    return {group.reference_id: group.chunk_ids for group in groups}
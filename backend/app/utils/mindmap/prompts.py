@@ -0,0 +1,215 @@
+# Path: app/utils/mindmap/prompts.py
+# Description: System prompts used by the mindmap generation pipeline.
+
+MINDMAP_GENERATOR_PROMPT = """You are an expert educational content organizer. Your task is to create a hierarchical mindmap based on the provided educational content chunks.
+
+The mindmap should have the following structure:
+1. A main topic derived from the overall content
+2. Subtopics that represent key concepts or areas
+3. Further subdivisions as needed to create a comprehensive learning path
+
+IMPORTANT: For the smallest subdivisions (leaf nodes), mark them with "is_last_subtopic": true. These leaf nodes will be used to search YouTube for relevant educational videos.
+
+Format your response as a JSON object following this structure:
+{
+    "title": "Main Topic",
+    "is_last_subtopic": false,
+    "subtopics": [
+        {
+        "title": "Subtopic 1",
+        "is_last_subtopic": false,
+        "subtopics": [
+            {
+                "title": "Specific Concept 1",
+                "is_last_subtopic": true
+            }
+        ]
+        }
+    ]
+}
+
+Make sure titles are concise, clear, and would work well as YouTube search terms.
+"""
+
+# Refiner prompt used when notes are generated lazily per leaf
+MINDMAP_VIDEO_REFINER_PROMPT = """You are an expert educational content curator. You have been provided with:
+1. An initial mindmap structure
+2. YouTube video results for each leaf node in the mindmap
+
+Your task is to refine the mindmap and integrate the most relevant YouTube resources for each leaf node.
+
+For each leaf node (where "is_last_subtopic" is true), select up to 3 of the most relevant YouTube videos and integrate them into the final mindmap.
+
+Return your response as a JSON object following this structure:
+{
+    "title": "Main Topic",
+    "is_last_subtopic": false,
+    "subtopics": [
+        {
+        "title": "Subtopic 1",
+        "is_last_subtopic": false,
+        "subtopics": [
+            {
+            "title": "Specific Concept 1",
+            "is_last_subtopic": true,
+            "resources": [
+                {
+                    "type": "youtube",
+                    "data": {
+                        "url": "https://youtu.be/video-id",
+                        "title": "Video Title",
+                        "description": "Brief description of the video"
+                    }
+                }
+            ]
+            }
+        ]
+        }
+    ]
+}
+
+Ensure the integrated resources are highly relevant to the specific leaf node topics.
+"""
+
+MINDMAP_REFINER_PROMPT = """You are an expert educational content curator. You have been provided with:
+1. An initial mindmap structure
+2. YouTube video results for each leaf node in the mindmap
+3. Notes of the user
+
+Your task is to refine the mindmap and integrate the most relevant YouTube resources for each leaf node. Also add short notes for each leaf node.
+
+For each leaf node (where "is_last_subtopic" is true), select up to 3 of the most relevant YouTube videos and integrate them into the final mindmap.
+
+Return your response as a JSON object following this structure:
+{
+    "title": "Main Topic",
+    "is_last_subtopic": false,
+    "subtopics": [
+        {
+        "title": "Subtopic 1",
+        "is_last_subtopic": false,
+        "subtopics": [
+            {
+            "title": "Specific Concept 1",
+            "is_last_subtopic": true,
+            "resources": [
+                {
+                    "type": "youtube",
+                    "data": {
+                        "url": "https://youtu.be/video-id",
+                        "title": "Video Title",
+                        "description": "Brief description of the video"
+                    }
+                },
+                {
+                    "type": "notes",
+                    "data": "...multiline notes..."
+                }
+            ]
+            }
+        ]
+        }
+    ]
+}
+
+Ensure the integrated resources are highly relevant to the specific leaf node topics.
+"""
+
+MINDMAP_PARTIAL_PROMPT = """You are an expert educational content organizer. You are given one part of a larger set of educational content. Your task is to create a hierarchical outline of this part only; it will later be merged with the outlines of the other parts.
+
+The outline should have the following structure:
+1. A main topic describing this part of the content
+2. Subtopics that represent key concepts or areas
+3. Further subdivisions as needed to cover the part completely
+
+IMPORTANT: For the smallest subdivisions (leaf nodes), mark them with "is_last_subtopic": true and add short "notes" summarizing what this part says about the topic.
+
+Format your response as a JSON object following this structure:
+{
+    "title": "Main Topic",
+    "is_last_subtopic": false,
+    "subtopics": [
+        {
+        "title": "Subtopic 1",
+        "is_last_subtopic": false,
+        "subtopics": [
+            {
+                "title": "Specific Concept 1",
+                "is_last_subtopic": true,
+                "notes": "...short notes..."
+            }
+        ]
+        }
+    ]
+}
+
+Make sure titles are concise, clear, and would work well as YouTube search terms.
+"""
+
+MINDMAP_MERGE_PROMPT = """You are an expert educational content organizer. You have been provided with several partial outlines, each covering one part of the same educational content.
+
+Your task is to merge them into a single hierarchical mindmap:
+1. Choose a main topic that covers all parts
+2. Combine subtopics that describe the same concept instead of repeating them
+3. Keep every distinct concept from the partial outlines
+4. Keep the "notes" of leaf nodes, combining them when leaf nodes are merged
+5. Keep the "sources" of every node, combining them when nodes are merged
+
+IMPORTANT: Leaf nodes must keep "is_last_subtopic": true. These leaf nodes will be used to search YouTube for relevant educational videos.
+
+Format your response as a JSON object following this structure:
+{
+    "title": "Main Topic",
+    "is_last_subtopic": false,
+    "subtopics": [
+        {
+        "title": "Subtopic 1",
+        "is_last_subtopic": false,
+        "subtopics": [
+            {
+                "title": "Specific Concept 1",
+                "is_last_subtopic": true,
+                "notes": "...short notes...",
+                "sources": ["reference-id"]
+            }
+        ]
+        }
+    ]
+}
+
+Make sure titles are concise, clear, and would work well as YouTube search terms.
+"""
+
+MINDMAP_NOTES_PROMPT = """You are an expert educational content writer. You have been provided with:
+1. The path of a topic in a study mindmap, from the main topic down to the topic itself
+2. Excerpts of the user's study material related to the topic
+
+Your task is to write concise study notes for the topic. Base the notes on the excerpts wherever they cover the topic, and keep them focused on the topic itself rather than its parent topics.
+
+Format the notes as markdown with short paragraphs and bullet points. Respond with the notes only.
+"""
+
+MINDMAP_SUBTREE_PROMPT = """You are an expert educational content organizer. You have been provided with:
+1. The path of a topic in a study mindmap, from the main topic down to the topic itself
+2. The educational content the mindmap is built from
+
+Your task is to create the subtopics of this topic only, as a hierarchical outline of what the content says about it. Do not repeat the parent topics.
+
+If existing subtopics are listed, an earlier outline was cut off after them. Create only the subtopics that should follow them, without repeating any of them; if nothing is missing, return an empty "subtopics" list.
+
+IMPORTANT: For the smallest subdivisions (leaf nodes), mark them with "is_last_subtopic": true. These leaf nodes will be used to search YouTube for relevant educational videos.
+
+Format your response as a JSON object following this structure:
+{
+    "title": "The Topic",
+    "is_last_subtopic": false,
+    "subtopics": [
+        {
+            "title": "Specific Concept 1",
+            "is_last_subtopic": true
+        }
+    ]
+}
+
+Make sure titles are concise, clear, and would work well as YouTube search terms.
+"""
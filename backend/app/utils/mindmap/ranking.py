@@ -0,0 +1,61 @@
+# Path: app/utils/mindmap/ranking.py
+# Description: Local ranking of YouTube search results for mindmap leaves by embedding similarity.
+
+from typing import Any, Dict, List
+import numpy as np
+from app.logger import get_logger
+from app.utils.llm import get_llm_gateway
+
+logger = get_logger()
+llm_gateway = get_llm_gateway()
+
+def _video_text(video: Dict[str, Any]) -> str:
+    return f"{video['title']}\n{video.get('description', '')}"
+
+def rank_videos(
+    video_results: Dict[str, List[Dict[str, Any]]],
+    top_k: int,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Keep the videos most similar to each leaf, ranked by cosine similarity of embeddings.
+    
+    Leaf paths and the title and description of every distinct candidate are embedded in a single
+    batched call, served from the embedding cache where possible.
+    
+    Args:
+        video_results: Candidate videos of each leaf, keyed by leaf path
+        top_k: Number of videos to keep per leaf
+    
+    Returns:
+        The `top_k` most similar videos of each leaf, most similar first
+    """
+    paths = list(video_results)
+    videos = {video["url"]: video for candidates in video_results.values() for video in candidates}
+    if not videos:
+        return {path: [] for path in paths}
+    
+    urls = list(videos)
+    embeddings = np.asarray(
+        llm_gateway.create_embeddings(paths + [_video_text(videos[url]) for url in urls], cache=True),
+        dtype=np.float32,
+    )
+    
+    # Normalize rows so that dot products are cosine similarities
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    leaf_embeddings, video_embeddings = embeddings[:len(paths)], embeddings[len(paths):]
+    similarities = leaf_embeddings @ video_embeddings.T
+    
+    url_index = {url: index for index, url in enumerate(urls)}
+    ranked = {}
+    for row, path in enumerate(paths):
+        candidates = [url_index[video["url"]] for video in video_results[path]]
+        if not candidates:
+            ranked[path] = []
+            continue
+        
+        scores = similarities[row, candidates]
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        ranked[path] = [videos[urls[candidates[index]]] for index in order]
+    
+    logger.debug(f"Ranked {len(urls)} candidate videos for {len(paths)} leaves")
+    return ranked
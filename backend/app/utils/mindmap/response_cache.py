@@ -0,0 +1,102 @@
+# Path: app/utils/mindmap/response_cache.py
+# Description: MongoDB cache of mindmap LLM responses, so identical prompts are only answered once.
+
+import json, hashlib
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.metrics import get_metrics
+from app.utils.mongodb import get_mongodb_client
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+mongodb_client = get_mongodb_client()
+
+# Set by jobs asked to ignore cached responses; fresh responses are still cached
+_cache_bypass: ContextVar[bool] = ContextVar("mindmap_llm_cache_bypass", default=False)
+
+def set_cache_bypass(bypass: bool) -> None:
+    """Skip cached responses for the mindmap LLM calls of the current context."""
+    _cache_bypass.set(bypass)
+
+def response_cache_key(model: str, messages: List[dict], response_format: Optional[Dict[str, Any]]) -> str:
+    """
+    Compute the cache key of an LLM request.
+    
+    Args:
+        model: Name of the model
+        messages: Messages sent to the model
+        response_format: Requested response format
+    
+    Returns:
+        Hex digest of the request
+    """
+    request = json.dumps(
+        {"model": model, "messages": messages, "response_format": response_format},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+def cached_completion(
+    model: str,
+    messages: List[dict],
+    response_format: Optional[Dict[str, Any]],
+    complete: Callable[[], str],
+    parse: Callable[[str], Any],
+) -> Tuple[Any, bool]:
+    """
+    Answer an LLM request from the cache, or with `complete` and cache the response.
+    
+    Only responses that `parse` accepts are cached, so a malformed answer is never replayed. Cache
+    errors are logged and the request goes to the model.
+    
+    Args:
+        model: Name of the model
+        messages: Messages sent to the model
+        response_format: Requested response format
+        complete: Sends the request to the model and returns the response content
+        parse: Parses the response content
+    
+    Returns:
+        The parsed response, and whether it came from the cache
+    """
+    if not settings.MINDMAP_LLM_CACHE_ENABLED:
+        return parse(complete()), False
+    
+    key = response_cache_key(model, messages, response_format)
+    
+    if _cache_bypass.get():
+        metrics.increment("mindmap_llm_cache_requests_total", result="bypass")
+    else:
+        try:
+            content = mongodb_client.get_llm_response(key)
+        except Exception as e:
+            logger.warning(f"Error reading mindmap LLM cache (calling the model): {str(e)}")
+            content = None
+        
+        if content is not None:
+            try:
+                parsed = parse(content)
+                metrics.increment("mindmap_llm_cache_requests_total", result="hit")
+                return parsed, True
+            except ValueError:
+                logger.warning(f"Ignoring unparsable cached mindmap LLM response {key}")
+        
+        metrics.increment("mindmap_llm_cache_requests_total", result="miss")
+    
+    content = complete()
+    parsed = parse(content)
+    
+    if len(content.encode("utf-8")) > settings.MINDMAP_LLM_CACHE_MAX_ENTRY_BYTES:
+        logger.info(f"Not caching mindmap LLM response of {len(content)} characters")
+        return parsed, False
+    
+    try:
+        mongodb_client.insert_llm_response(key, model, content)
+    except Exception as e:
+        logger.warning(f"Error writing mindmap LLM cache: {str(e)}")
+    
+    return parsed, False
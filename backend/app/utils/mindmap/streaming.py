@@ -0,0 +1,109 @@
+# Path: app/utils/mindmap/streaming.py
+# Description: Events emitted while a mindmap is built and incremental parsing of streamed outlines.
+
+import json
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+from app.logger import get_logger
+
+logger = get_logger()
+
+# Called with each event of the mindmap being built, e.g. {"event": "leaf", ...}
+EventCallback = Callable[[Dict[str, Any]], None]
+
+# Set by a job whose client streams its events; worker threads inherit it through copied contexts
+_event_sink: ContextVar[Optional[EventCallback]] = ContextVar("mindmap_event_sink", default=None)
+
+def set_event_sink(sink: Optional[EventCallback]) -> None:
+    """Send the mindmap events of the current context to `sink`."""
+    _event_sink.set(sink)
+
+def emit_event(event: str, **data: Any) -> None:
+    """
+    Emit a mindmap event to the sink of the current context, if any.
+    
+    Args:
+        event: Name of the event
+        data: Payload of the event
+    """
+    sink = _event_sink.get()
+    if sink is None:
+        return
+    
+    try:
+        sink({"event": event, **data})
+    except Exception as e:
+        # A slow or gone client must never fail the job itself
+        logger.warning(f"Error emitting mindmap event '{event}': {str(e)}")
+
+class SubtopicStreamParser:
+    """
+    Scans the streamed JSON of a mindmap and parses each top-level subtopic as soon as it is complete.
+    
+    Only string, nesting and key boundaries are tracked, so every character is looked at once no
+    matter how the output is split into deltas.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        self.last_key: Optional[str] = None
+        self.in_subtopics = False
+        self.subtopic_start: Optional[int] = None
+    
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next part of the output.
+        
+        Args:
+            delta: Text following everything fed so far
+        
+        Returns:
+            The top-level subtopics completed by this part, in order
+        """
+        self.text += delta
+        completed = []
+        
+        while self.position < len(self.text):
+            char = self.text[self.position]
+            
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    # Keys and values of the root alike; only the one before an array matters
+                    if self.depth == 1:
+                        self.last_key = self.text[self.string_start + 1:self.position]
+            
+            elif char == '"':
+                self.in_string = True
+                self.string_start = self.position
+            
+            elif char in "{[":
+                if char == "[" and self.depth == 1 and self.last_key == "subtopics":
+                    self.in_subtopics = True
+                elif char == "{" and self.depth == 2 and self.in_subtopics:
+                    self.subtopic_start = self.position
+                self.depth += 1
+            
+            elif char in "}]":
+                self.depth -= 1
+                if char == "}" and self.depth == 2 and self.subtopic_start is not None:
+                    try:
+                        completed.append(json.loads(self.text[self.subtopic_start:self.position + 1]))
+                    except ValueError:
+                        logger.debug("Skipping a streamed subtopic that is not valid JSON")
+                    self.subtopic_start = None
+                elif char == "]" and self.depth == 1:
+                    self.in_subtopics = False
+            
+            self.position += 1
+        
+        return completed
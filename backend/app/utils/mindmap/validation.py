@@ -0,0 +1,212 @@
+# Path: app/utils/mindmap/validation.py
+# Description: Validation and repair of mindmap JSON returned by the LLM, with salvage of truncated output.
+
+import json
+from typing import Any, Dict, List, Optional
+from app.logger import get_logger
+from app.utils.metrics import get_metrics
+
+logger = get_logger()
+metrics = get_metrics()
+
+# Cut points tried, from the end, when closing truncated output
+MAX_SALVAGE_ATTEMPTS = 50
+
+# Set by `salvage_json` on the objects it had to close, the frontier where the output was cut off
+TRUNCATED_KEY = "truncated"
+
+class MindmapOutputError(ValueError):
+    """Raised when LLM output is not a valid mindmap object; carries what could be salvaged, if anything."""
+    
+    def __init__(self, message: str, salvaged: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.salvaged = salvaged
+
+def _mark_truncated(value: Any, open_containers: int) -> None:
+    # Containers still open at the cut are each the last value of the previous one, from the root down
+    for _ in range(open_containers):
+        if isinstance(value, dict):
+            last_value = list(value.values())[-1] if value else None
+            value[TRUNCATED_KEY] = True
+            value = last_value
+        elif isinstance(value, list) and value:
+            value = value[-1]
+        else:
+            break
+
+def salvage_json(text: str) -> Optional[Any]:
+    """
+    Recover the longest parsable prefix of a truncated JSON object.
+    
+    The output is cut after the last complete value and every container still open is closed.
+    Each object closed that way is marked with `TRUNCATED_KEY`, as it may be missing members.
+    Text before the first brace, such as a markdown fence, is skipped.
+    
+    Args:
+        text: The truncated JSON text
+    
+    Returns:
+        The recovered object, or None if nothing could be recovered
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    
+    stack = []
+    in_string = False
+    escaped = False
+    # Positions where the text can be cut, with the brackets closing everything open there
+    cut_points = []
+    
+    for index in range(start, len(text)):
+        char = text[index]
+        
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            cut_points.append((index + 1, "".join(reversed(stack))))
+        elif char in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                # The object is complete, anything after it is ignored
+                try:
+                    return json.loads(text[start:index + 1])
+                except ValueError:
+                    break
+            cut_points.append((index + 1, "".join(reversed(stack))))
+        elif char == ",":
+            cut_points.append((index, "".join(reversed(stack))))
+    
+    for end, closing in reversed(cut_points[-MAX_SALVAGE_ATTEMPTS:]):
+        try:
+            salvaged = json.loads(text[start:end] + closing)
+        except ValueError:
+            continue
+        _mark_truncated(salvaged, len(closing))
+        return salvaged
+    return None
+
+def parse_mindmap_json(content: str) -> Dict[str, Any]:
+    """
+    Parse LLM output that should be a mindmap object.
+    
+    Args:
+        content: The LLM output
+    
+    Returns:
+        The parsed object
+    
+    Raises:
+        MindmapOutputError: If the output is not a JSON object, with the salvaged prefix if any
+    """
+    try:
+        parsed = json.loads(content)
+    except ValueError as e:
+        salvaged = salvage_json(content)
+        if not isinstance(salvaged, dict):
+            salvaged = None
+        raise MindmapOutputError(f"Invalid mindmap JSON ({len(content)} characters): {str(e)}", salvaged)
+    
+    if not isinstance(parsed, dict):
+        raise MindmapOutputError(f"Mindmap JSON is a {type(parsed).__name__}, not an object")
+    return parsed
+
+def _repair_resources(resources: Any) -> List[Dict[str, Any]]:
+    if not isinstance(resources, list):
+        return []
+    
+    repaired = []
+    for resource in resources:
+        if not isinstance(resource, dict) or not isinstance(resource.get("type"), str) or not resource.get("data"):
+            continue
+        if resource["type"] == "youtube" and not (isinstance(resource["data"], dict) and isinstance(resource["data"].get("url"), str)):
+            continue
+        repaired.append(resource)
+    return repaired
+
+def repair_mindmap(mindmap: Dict[str, Any], salvaged: bool = False) -> List[Dict[str, Any]]:
+    """
+    Validate a mindmap against the mindmap format and repair it in place.
+    
+    Nodes without a title are dropped, `is_last_subtopic` is inferred where it is missing or
+    contradicts the subtopics, and malformed `subtopics`, `resources` and `notes` are removed. Inner
+    nodes left without subtopics, typically cut off by truncated output, are reported as incomplete,
+    as are inner nodes marked with `TRUNCATED_KEY`, whose remaining subtopics were cut off.
+    
+    Args:
+        mindmap: The mindmap, modified in place
+        salvaged: Whether the mindmap was salvaged from truncated output, in which case nodes cut off
+            before their `is_last_subtopic` count as incomplete inner nodes rather than leaves
+    
+    Returns:
+        The incomplete nodes with their title paths, like `extract_leaf_nodes`
+    
+    Raises:
+        MindmapOutputError: If the root itself has no title
+    """
+    if not isinstance(mindmap.get("title"), str) or not mindmap["title"].strip():
+        raise MindmapOutputError("Mindmap has no title")
+    
+    incomplete = []
+    repairs = 0
+    
+    def repair(node: Dict[str, Any], path: List[str]) -> None:
+        nonlocal repairs
+        path = path + [node["title"]]
+        
+        subtopics = node.get("subtopics", [])
+        if not isinstance(subtopics, list):
+            subtopics = []
+        valid_subtopics = [
+            subtopic for subtopic in subtopics
+            if isinstance(subtopic, dict) and isinstance(subtopic.get("title"), str) and subtopic["title"].strip()
+        ]
+        repairs += len(subtopics) - len(valid_subtopics)
+        
+        is_leaf = node.get("is_last_subtopic")
+        if not isinstance(is_leaf, bool) or (is_leaf and valid_subtopics):
+            repairs += 1
+            is_leaf = not valid_subtopics and not (salvaged and "is_last_subtopic" not in node)
+            node["is_last_subtopic"] = is_leaf
+        
+        if "subtopics" in node or not is_leaf:
+            node["subtopics"] = valid_subtopics
+        
+        if is_leaf:
+            # A leaf cut off after its title is complete as far as the mindmap is concerned
+            node.pop(TRUNCATED_KEY, None)
+        
+        if "resources" in node:
+            resources = _repair_resources(node["resources"])
+            if not isinstance(node["resources"], list) or len(resources) != len(node["resources"]):
+                repairs += 1
+            node["resources"] = resources
+        
+        if "notes" in node and not isinstance(node["notes"], str):
+            repairs += 1
+            del node["notes"]
+        
+        if not is_leaf and (not valid_subtopics or node.get(TRUNCATED_KEY)):
+            incomplete.append({"node": node, "path": path})
+        
+        for subtopic in valid_subtopics:
+            repair(subtopic, path)
+    
+    repair(mindmap, [])
+    
+    if repairs:
+        logger.warning(f"Repaired {repairs} problems in mindmap '{mindmap['title']}'")
+        metrics.increment("mindmap_schema_repairs_total", value=repairs)
+    return incomplete
@@ -10,6 +10,7 @@ from .subjects import (
     UpdateSubjectResponse,
 )
 from .exams import (
+    ExamBucketEnum,
     ExamItem,
     ExamCreateRequest,
     ExamCreateResponse,
@@ -42,8 +43,29 @@ from .chat import (
 from .metadata import (
     YouTubeMetadataRequest,
     YouTubeMetadataResponse,
+    YouTubeMetadataBatchRequest,
+    YouTubeMetadataBatchItem,
+    YouTubeMetadataBatchResponse,
     WebsiteMetadataRequest,
     WebsiteMetadataResponse,
+    WebsiteMetadataBatchRequest,
+    WebsiteMetadataBatchItem,
+    WebsiteMetadataBatchResponse,
+)
+
+from .usage import (
+    UsageKindEnum,
+    UsageGroupByEnum,
+    UsageRollupItem,
+    ListUsageResponse,
+    ExamUsageResponse,
+)
+
+from .mindmap import (
+    MindmapJobStatusEnum,
+    MindmapJobStageEnum,
+    MindmapJobResponse,
+    MindmapNodeNotesResponse,
 )
 
 __all__ = [
@@ -56,6 +78,7 @@ __all__ = [
     "UpdateSubjectResponse",
     
     # Exams
+    "ExamBucketEnum",
     "ExamItem",
     "ExamCreateRequest",
     "ExamCreateResponse",
@@ -84,6 +107,25 @@ __all__ = [
     # Metadata
     "YouTubeMetadataRequest",
     "YouTubeMetadataResponse",
+    "YouTubeMetadataBatchRequest",
+    "YouTubeMetadataBatchItem",
+    "YouTubeMetadataBatchResponse",
     "WebsiteMetadataRequest",
     "WebsiteMetadataResponse",
+    "WebsiteMetadataBatchRequest",
+    "WebsiteMetadataBatchItem",
+    "WebsiteMetadataBatchResponse",
+    
+    # Usage
+    "UsageKindEnum",
+    "UsageGroupByEnum",
+    "UsageRollupItem",
+    "ListUsageResponse",
+    "ExamUsageResponse",
+    
+    # Mindmap
+    "MindmapJobStatusEnum",
+    "MindmapJobStageEnum",
+    "MindmapJobResponse",
+    "MindmapNodeNotesResponse",
 ]
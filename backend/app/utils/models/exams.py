@@ -1,12 +1,16 @@
 # Path: app/utils/models/exams.py
 # Description: Models for Exam CRUD operations
 
-import uuid
+import uuid, enum
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
 from .subjects import SubjectItem
 
+class ExamBucketEnum(str, enum.Enum):
+    UPCOMING = "upcoming"
+    PREVIOUS = "previous"
+
 class ExamItem(BaseModel):
     id: uuid.UUID
     name: str
@@ -40,6 +44,8 @@ class GetExamResponse(BaseModel):
 class ListExamResponse(BaseModel):
     upcoming_exams: List[ExamItem]
     previous_exams: List[ExamItem]
+    upcoming_next_cursor: Optional[str] = Field(None, description="Cursor of the next page of upcoming exams, None on the last page")
+    previous_next_cursor: Optional[str] = Field(None, description="Cursor of the next page of previous exams, None on the last page")
 
 # Get Exam
 # We'll never need to get a single exam by ID.
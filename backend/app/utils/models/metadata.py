@@ -1,7 +1,8 @@
 # Path: app/utils/models/metadata.py
 # Description: Models for metadata extraction from YouTube and websites
 
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 # YouTube Video Metadata
 class YouTubeMetadataRequest(BaseModel):
@@ -11,9 +12,40 @@ class YouTubeMetadataResponse(BaseModel):
     title: str
     description: str
 
+class YouTubeMetadataBatchRequest(BaseModel):
+    urls: List[str] = Field(..., min_length=1, description="YouTube video URLs")
+
+class YouTubeMetadataBatchItem(BaseModel):
+    url: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    error: Optional[str] = Field(None, description="Why no metadata could be extracted for this URL")
+
+class YouTubeMetadataBatchResponse(BaseModel):
+    results: List[YouTubeMetadataBatchItem]
+
 # Website Metadata
 class WebsiteMetadataRequest(BaseModel):
     url: str
 
 class WebsiteMetadataResponse(BaseModel):
     title: str
+    description: Optional[str] = Field(None, description="OpenGraph or meta description of the page")
+    og_title: Optional[str] = None
+    og_description: Optional[str] = None
+    favicon: Optional[str] = Field(None, description="Absolute URL of the page's icon")
+
+class WebsiteMetadataBatchRequest(BaseModel):
+    urls: List[str] = Field(..., min_length=1, description="Website URLs")
+
+class WebsiteMetadataBatchItem(BaseModel):
+    url: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    og_title: Optional[str] = None
+    og_description: Optional[str] = None
+    favicon: Optional[str] = None
+    error: Optional[str] = Field(None, description="Why no metadata could be extracted for this URL")
+
+class WebsiteMetadataBatchResponse(BaseModel):
+    results: List[WebsiteMetadataBatchItem]
@@ -0,0 +1,43 @@
+# Path: app/utils/models/mindmap.py
+# Description: Models for mindmap generation jobs
+
+import enum
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+class MindmapJobStatusEnum(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class MindmapJobStageEnum(str, enum.Enum):
+    QUEUED = "queued"
+    LOADING_CONTENT = "loading_content"
+    GENERATING = "generating"
+    MERGING = "merging"
+    SEARCHING_VIDEOS = "searching_videos"
+    REFINING = "refining"
+    SAVING = "saving"
+    DONE = "done"
+
+# Mindmap Jobs
+class MindmapJobResponse(BaseModel):
+    job_id: str
+    exam_id: str
+    status: MindmapJobStatusEnum
+    stage: MindmapJobStageEnum
+    completed: Optional[int] = None
+    total: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+# Mindmap Nodes
+class MindmapNodeNotesResponse(BaseModel):
+    node_path: str
+    title: str
+    notes: str
+    cached: bool
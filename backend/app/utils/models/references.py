@@ -2,8 +2,8 @@
 # Description: Models for Exam CRUD operations
 
 import uuid, enum
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class ReferencesTypeEnum(str, enum.Enum):
     TXT = "txt"
@@ -50,6 +50,7 @@ class ReferenceItem(BaseModel):
 
 class ListReferenceResponse(BaseModel):
     references: List[ReferenceItem]
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, None on the last page")
 
 # Download Reference
 # class DownloadReferenceRequest(BaseModel):
@@ -42,6 +42,7 @@ class SubjectItem(BaseModel):
 
 class ListSubjectResponse(BaseModel):
     subjects: List[SubjectItem]
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, None on the last page")
 
 # Update Subject
 class UpdateSubjectRequest(BaseModel):
@@ -0,0 +1,41 @@
+# Path: app/utils/models/usage.py
+# Description: Models for LLM, embedding and YouTube API usage telemetry
+
+import uuid, enum
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class UsageKindEnum(str, enum.Enum):
+    COMPLETION = "completion"
+    EMBEDDING = "embedding"
+    YOUTUBE = "youtube"
+
+class UsageGroupByEnum(str, enum.Enum):
+    EXAM = "exam"
+    ROUTE = "route"
+    MODEL = "model"
+    KIND = "kind"
+
+# Usage Rollups
+class UsageRollupItem(BaseModel):
+    exam_id: Optional[uuid.UUID] = None
+    route: Optional[str] = None
+    model: Optional[str] = None
+    kind: Optional[UsageKindEnum] = None
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    quota_units: int
+    total_latency_ms: float
+
+class ListUsageResponse(BaseModel):
+    since: Optional[datetime]
+    until: Optional[datetime]
+    group_by: List[UsageGroupByEnum]
+    items: List[UsageRollupItem]
+
+class ExamUsageResponse(BaseModel):
+    exam_id: uuid.UUID
+    total: UsageRollupItem
+    by_route: List[UsageRollupItem]
@@ -1,3 +1,4 @@
 from .client import MongoDBClient, get_mongodb_client
+from .async_client import AsyncMongoDBClient, get_async_mongodb_client
 
-__all__ = ["MongoDBClient", "get_mongodb_client"]
+__all__ = ["MongoDBClient", "get_mongodb_client", "AsyncMongoDBClient", "get_async_mongodb_client"]
@@ -0,0 +1,168 @@
+# Path: app/utils/mongodb/async_client.py
+# Description: Async MongoDB client for the async endpoints, on the native async API of pymongo.
+
+import uuid
+from datetime import datetime, timezone
+from pymongo import AsyncMongoClient
+from typing import Optional, List, Dict
+from functools import lru_cache
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.models import MongoDbChunkDocument
+from .client import MINDMAP_NODE_PROJECTION, MINDMAP_NODE_ORDER, mindmap_nodes_query
+
+settings = get_settings()
+logger = get_logger()
+
+class AsyncMongoDBClient:
+    """
+    Async counterpart of MongoDBClient for the operations of async endpoints.
+    
+    Documents are read and written in the same shape as MongoDBClient does, so both clients can be
+    used on the same collections.
+    """
+    
+    def __init__(self):
+        """Initialize the async MongoDB client; it connects on first use."""
+        self.client = AsyncMongoClient(settings.get_mongo_uri())
+        self.db = self.client[settings.MONGO_DB]
+        self.collection = self.db[settings.MONGO_COLLECTION_REFERENCES_CHUNKS]
+        logger.info(f"Async MongoDB client initialized for {settings.MONGO_DB}")
+    
+    async def insert_chunk(self, chunk: MongoDbChunkDocument) -> None:
+        """
+        Insert a document chunk into MongoDB.
+        
+        Args:
+            chunk: The document chunk to insert
+        """
+        try:
+            logger.debug(f"Inserting chunk into MongoDB: {chunk}")
+            await self.collection.insert_one(chunk.model_dump())
+        except Exception as e:
+            logger.error(f"Error inserting chunk into MongoDB: {str(e)}")
+            raise
+    
+    async def get_chunks(self, chunk_ids: List[uuid.UUID]) -> Dict[str, MongoDbChunkDocument]:
+        """
+        Retrieve multiple document chunks from MongoDB in a single query.
+        
+        Args:
+            chunk_ids: UUIDs of the chunks
+        
+        Returns:
+            Dictionary mapping chunk IDs to their documents
+        """
+        try:
+            cursor = self.collection.find(
+                {"chunk_id": {"$in": [str(chunk_id) for chunk_id in chunk_ids]}},
+                {"_id": 0, "chunk_id": 1, "content": 1},
+            )
+            return {doc["chunk_id"]: MongoDbChunkDocument(**doc) async for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error retrieving chunks from MongoDB: {str(e)}")
+            raise
+    
+    async def get_mindmap(self, exam_id: uuid.UUID) -> Optional[dict]:
+        """
+        Retrieve the document of a mindmap from MongoDB, without its nodes.
+        
+        Args:
+            exam_id: UUID of the exam
+        
+        Returns:
+            The mindmap document or None if not found
+        """
+        try:
+            return await self.db[settings.MONGO_COLLECTION_MINDMAPS].find_one(
+                {"exam_id": str(exam_id)},
+                projection={"_id": False}
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving mindmap from MongoDB: {str(e)}")
+            raise
+    
+    async def get_mindmap_nodes(
+        self,
+        exam_id: uuid.UUID,
+        version: str,
+        root_path: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        paths: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """
+        Retrieve nodes of a mindmap from MongoDB, filtered as by `MongoDBClient.get_mindmap_nodes`.
+        
+        Returns:
+            The nodes, ordered by depth and then by position among their siblings
+        """
+        try:
+            cursor = self.db[settings.MONGO_COLLECTION_MINDMAP_NODES].find(
+                mindmap_nodes_query(exam_id, version, root_path, max_depth, paths),
+                projection=MINDMAP_NODE_PROJECTION
+            ).sort(MINDMAP_NODE_ORDER)
+            return await cursor.to_list()
+        except Exception as e:
+            logger.error(f"Error retrieving mindmap nodes from MongoDB: {str(e)}")
+            raise
+    
+    async def get_mindmap_notes(self, key: str) -> Optional[str]:
+        """
+        Retrieve the cached notes of a mindmap leaf from MongoDB.
+        
+        Args:
+            key: Cache key of the leaf
+        
+        Returns:
+            The notes or None if not found
+        """
+        try:
+            notes_doc = await self.db[settings.MONGO_COLLECTION_MINDMAP_NOTES].find_one({"_id": key})
+            return notes_doc["notes"] if notes_doc else None
+        except Exception as e:
+            logger.error(f"Error retrieving mindmap notes from MongoDB: {str(e)}")
+            raise
+    
+    async def insert_mindmap_notes(self, key: str, exam_id: uuid.UUID, notes: str) -> None:
+        """
+        Insert the notes of a mindmap leaf into MongoDB.
+        
+        Args:
+            key: Cache key of the leaf
+            exam_id: UUID of the exam
+            notes: The notes
+        """
+        try:
+            await self.db[settings.MONGO_COLLECTION_MINDMAP_NOTES].replace_one(
+                {"_id": key},
+                {"_id": key, "exam_id": str(exam_id), "notes": notes, "created_at": datetime.now(timezone.utc)},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error inserting mindmap notes into MongoDB: {str(e)}")
+            raise
+    
+    async def get_mindmap_job(self, job_id: str) -> Optional[dict]:
+        """
+        Retrieve a mindmap generation job from MongoDB.
+        
+        Args:
+            job_id: ID of the job
+        
+        Returns:
+            The job document or None if not found
+        """
+        try:
+            return await self.db[settings.MONGO_COLLECTION_MINDMAP_JOBS].find_one({"_id": job_id})
+        except Exception as e:
+            logger.error(f"Error retrieving mindmap job from MongoDB: {str(e)}")
+            raise
+    
+    async def close(self) -> None:
+        """Close the connections of the client."""
+        await self.client.close()
+
+@lru_cache
+def get_async_mongodb_client() -> AsyncMongoDBClient:
+    """Get a singleton instance of the async MongoDB client."""
+    return AsyncMongoDBClient()
@@ -1,9 +1,11 @@
 # Path: app/utils/mongodb/client.py
 # Description: MongoDB client for handling intractions with MongoDB.
 
-import uuid
-from pymongo import MongoClient
-from typing import Optional
+import re, uuid
+from datetime import datetime, timezone
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from typing import Optional, List, Dict
 from functools import lru_cache
 from app.config import get_settings
 from app.logger import get_logger
@@ -12,6 +14,28 @@ from app.utils.models import MongoDbChunkDocument
 settings = get_settings()
 logger = get_logger()
 
+# Stored nodes without their bookkeeping fields, in tree order
+MINDMAP_NODE_PROJECTION = {"_id": False, "exam_id": False, "version": False}
+MINDMAP_NODE_ORDER = [("depth", 1), ("position", 1)]
+
+def mindmap_nodes_query(
+    exam_id: uuid.UUID,
+    version: str,
+    root_path: Optional[str] = None,
+    max_depth: Optional[int] = None,
+    paths: Optional[List[str]] = None,
+) -> dict:
+    """Build the filter of `get_mindmap_nodes`, shared by the async client."""
+    query = {"exam_id": str(exam_id), "version": version}
+    if paths is not None:
+        query["path"] = {"$in": paths}
+    elif root_path:
+        # Anchored prefix, served by the path index
+        query["path"] = {"$regex": f"^{re.escape(root_path)}(\\.|$)"}
+    if max_depth is not None:
+        query["depth"] = {"$lte": max_depth}
+    return query
+
 class MongoDBClient:
     def __init__(self):
         """Initialize MongoDB client with connection to the database."""
@@ -52,6 +76,27 @@ class MongoDBClient:
             logger.error(f"Error retrieving chunk from MongoDB: {str(e)}")
             raise
     
+    def get_chunks(self, chunk_ids: List[uuid.UUID]) -> Dict[str, MongoDbChunkDocument]:
+        """
+        Retrieve multiple document chunks from MongoDB in a single query.
+        
+        Args:
+            chunk_ids: UUIDs of the chunks
+        
+        Returns:
+            Dictionary mapping chunk IDs to their documents
+        """
+        try:
+            logger.debug(f"Retrieving {len(chunk_ids)} chunks from MongoDB")
+            cursor = self.collection.find(
+                {"chunk_id": {"$in": [str(chunk_id) for chunk_id in chunk_ids]}},
+                {"_id": 0, "chunk_id": 1, "content": 1},
+            )
+            return {doc["chunk_id"]: MongoDbChunkDocument(**doc) for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error retrieving chunks from MongoDB: {str(e)}")
+            raise
+    
     def delete_chunk(self, chunk_id: uuid.UUID) -> None:
         """
         Delete a document chunk from MongoDB.
@@ -66,33 +111,68 @@ class MongoDBClient:
             logger.error(f"Error deleting chunks from MongoDB: {str(e)}")
             raise
     
-    def insert_mindmap(self, exam_id: uuid.UUID, mindmap: dict) -> None:
+    def insert_mindmap(
+        self,
+        exam_id: uuid.UUID,
+        nodes: List[dict],
+        provenance: Optional[Dict[str, List[str]]] = None,
+        fingerprint: Optional[str] = None,
+        etag: Optional[str] = None,
+    ) -> None:
         """
-        Insert a mindmap into MongoDB.
+        Insert a mindmap into MongoDB, one document per node.
+        
+        The nodes are written under a new version before the mindmap document is switched to it, so
+        readers never see a partially written mindmap. The nodes of the replaced version are only
+        deleted by the next swap.
         
         Args:
             exam_id: UUID of the exam
-            mindmap: The mindmap data
+            nodes: The flattened nodes of the mindmap
+            provenance: Chunk IDs of each reference the mindmap was built from
+            fingerprint: Fingerprint of the exam's references and chunks when the mindmap was built
+            etag: Entity tag of the mindmap content
         """
         try:
-            logger.debug(f"Inserting mindmap into MongoDB for exam: {exam_id}")
+            logger.debug(f"Inserting mindmap with {len(nodes)} nodes into MongoDB for exam: {exam_id}")
+            version = str(uuid.uuid4())
+            nodes_collection = self.db[settings.MONGO_COLLECTION_MINDMAP_NODES]
+            if nodes:
+                nodes_collection.insert_many(
+                    [{**node, "exam_id": str(exam_id), "version": version} for node in nodes],
+                    ordered=False
+                )
+            
             document = {
                 "exam_id": str(exam_id),
-                "mindmap": mindmap
+                "version": version,
+                "node_count": len(nodes),
+                "provenance": provenance,
+                "fingerprint": fingerprint,
+                "etag": etag
             }
-            # Use upsert to replace if exists or insert if not
-            self.db[settings.MONGO_COLLECTION_MINDMAPS].replace_one(
+            # Use upsert to replace if exists or insert if not, getting the version it replaces
+            previous = self.db[settings.MONGO_COLLECTION_MINDMAPS].find_one_and_replace(
                 {"exam_id": str(exam_id)},
                 document,
+                projection={"_id": False, "version": True},
                 upsert=True
             )
+            previous_version = previous.get("version") if previous else None
+            
+            # Readers may still hold the replaced document, so its nodes are kept until the next swap
+            nodes_collection.delete_many(
+                {"exam_id": str(exam_id), "version": {"$nin": [version, previous_version]}}
+            )
         except Exception as e:
             logger.error(f"Error inserting mindmap into MongoDB: {str(e)}")
             raise
 
     def get_mindmap(self, exam_id: uuid.UUID) -> Optional[dict]:
         """
-        Retrieve a mindmap from MongoDB.
+        Retrieve the document of a mindmap from MongoDB, without its nodes.
+        
+        Mindmaps saved before nodes were stored separately carry their whole tree in `mindmap`.
         
         Args:
             exam_id: UUID of the exam
@@ -103,12 +183,44 @@ class MongoDBClient:
         try:
             logger.debug(f"Retrieving mindmap from MongoDB for exam: {exam_id}")
             mindmap_data = self.db[settings.MONGO_COLLECTION_MINDMAPS].find_one(
-                {"exam_id": str(exam_id)}
+                {"exam_id": str(exam_id)},
+                projection={"_id": False}
             )
             return mindmap_data
         except Exception as e:
             logger.error(f"Error retrieving mindmap from MongoDB: {str(e)}")
             raise
+    
+    def get_mindmap_nodes(
+        self,
+        exam_id: uuid.UUID,
+        version: str,
+        root_path: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        paths: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """
+        Retrieve nodes of a mindmap from MongoDB.
+        
+        Args:
+            exam_id: UUID of the exam
+            version: Version of the mindmap, from its document
+            root_path: Only return this node and its descendants
+            max_depth: Only return nodes at most this deep, the root being at depth 0
+            paths: Only return the nodes with these paths
+        
+        Returns:
+            The nodes, ordered by depth and then by position among their siblings
+        """
+        try:
+            cursor = self.db[settings.MONGO_COLLECTION_MINDMAP_NODES].find(
+                mindmap_nodes_query(exam_id, version, root_path, max_depth, paths),
+                projection=MINDMAP_NODE_PROJECTION
+            ).sort(MINDMAP_NODE_ORDER)
+            return list(cursor)
+        except Exception as e:
+            logger.error(f"Error retrieving mindmap nodes from MongoDB: {str(e)}")
+            raise
 
     def delete_mindmap(self, exam_id: uuid.UUID) -> None:
         """
@@ -122,9 +234,274 @@ class MongoDBClient:
             self.db[settings.MONGO_COLLECTION_MINDMAPS].delete_many(
                 {"exam_id": str(exam_id)}
             )
+            self.db[settings.MONGO_COLLECTION_MINDMAP_NODES].delete_many(
+                {"exam_id": str(exam_id)}
+            )
+            self.db[settings.MONGO_COLLECTION_MINDMAP_NOTES].delete_many(
+                {"exam_id": str(exam_id)}
+            )
         except Exception as e:
             logger.error(f"Error deleting mindmap from MongoDB: {str(e)}")
             raise
+    
+    def get_llm_response(self, key: str) -> Optional[str]:
+        """
+        Retrieve a cached LLM response from MongoDB.
+        
+        Args:
+            key: Cache key of the request
+        
+        Returns:
+            The response content or None if not cached
+        """
+        try:
+            response_doc = self.db[settings.MONGO_COLLECTION_LLM_CACHE].find_one(
+                {"_id": key},
+                projection={"content": True}
+            )
+            return response_doc["content"] if response_doc else None
+        except Exception as e:
+            logger.error(f"Error retrieving LLM response from MongoDB: {str(e)}")
+            raise
+    
+    def insert_llm_response(self, key: str, model: str, content: str) -> None:
+        """
+        Insert an LLM response into the MongoDB cache, evicting the oldest responses beyond
+        `MINDMAP_LLM_CACHE_MAX_ENTRIES`.
+        
+        Args:
+            key: Cache key of the request
+            model: Model that generated the response
+            content: The response content
+        """
+        try:
+            collection = self.db[settings.MONGO_COLLECTION_LLM_CACHE]
+            collection.replace_one(
+                {"_id": key},
+                {"_id": key, "model": model, "content": content, "created_at": datetime.now(timezone.utc)},
+                upsert=True
+            )
+            
+            # The estimated count is read from collection metadata, so checking it is cheap
+            excess = collection.estimated_document_count() - settings.MINDMAP_LLM_CACHE_MAX_ENTRIES
+            if excess > 0:
+                oldest_keys = [
+                    response_doc["_id"]
+                    for response_doc in collection.find({}, projection={"_id": True}).sort("created_at", 1).limit(excess)
+                ]
+                collection.delete_many({"_id": {"$in": oldest_keys}})
+        except Exception as e:
+            logger.error(f"Error inserting LLM response into MongoDB: {str(e)}")
+            raise
+    
+    def get_context_version(self, exam_id: str) -> int:
+        """
+        Get the content version of an exam's context snapshots.
+        
+        Args:
+            exam_id: ID of the exam
+        
+        Returns:
+            The current content version (0 if never invalidated)
+        """
+        try:
+            version_doc = self.db[settings.MONGO_COLLECTION_CONTEXT_CACHE].find_one(
+                {"_id": f"version:{exam_id}"}
+            )
+            return version_doc["version"] if version_doc else 0
+        except Exception as e:
+            logger.error(f"Error retrieving context version from MongoDB: {str(e)}")
+            raise
+    
+    def bump_context_version(self, exam_id: str) -> None:
+        """
+        Increment the content version of an exam and drop its context snapshots.
+        
+        Args:
+            exam_id: ID of the exam
+        """
+        try:
+            logger.debug(f"Bumping context version in MongoDB for exam: {exam_id}")
+            collection = self.db[settings.MONGO_COLLECTION_CONTEXT_CACHE]
+            collection.update_one(
+                {"_id": f"version:{exam_id}"},
+                {"$inc": {"version": 1}},
+                upsert=True
+            )
+            collection.delete_many({"exam_id": exam_id})
+        except Exception as e:
+            logger.error(f"Error bumping context version in MongoDB: {str(e)}")
+            raise
+    
+    def get_context_snapshot(self, key: str) -> Optional[str]:
+        """
+        Retrieve a cached context snapshot from MongoDB.
+        
+        Args:
+            key: Cache key of the snapshot
+        
+        Returns:
+            The context string or None if not found
+        """
+        try:
+            snapshot = self.db[settings.MONGO_COLLECTION_CONTEXT_CACHE].find_one({"_id": key})
+            return snapshot["context"] if snapshot else None
+        except Exception as e:
+            logger.error(f"Error retrieving context snapshot from MongoDB: {str(e)}")
+            raise
+    
+    def insert_context_snapshot(self, key: str, exam_id: str, context: str) -> None:
+        """
+        Insert a context snapshot into MongoDB.
+        
+        Args:
+            key: Cache key of the snapshot
+            exam_id: ID of the exam the snapshot belongs to
+            context: The context string
+        """
+        try:
+            self.db[settings.MONGO_COLLECTION_CONTEXT_CACHE].replace_one(
+                {"_id": key},
+                {"_id": key, "exam_id": exam_id, "context": context},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error inserting context snapshot into MongoDB: {str(e)}")
+            raise
+    
+    def get_youtube_cache_entries(self, keys: List[str]) -> Dict[str, dict]:
+        """
+        Retrieve cached YouTube API results from MongoDB.
+        
+        Args:
+            keys: Cache keys of the entries
+        
+        Returns:
+            Dictionary mapping cache keys to their entries (`data` and `fetched_at`)
+        """
+        try:
+            cursor = self.db[settings.MONGO_COLLECTION_YOUTUBE_CACHE].find({"_id": {"$in": keys}})
+            return {doc["_id"]: doc for doc in cursor}
+        except Exception as e:
+            logger.error(f"Error retrieving YouTube cache entries from MongoDB: {str(e)}")
+            raise
+    
+    def upsert_youtube_cache_entry(self, key: str, kind: str, data) -> None:
+        """
+        Insert or refresh a cached YouTube API result in MongoDB.
+        
+        Args:
+            key: Cache key of the entry
+            kind: Kind of cached result ("search" or "video")
+            data: The cached result
+        """
+        try:
+            self.db[settings.MONGO_COLLECTION_YOUTUBE_CACHE].replace_one(
+                {"_id": key},
+                {"_id": key, "kind": kind, "data": data, "fetched_at": datetime.now(timezone.utc)},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error inserting YouTube cache entry into MongoDB: {str(e)}")
+            raise
+    
+    def get_youtube_quota_used(self, day: str) -> int:
+        """
+        Get the YouTube API quota units used on a day.
+        
+        Args:
+            day: Quota day in ISO format (YYYY-MM-DD, Pacific Time)
+        
+        Returns:
+            Units used so far
+        """
+        try:
+            quota_doc = self.db[settings.MONGO_COLLECTION_YOUTUBE_QUOTA].find_one({"_id": day})
+            return quota_doc["units"] if quota_doc else 0
+        except Exception as e:
+            logger.error(f"Error retrieving YouTube quota from MongoDB: {str(e)}")
+            raise
+    
+    def increment_youtube_quota_used(self, day: str, units: int) -> int:
+        """
+        Add units to the YouTube API quota used on a day.
+        
+        Args:
+            day: Quota day in ISO format (YYYY-MM-DD, Pacific Time)
+            units: Units to add
+        
+        Returns:
+            Units used after the increment
+        """
+        try:
+            quota_doc = self.db[settings.MONGO_COLLECTION_YOUTUBE_QUOTA].find_one_and_update(
+                {"_id": day},
+                {"$inc": {"units": units}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return quota_doc["units"]
+        except Exception as e:
+            logger.error(f"Error incrementing YouTube quota in MongoDB: {str(e)}")
+            raise
+    
+    def insert_mindmap_job(self, job: dict) -> bool:
+        """
+        Insert a mindmap generation job into MongoDB.
+        
+        Args:
+            job: The job document
+        
+        Returns:
+            False if another job is already active for the same exam
+        """
+        try:
+            logger.debug(f"Inserting mindmap job into MongoDB for exam: {job['exam_id']}")
+            self.db[settings.MONGO_COLLECTION_MINDMAP_JOBS].insert_one(job)
+            return True
+        except DuplicateKeyError:
+            return False
+        except Exception as e:
+            logger.error(f"Error inserting mindmap job into MongoDB: {str(e)}")
+            raise
+    
+    def get_active_mindmap_job(self, exam_id: str) -> Optional[dict]:
+        """
+        Retrieve the active mindmap generation job of an exam from MongoDB.
+        
+        Args:
+            exam_id: ID of the exam
+        
+        Returns:
+            The job document or None if no job is active
+        """
+        try:
+            return self.db[settings.MONGO_COLLECTION_MINDMAP_JOBS].find_one(
+                {"exam_id": exam_id, "active": True}
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving active mindmap job from MongoDB: {str(e)}")
+            raise
+    
+    def update_mindmap_job(self, job_id: str, fields: dict, finished: bool = False) -> None:
+        """
+        Update the state of a mindmap generation job in MongoDB.
+        
+        Args:
+            job_id: ID of the job
+            fields: Fields to set
+            finished: Whether the job is done, which releases the exam for new jobs
+        """
+        try:
+            now = datetime.now(timezone.utc)
+            update = {"$set": {**fields, "updated_at": now}}
+            if finished:
+                update["$set"]["finished_at"] = now
+                update["$unset"] = {"active": ""}
+            self.db[settings.MONGO_COLLECTION_MINDMAP_JOBS].update_one({"_id": job_id}, update)
+        except Exception as e:
+            logger.error(f"Error updating mindmap job in MongoDB: {str(e)}")
+            raise
 
 @lru_cache
 def get_mongodb_client() -> MongoDBClient:
@@ -1,14 +1,23 @@
-from .base import get_db, DatabaseBase
-from .schema import Subject, Exam, Reference, Chunks
+from .base import get_db, get_read_db, get_async_db, get_async_read_db, DatabaseBase
+from .pagination import InvalidCursorError, keyset_page
+from .schema import Subject, Exam, Reference, Chunks, UsageRecord
 
 __all__ = [
     # Base
     "DatabaseBase",
     "get_db",
+    "get_read_db",
+    "get_async_db",
+    "get_async_read_db",
+    
+    # Pagination
+    "InvalidCursorError",
+    "keyset_page",
     
     # Schemas
     "Subject",
     "Exam",
     "Reference",
     "Chunks",
+    "UsageRecord",
 ]
@@ -1,24 +1,79 @@
 # Path: app/utils/postgres/base.py
 # Description: Database Client for PostgreSQL.
 
-from sqlalchemy import create_engine
-from sqlalchemy_utils import create_database, database_exists
+import time
+from typing import Optional
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import get_settings
+from app.utils.metrics import get_metrics
 
 # Get the settings
 settings = get_settings()
 
-# Create the database if it doesn't exist
-if not database_exists(settings.get_postgres_uri()):
-    create_database(settings.get_postgres_uri())
+# Get the metrics registry
+metrics = get_metrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording how long checkouts wait for a connection and how often they time out."""
+    
+    role = "primary"
+    
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.increment("postgres_pool_timeouts_total", role=self.role)
+            raise
+        finally:
+            metrics.observe("postgres_pool_checkout_wait_seconds", time.perf_counter() - start_time, role=self.role)
+            metrics.observe("postgres_pool_checked_out", self.checkedout(), role=self.role)
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for engines of async drivers."""
+
+def _pool_options(base: type, role: str) -> dict:
+    # The pool class is recreated by `Engine.dispose()`, so the role lives on the class
+    return {
+        "poolclass": type(f"{base.__name__}[{role}]", (base,), {"role": role}),
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+    }
+
+def _create_engine(uri: str, role: str) -> Engine:
+    return create_engine(uri, **_pool_options(InstrumentedQueuePool, role))
+
+def _create_async_engine(uri: str, role: str) -> AsyncEngine:
+    # Same database through asyncpg, for async endpoints
+    async_uri = make_url(uri).set(drivername="postgresql+asyncpg")
+    return create_async_engine(async_uri, **_pool_options(InstrumentedAsyncQueuePool, f"{role}-async"))
 
 # Create the engine
-engine = create_engine(settings.get_postgres_uri())
+engine = _create_engine(settings.get_postgres_uri(), "primary")
 
-# Create the session
+# Create the read-only engine, on the replica if one is configured
+replica_uri: Optional[str] = settings.get_postgres_replica_uri()
+read_engine = _create_engine(replica_uri, "replica") if replica_uri else engine
+
+# Create the async engines
+async_engine = _create_async_engine(settings.get_postgres_uri(), "primary")
+async_read_engine = _create_async_engine(replica_uri, "replica") if replica_uri else async_engine
+
+# Create the sessions
 Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSession = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Loaded attributes stay usable after a commit, as async sessions cannot reload them implicitly
+AsyncSession = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine)
+AsyncReadSession = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_read_engine)
 
 # Create the base class
 DatabaseBase = declarative_base()
@@ -30,3 +85,29 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """
+    Get Database Session for read-only endpoints.
+    
+    Bound to the replica when `POSTGRES_REPLICA_URI` is set, so reads may lag recent writes slightly.
+    """
+    db = ReadSession()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """Get Async Database Session, for async endpoints."""
+    async with AsyncSession() as db:
+        yield db
+
+async def get_async_read_db():
+    """
+    Get Async Database Session for read-only async endpoints.
+    
+    Bound to the replica when `POSTGRES_REPLICA_URI` is set, like `get_read_db`.
+    """
+    async with AsyncReadSession() as db:
+        yield db
@@ -0,0 +1,94 @@
+# Path: app/utils/postgres/pagination.py
+# Description: Keyset (cursor) pagination over stable sort keys, so pages cost the same however deep they are.
+
+import json, base64
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor was not produced for the requested sort keys."""
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key values of the last row of a page into an opaque cursor.
+    
+    Args:
+        values: Values of the sort keys
+    
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else str(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor into values of the given sort key columns.
+    
+    Args:
+        cursor: Cursor returned with a previous page
+        columns: The sort key columns
+    
+    Returns:
+        One value per column, converted to the column's Python type
+    
+    Raises:
+        InvalidCursorError: If the cursor is malformed or does not match the columns
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        raw_values = json.loads(payload)
+        if not isinstance(raw_values, list) or len(raw_values) != len(columns):
+            raise ValueError("wrong number of values")
+        
+        values = []
+        for column, raw_value in zip(columns, raw_values):
+            python_type = column.type.python_type
+            values.append(python_type.fromisoformat(raw_value) if python_type is datetime else python_type(raw_value))
+        return values
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {str(e)}")
+
+def keyset_page(
+    query: Query,
+    columns: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a query ordered by unique sort keys.
+    
+    Rows after the cursor are selected with a row comparison on the sort keys, which an index on
+    those columns serves directly instead of skipping an offset.
+    
+    Args:
+        query: The query, with its filters but without ordering
+        columns: Sort key columns, together unique (e.g. ending with the primary key); each must also
+            be selected by the query under its own name
+        limit: Maximum number of rows in the page
+        cursor: Cursor returned with the previous page, None for the first page
+        descending: Whether to sort in descending order
+    
+    Returns:
+        The rows of the page, and the cursor of the next page or None if this is the last one
+    
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    if cursor:
+        keys = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(keys < values if descending else keys > values)
+    
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in columns))
+    
+    # One extra row tells whether there is a next page
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
@@ -10,12 +10,15 @@ from sqlalchemy import (
     UUID, 
     DateTime, 
     Integer,
+    Float,
+    Index,
     Enum as SQLEnum,
     ForeignKeyConstraint,
     UniqueConstraint
 )
 from sqlalchemy.orm import relationship
-from app.utils.models import ReferencesTypeEnum
+from sqlalchemy.sql import func
+from app.utils.models import ReferencesTypeEnum, UsageKindEnum
 
 class Subject(DatabaseBase):
     __tablename__ = "subjects"
@@ -43,6 +46,7 @@ class Exam(DatabaseBase):
     
     __table_args__ = (
         UniqueConstraint("name", "subject_id", name="unique_exam_name_per_subject"),
+        Index("ix_exams_exam_datetime_id", "exam_datetime", "id"),
         ForeignKeyConstraint(
             ["subject_id"],
             ["subjects.id"],
@@ -63,6 +67,8 @@ class Reference(DatabaseBase):
     
     __table_args__ = (
         UniqueConstraint("file_type", "file_name", "exam_id", name="unique_reference_file_per_exam"),
+        # The unique constraint leads with file_type, so it cannot serve lookups by exam
+        Index("ix_references_exam_id_file_name_id", "exam_id", "file_name", "id"),
         ForeignKeyConstraint(
             ["exam_id"],
             ["exams.id"],
@@ -82,10 +88,30 @@ class Chunks(DatabaseBase):
     reference = relationship("Reference", backref="chunks")
     
     __table_args__ = (
+        # Also serves lookups by reference_id, its leading column
         UniqueConstraint("reference_id", "chunk_number", name="unique_chunk_number_per_reference"),
         ForeignKeyConstraint(
             ["reference_id"],
             ["references.id"],
             ondelete="CASCADE",
         ),
-    )
\ No newline at end of file
+    )
+
+class UsageRecord(DatabaseBase):
+    __tablename__ = "usage_records"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    exam_id = Column(UUID(as_uuid=True), nullable=True)  # no FK, usage outlives deleted exams
+    route = Column(String, nullable=False)
+    kind = Column(SQLEnum(UsageKindEnum), nullable=False)
+    model = Column(String, nullable=False)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    quota_units = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Float, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_usage_records_exam_id_created_at", "exam_id", "created_at"),
+        Index("ix_usage_records_created_at", "created_at"),
+    )
@@ -0,0 +1,25 @@
+from .context import (
+    RequestContext,
+    get_request_context,
+    set_request_context,
+    bind_request_context,
+)
+from .cancellation import (
+    CancelToken,
+    RequestCancelledError,
+    get_cancel_token,
+    set_cancel_token,
+    cancellation_scope,
+)
+
+__all__ = [
+    "RequestContext",
+    "get_request_context",
+    "set_request_context",
+    "bind_request_context",
+    "CancelToken",
+    "RequestCancelledError",
+    "get_cancel_token",
+    "set_cancel_token",
+    "cancellation_scope",
+]
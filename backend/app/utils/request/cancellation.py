@@ -0,0 +1,148 @@
+# Path: app/utils/request/cancellation.py
+# Description: Request-scoped cancellation tokens fired by client disconnects or deadlines.
+
+import time, asyncio, threading
+from contextvars import ContextVar
+from typing import Callable, Optional
+from fastapi import Request
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.metrics import get_metrics
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+
+class RequestCancelledError(Exception):
+    """Raised by long-running work when the request it serves was cancelled."""
+    
+    def __init__(self, reason: str):
+        super().__init__(f"Request cancelled: {reason}")
+        self.reason = reason
+
+class CancelToken:
+    """
+    Thread-safe cancellation token with an optional deadline.
+    
+    Blocking call sites poll `raise_if_cancelled()` between steps and may register callbacks
+    (e.g. closing an in-flight HTTP stream) that run as soon as the token is cancelled.
+    """
+    
+    def __init__(self, deadline_seconds: Optional[float] = None):
+        """
+        Initialize the token.
+        
+        Args:
+            deadline_seconds: Seconds after which the token counts as cancelled (None for no deadline)
+        """
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._callbacks: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        return self._event.is_set()
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, or None if there is no deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def cancel(self, reason: str) -> None:
+        """Cancel the token and run every registered callback once."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Error in cancellation callback: {str(e)}")
+    
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Register `callback` to run on cancellation (immediately if already cancelled).
+        
+        Returns:
+            A function that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+    
+    def raise_if_cancelled(self) -> None:
+        """Raise RequestCancelledError if the token has been cancelled."""
+        if self.cancelled:
+            raise RequestCancelledError(self.reason)
+    
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds; return True early if the token gets cancelled."""
+        remaining = self.remaining()
+        if remaining is not None and remaining < timeout:
+            self._event.wait(remaining)
+            return self.cancelled
+        return self._event.wait(timeout)
+    
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+_cancel_token: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+def get_cancel_token() -> Optional[CancelToken]:
+    """Get the cancellation token of the current request, if any."""
+    return _cancel_token.get()
+
+def set_cancel_token(token: Optional[CancelToken]) -> None:
+    """Bind `token` to the current execution context."""
+    _cancel_token.set(token)
+
+def cancellation_scope(deadline_seconds: float):
+    """
+    Create a FastAPI dependency that binds a CancelToken to the request.
+    
+    While the endpoint runs, a watcher task polls the connection and cancels the token when the
+    client disconnects. The token also cancels itself once `deadline_seconds` have elapsed.
+    
+    Args:
+        deadline_seconds: Maximum time the request may spend on upstream work
+    """
+    async def dependency(request: Request):
+        token = CancelToken(deadline_seconds)
+        set_cancel_token(token)
+        
+        async def watch_disconnect():
+            while not token.cancelled:
+                if await request.is_disconnected():
+                    logger.info(f"Client disconnected from {request.url.path}, cancelling upstream work")
+                    token.cancel("client_disconnected")
+                    return
+                await asyncio.sleep(settings.DISCONNECT_POLL_INTERVAL_SECONDS)
+        
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            yield token
+        finally:
+            watcher.cancel()
+            if token.reason is not None:
+                route = request.scope.get("route")
+                metrics.increment(
+                    "requests_cancelled_total",
+                    route=route.path if route else request.url.path,
+                    reason=token.reason,
+                )
+    
+    return dependency
@@ -0,0 +1,43 @@
+# Path: app/utils/request/context.py
+# Description: Request-scoped context (route, exam) made available to deep call sites through a context variable.
+
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Request
+
+@dataclass
+class RequestContext:
+    route: str
+    exam_id: Optional[uuid.UUID] = None
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+def get_request_context() -> Optional[RequestContext]:
+    """Get the context of the request currently being handled, if any."""
+    return _request_context.get()
+
+def set_request_context(context: RequestContext) -> None:
+    """Bind `context` to the current execution context."""
+    _request_context.set(context)
+
+async def bind_request_context(request: Request) -> RequestContext:
+    """
+    FastAPI dependency binding the route template and exam ID of the request.
+    
+    It is declared async so the context variable is set in the request task itself and is
+    therefore inherited by sync endpoints running in the thread pool.
+    """
+    route = request.scope.get("route")
+    try:
+        exam_id = uuid.UUID(str(request.path_params["exam_id"]))
+    except (KeyError, ValueError):
+        exam_id = None
+    
+    context = RequestContext(
+        route=f"{request.method} {route.path}" if route else request.url.path,
+        exam_id=exam_id,
+    )
+    set_request_context(context)
+    return context
@@ -0,0 +1,7 @@
+from .recorder import UsageRecorder, get_usage_recorder, YOUTUBE_QUOTA_COSTS
+
+__all__ = [
+    "UsageRecorder",
+    "get_usage_recorder",
+    "YOUTUBE_QUOTA_COSTS",
+]
@@ -0,0 +1,128 @@
+# Path: app/utils/usage/recorder.py
+# Description: Buffered recorder persisting LLM, embedding and YouTube API usage records to PostgreSQL.
+
+import uuid, time, queue, atexit, threading
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import insert
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.metrics import get_metrics
+from app.utils.models import UsageKindEnum
+from app.utils.postgres import UsageRecord
+from app.utils.postgres.base import Session
+from app.utils.request import get_request_context
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+
+# Quota cost of the YouTube Data API v3 methods we call
+YOUTUBE_QUOTA_COSTS = {
+    "search.list": 100,
+    "videos.list": 1,
+}
+
+class UsageRecorder:
+    """
+    Collects usage records in memory and writes them to PostgreSQL in batches from a background
+    thread, so recording never adds a database round trip to the request path.
+    """
+    
+    def __init__(self):
+        """Initialize the buffer; the flusher thread is started on the first record."""
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=settings.USAGE_BUFFER_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+    
+    def record_completion(self, model: str, prompt_tokens: int, completion_tokens: int, latency: float) -> None:
+        """Record a chat completion call."""
+        self._record(UsageKindEnum.COMPLETION, model, prompt_tokens, completion_tokens, 0, latency)
+    
+    def record_embedding(self, model: str, prompt_tokens: int, latency: float) -> None:
+        """Record an embeddings call."""
+        self._record(UsageKindEnum.EMBEDDING, model, prompt_tokens, 0, 0, latency)
+    
+    def record_youtube(self, method: str, latency: float) -> None:
+        """
+        Record a YouTube Data API call.
+        
+        Args:
+            method: API method, e.g. "search.list"
+            latency: Call duration in seconds
+        """
+        units = YOUTUBE_QUOTA_COSTS.get(method, 1)
+        metrics.increment("youtube_quota_units_total", units, method=method)
+        self._record(UsageKindEnum.YOUTUBE, method, 0, 0, units, latency)
+    
+    def flush(self) -> None:
+        """Write every buffered record to PostgreSQL."""
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if not rows:
+            return
+        
+        db = Session()
+        try:
+            db.execute(insert(UsageRecord), rows)
+            db.commit()
+            logger.debug(f"Flushed {len(rows)} usage records")
+        except Exception as e:
+            db.rollback()
+            metrics.increment("usage_records_dropped_total", len(rows), reason="flush_error")
+            logger.error(f"Error flushing usage records: {str(e)}")
+        finally:
+            db.close()
+    
+    def _record(
+        self,
+        kind: UsageKindEnum,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        quota_units: int,
+        latency: float,
+    ) -> None:
+        context = get_request_context()
+        row = {
+            "id": uuid.uuid4(),
+            "created_at": datetime.now(timezone.utc),
+            "exam_id": context.exam_id if context else None,
+            "route": context.route if context else "internal",
+            "kind": kind,
+            "model": model,
+            "prompt_tokens": prompt_tokens or 0,
+            "completion_tokens": completion_tokens or 0,
+            "quota_units": quota_units,
+            "latency_ms": latency * 1000,
+        }
+        
+        self._ensure_flusher()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            metrics.increment("usage_records_dropped_total", reason="buffer_full")
+            logger.warning("Usage buffer full, dropping record")
+    
+    def _ensure_flusher(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="usage-flusher", daemon=True)
+                self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            time.sleep(settings.USAGE_FLUSH_INTERVAL_SECONDS)
+            self.flush()
+
+@lru_cache
+def get_usage_recorder() -> UsageRecorder:
+    """Get a singleton instance of the usage recorder."""
+    return UsageRecorder()
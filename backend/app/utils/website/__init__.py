@@ -0,0 +1,7 @@
+from .metadata import WebsiteMetadataService, canonicalize_url, get_website_metadata_service
+
+__all__ = [
+    "WebsiteMetadataService",
+    "canonicalize_url",
+    "get_website_metadata_service",
+]
@@ -0,0 +1,94 @@
+# Path: app/utils/website/head.py
+# Description: Incremental parser extracting page metadata from the <head> of an HTML document.
+
+from html.parser import HTMLParser
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+# Tags that can only appear once the head is over
+BODY_TAGS = {"body", "main", "article", "section", "div", "p", "h1", "h2", "header", "nav"}
+
+class HeadMetadataParser(HTMLParser):
+    """
+    Collects the title, OpenGraph title and description, meta description and favicon of a page.
+    
+    Text is fed in chunks as it is downloaded; `done` is set once the head is over, so the rest of
+    the document never needs to be read.
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self.title: Optional[str] = None
+        self.og_title: Optional[str] = None
+        self.og_description: Optional[str] = None
+        self.description: Optional[str] = None
+        self.favicon: Optional[str] = None
+        self._title_parts = None
+    
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag in BODY_TAGS:
+            self._finish()
+            return
+        
+        attributes = {name: (value or "").strip() for name, value in attrs}
+        if tag == "title" and self.title is None:
+            self._title_parts = []
+        elif tag == "meta":
+            key = (attributes.get("property") or attributes.get("name") or "").lower()
+            content = attributes.get("content")
+            if not content:
+                return
+            if key == "og:title" and self.og_title is None:
+                self.og_title = content
+            elif key == "og:description" and self.og_description is None:
+                self.og_description = content
+            elif key == "description" and self.description is None:
+                self.description = content
+        elif tag == "link" and self.favicon is None:
+            rel = attributes.get("rel", "").lower().split()
+            if "icon" in rel and attributes.get("href"):
+                self.favicon = attributes["href"]
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+    
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+    
+    def handle_endtag(self, tag):
+        if tag == "title" and self._title_parts is not None:
+            self.title = " ".join("".join(self._title_parts).split()) or None
+            self._title_parts = None
+        elif tag == "head":
+            self._finish()
+    
+    def _finish(self):
+        if self._title_parts is not None:
+            self.handle_endtag("title")
+        self.done = True
+    
+    def metadata(self, base_url: str) -> Dict[str, Optional[str]]:
+        """
+        Get the collected metadata.
+        
+        Args:
+            base_url: URL the document was served from, to resolve the favicon against
+        
+        Returns:
+            The `title`, `description`, `og_title`, `og_description` and `favicon` of the page. The
+            title falls back to the OpenGraph title and the favicon to /favicon.ico.
+        """
+        if self._title_parts is not None:
+            self.handle_endtag("title")
+        
+        return {
+            "title": self.title or self.og_title or "Untitled website",
+            "description": self.og_description or self.description,
+            "og_title": self.og_title,
+            "og_description": self.og_description,
+            "favicon": urljoin(base_url, self.favicon or "/favicon.ico"),
+        }
@@ -0,0 +1,227 @@
+# Path: app/utils/website/metadata.py
+# Description: Cached website metadata extraction over a pooled HTTP client.
+
+import re, time, codecs, contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Union
+from urllib.parse import urlsplit, urlunsplit
+import httpx
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.cache import LRUCache
+from app.utils.metrics import get_metrics
+from .head import HeadMetadataParser
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+
+# Bytes at the start of a document searched for a <meta charset>, as browsers do
+CHARSET_PRESCAN_BYTES = 1024
+
+# Matches both <meta charset="..."> and <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that equivalent URLs share one cache entry.
+    
+    The scheme and host are lowercased, default ports and fragments are dropped and an empty
+    path becomes "/". A URL without a scheme is taken as https.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port and not (scheme, parts.port) in (("http", 80), ("https", 443)):
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+def sniff_encoding(prefix: bytes, header_charset: Optional[str]) -> str:
+    """
+    Pick the encoding of an HTML document.
+    
+    The charset of the Content-Type header wins, then a <meta charset> in the start of the document,
+    then UTF-8, which most pages use. Unknown names are skipped.
+    
+    Args:
+        prefix: The first bytes of the document
+        header_charset: Charset of the Content-Type header, if any
+    
+    Returns:
+        Name of the encoding
+    """
+    match = META_CHARSET_PATTERN.search(prefix)
+    meta_charset = match.group(1).decode("ascii") if match else None
+    
+    for charset in (header_charset, meta_charset):
+        if charset:
+            try:
+                return codecs.lookup(charset).name
+            except LookupError:
+                continue
+    return "utf-8"
+
+class WebsiteMetadataService:
+    """
+    Extracts website metadata through one pooled HTTP client.
+    
+    Results are cached in-process by canonical URL for `WEBSITE_METADATA_CACHE_TTL_SECONDS`, and
+    batches are fetched concurrently on a bounded pool.
+    """
+    
+    def __init__(self):
+        self.client = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(settings.WEBSITE_REQUEST_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.WEBSITE_FETCH_CONCURRENCY,
+                max_keepalive_connections=settings.WEBSITE_FETCH_CONCURRENCY,
+            ),
+        )
+        
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.WEBSITE_FETCH_CONCURRENCY,
+            thread_name_prefix="website-fetch",
+        )
+        self.cache = LRUCache(
+            max_entries=settings.WEBSITE_METADATA_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.WEBSITE_METADATA_CACHE_TTL_SECONDS,
+        )
+    
+    def get_metadata(self, url: str) -> Dict[str, Optional[str]]:
+        """
+        Get the metadata of a website, from the cache if possible.
+        
+        Args:
+            url: URL of the website
+        
+        Returns:
+            The metadata: `title`, `description`, `og_title`, `og_description` and `favicon`
+        
+        Raises:
+            httpx.HTTPError: If the website cannot be fetched in `WEBSITE_FETCH_DEADLINE_SECONDS`
+        """
+        key = canonicalize_url(url)
+        metadata = self.cache.get(key)
+        if metadata is not None:
+            metrics.increment("website_metadata_cache_requests_total", result="hit")
+            return metadata
+        
+        metrics.increment("website_metadata_cache_requests_total", result="miss")
+        metadata = self._fetch(key)
+        self.cache.set(key, metadata)
+        return metadata
+    
+    def get_metadata_batch(self, urls: List[str]) -> Dict[str, Union[Dict[str, Optional[str]], Exception]]:
+        """
+        Get the metadata of several websites concurrently.
+        
+        Args:
+            urls: URLs of the websites
+        
+        Returns:
+            Dictionary mapping each URL to its metadata, or to the error that prevented fetching it
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        futures = {
+            url: self.executor.submit(contextvars.copy_context().run, self.get_metadata, url)
+            for url in unique_urls
+        }
+        
+        results = {}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                logger.warning(f"Error extracting website metadata for {url}: {str(e)}")
+                results[url] = e
+        return results
+    
+    def _fetch(self, url: str) -> Dict[str, Optional[str]]:
+        parser = HeadMetadataParser()
+        # Timeouts apply to each read, so a server trickling bytes is bounded by a deadline as well
+        deadline = time.monotonic() + settings.WEBSITE_FETCH_DEADLINE_SECONDS
+        received = 0
+        prefix = b""
+        decoder = None
+        
+        with self.client.stream("GET", url) as response:
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            
+            chunks = response.iter_bytes()
+            for chunk in chunks:
+                self._check_deadline(response, deadline)
+                chunk = chunk[:settings.WEBSITE_HEAD_MAX_BYTES - received]
+                received += len(chunk)
+                
+                if decoder is None:
+                    # The encoding is picked once the start of the document can be searched for a charset
+                    prefix += chunk
+                    if len(prefix) < CHARSET_PRESCAN_BYTES and received < settings.WEBSITE_HEAD_MAX_BYTES:
+                        continue
+                    decoder = self._decoder(prefix, response)
+                    chunk, prefix = prefix, b""
+                
+                parser.feed(decoder.decode(chunk))
+                if parser.done or received >= settings.WEBSITE_HEAD_MAX_BYTES:
+                    break
+            
+            if decoder is None:
+                # The whole document is shorter than the charset prescan
+                parser.feed(self._decoder(prefix, response).decode(prefix, final=True))
+            
+            self._drain(response, chunks, deadline)
+            base_url = str(response.url)
+        
+        metrics.observe("website_metadata_bytes_read", received)
+        return parser.metadata(base_url)
+    
+    def _decoder(self, prefix: bytes, response: httpx.Response) -> codecs.IncrementalDecoder:
+        return codecs.getincrementaldecoder(sniff_encoding(prefix, response.charset_encoding))(errors="replace")
+    
+    def _check_deadline(self, response: httpx.Response, deadline: float) -> None:
+        if time.monotonic() > deadline:
+            metrics.increment("website_fetch_deadline_exceeded_total")
+            raise httpx.ReadTimeout(
+                f"Fetching {response.url} took more than {settings.WEBSITE_FETCH_DEADLINE_SECONDS}s",
+                request=response.request,
+            )
+    
+    def _drain(self, response: httpx.Response, chunks: Iterator[bytes], deadline: float) -> None:
+        """
+        Read out the rest of a short body so that its HTTP/1.1 connection goes back to the pool.
+        
+        Closing a response with unread body discards its connection. Bodies with more than
+        `WEBSITE_DRAIN_MAX_BYTES` left, or that cannot be read before the deadline, are still
+        discarded, as a new connection is cheaper. HTTP/2 streams are closed without losing the
+        connection.
+        """
+        if response.http_version == "HTTP/2" or response.is_stream_consumed:
+            return
+        
+        content_length = response.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) - response.num_bytes_downloaded > settings.WEBSITE_DRAIN_MAX_BYTES:
+            metrics.increment("website_connections_total", result="discarded")
+            return
+        
+        drained = 0
+        for chunk in chunks:
+            drained += len(chunk)
+            if drained > settings.WEBSITE_DRAIN_MAX_BYTES or time.monotonic() > deadline:
+                metrics.increment("website_connections_total", result="discarded")
+                return
+        metrics.increment("website_connections_total", result="reused")
+
+@lru_cache
+def get_website_metadata_service() -> WebsiteMetadataService:
+    """Get a singleton instance of the website metadata service."""
+    return WebsiteMetadataService()
@@ -0,0 +1,19 @@
+from .pool import (
+    WorkloadLimits,
+    WorkloadRejectedError,
+    WorkloadPool,
+    get_workload_pool,
+    run_in_workload,
+    workload,
+    workload_route,
+)
+
+__all__ = [
+    "WorkloadLimits",
+    "WorkloadRejectedError",
+    "WorkloadPool",
+    "get_workload_pool",
+    "run_in_workload",
+    "workload",
+    "workload_route",
+]
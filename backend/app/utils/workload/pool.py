@@ -0,0 +1,153 @@
+# Path: app/utils/workload/pool.py
+# Description: Bounded, per-workload executors with admission control, so one class of requests cannot starve another.
+
+import time, asyncio, functools, threading, contextvars
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict
+from fastapi.routing import APIRoute
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.metrics import get_metrics
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+
+@dataclass(frozen=True)
+class WorkloadLimits:
+    max_workers: int
+    max_queue: int
+
+def _workload_limits() -> Dict[str, WorkloadLimits]:
+    return {
+        "crud": WorkloadLimits(settings.WORKLOAD_CRUD_MAX_WORKERS, settings.WORKLOAD_CRUD_MAX_QUEUE),
+        "ingestion": WorkloadLimits(settings.WORKLOAD_INGESTION_MAX_WORKERS, settings.WORKLOAD_INGESTION_MAX_QUEUE),
+        "chat": WorkloadLimits(settings.WORKLOAD_CHAT_MAX_WORKERS, settings.WORKLOAD_CHAT_MAX_QUEUE),
+        "mindmap": WorkloadLimits(settings.WORKLOAD_MINDMAP_MAX_WORKERS, settings.WORKLOAD_MINDMAP_MAX_QUEUE),
+    }
+
+class WorkloadRejectedError(Exception):
+    """Raised when a workload's queue is full and the request is shed."""
+    
+    def __init__(self, workload: str):
+        super().__init__(f"Workload {workload} is overloaded")
+        self.workload = workload
+
+class WorkloadPool:
+    """
+    Thread pool of one workload class with a bounded queue.
+    
+    At most `max_workers` calls run at once and at most `max_queue` more wait for a thread; further
+    calls are rejected immediately with WorkloadRejectedError instead of queueing behind them.
+    """
+    
+    def __init__(self, name: str, limits: WorkloadLimits):
+        self.name = name
+        self.limits = limits
+        self.executor = ThreadPoolExecutor(
+            max_workers=limits.max_workers,
+            thread_name_prefix=f"workload-{name}",
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.limits.max_workers + self.limits.max_queue:
+                metrics.increment("workload_rejected_total", workload=self.name)
+                raise WorkloadRejectedError(self.name)
+            self._pending += 1
+            pending = self._pending
+        metrics.observe("workload_pending", pending, workload=self.name)
+    
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+    
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking function on the workload's threads, in the current context.
+        
+        Args:
+            fn: The function
+            args: Positional arguments of the function
+            kwargs: Keyword arguments of the function
+        
+        Returns:
+            The result of the function
+        
+        Raises:
+            WorkloadRejectedError: If the workload's queue is full
+        """
+        self._admit()
+        submitted_at = time.perf_counter()
+        context = contextvars.copy_context()
+        
+        def call():
+            started_at = time.perf_counter()
+            metrics.observe("workload_queue_wait_seconds", started_at - submitted_at, workload=self.name)
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                metrics.observe("workload_run_seconds", time.perf_counter() - started_at, workload=self.name)
+                self._release()
+        
+        try:
+            future = self.executor.submit(call)
+        except Exception:
+            self._release()
+            raise
+        # A job cancelled while still queued never runs `call`, so its slot is released here
+        future.add_done_callback(lambda done: done.cancelled() and self._release())
+        return await asyncio.wrap_future(future)
+
+@lru_cache
+def get_workload_pool(name: str) -> WorkloadPool:
+    """Get the singleton pool of a workload class ("crud", "ingestion", "chat" or "mindmap")."""
+    return WorkloadPool(name, _workload_limits()[name])
+
+def run_in_workload(name: str, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a sync endpoint so that it runs on the pool of a workload class.
+    
+    Async endpoints are returned unchanged; they hand their blocking parts to the pool themselves.
+    
+    Args:
+        name: Name of the workload class
+        endpoint: The endpoint function
+    
+    Returns:
+        An async endpoint with the same signature
+    """
+    if asyncio.iscoroutinefunction(endpoint) or getattr(endpoint, "__workload__", None):
+        return endpoint
+    
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        return await get_workload_pool(name).run(endpoint, *args, **kwargs)
+    
+    wrapper.__workload__ = name
+    return wrapper
+
+def workload(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator running a sync endpoint on the pool of a workload class, overriding its router's class."""
+    return lambda endpoint: run_in_workload(name, endpoint)
+
+def workload_route(name: str) -> type:
+    """
+    Create a route class running the sync endpoints of a router on the pool of a workload class.
+    
+    Args:
+        name: Name of the workload class
+    
+    Returns:
+        An APIRoute subclass, to pass as the `route_class` of an APIRouter
+    """
+    class WorkloadRoute(APIRoute):
+        def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+            super().__init__(path, run_in_workload(name, endpoint), **kwargs)
+    
+    WorkloadRoute.__name__ = f"WorkloadRoute[{name}]"
+    return WorkloadRoute
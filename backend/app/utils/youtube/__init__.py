@@ -1,5 +1,18 @@
-from .client import get_youtube_client
+from .client import get_youtube_client, get_youtube_http
+from .search import (
+    QuotaTracker,
+    YouTubeSearchService,
+    get_youtube_search_service,
+    normalize_search_query,
+)
+from .urls import extract_video_id
 
 __all__ = [
     "get_youtube_client",
+    "get_youtube_http",
+    "QuotaTracker",
+    "YouTubeSearchService",
+    "get_youtube_search_service",
+    "normalize_search_query",
+    "extract_video_id",
 ]
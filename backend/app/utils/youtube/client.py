@@ -1,6 +1,8 @@
 # Path: app/utils/youtube/client.py
 # Description: This file contains code to get Youtube API client.
 
+import threading
+import httplib2
 from functools import lru_cache
 from googleapiclient.discovery import build
 from app.logger import get_logger
@@ -12,6 +14,9 @@ logger = get_logger()
 # Get app config
 settings = get_settings()
 
+# Thread-local HTTP transports, httplib2 connections must not be shared between threads
+_thread_local = threading.local()
+
 # Initialize YouTube API client
 @lru_cache
 def get_youtube_client():
@@ -22,3 +27,13 @@ def get_youtube_client():
     except Exception as e:
         logger.error(f"Error initializing YouTube API client: {str(e)}")
         raise
+
+def get_youtube_http() -> httplib2.Http:
+    """
+    Get the HTTP transport of the current thread for executing YouTube API requests.
+    
+    The transport enforces `YOUTUBE_REQUEST_TIMEOUT_SECONDS` as its socket timeout.
+    """
+    if not hasattr(_thread_local, "http"):
+        _thread_local.http = httplib2.Http(timeout=settings.YOUTUBE_REQUEST_TIMEOUT_SECONDS)
+    return _thread_local.http
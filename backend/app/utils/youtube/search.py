@@ -0,0 +1,233 @@
+# Path: app/utils/youtube/search.py
+# Description: Cached, quota-aware access to the YouTube Data API search and video lookups.
+
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List
+from zoneinfo import ZoneInfo
+from googleapiclient.errors import HttpError
+from app.config import get_settings
+from app.logger import get_logger
+from app.utils.metrics import get_metrics
+from app.utils.mongodb import get_mongodb_client
+from app.utils.request import get_cancel_token
+from app.utils.usage import get_usage_recorder, YOUTUBE_QUOTA_COSTS
+from .client import get_youtube_client, get_youtube_http
+
+settings = get_settings()
+logger = get_logger()
+metrics = get_metrics()
+usage_recorder = get_usage_recorder()
+
+# YouTube quota resets at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# The API accepts up to 50 IDs per videos.list call
+MAX_VIDEO_IDS_PER_CALL = 50
+
+def normalize_search_query(query: str) -> str:
+    """Normalize a search query so that equivalent queries share one cache entry."""
+    return " ".join(query.lower().split())
+
+class QuotaTracker:
+    """Tracks YouTube API quota units spent today, shared by all workers through MongoDB."""
+    
+    def __init__(self):
+        self.mongodb_client = get_mongodb_client()
+    
+    def remaining(self) -> int:
+        """Units left in today's budget."""
+        return settings.YOUTUBE_DAILY_QUOTA - self.mongodb_client.get_youtube_quota_used(self._today())
+    
+    def is_nearly_spent(self, cost: int) -> bool:
+        """True if spending `cost` units would eat into the reserved part of the budget."""
+        reserve = settings.YOUTUBE_DAILY_QUOTA * settings.YOUTUBE_QUOTA_RESERVE_RATIO
+        return self.remaining() - cost < reserve
+    
+    def reserve(self, units: int) -> bool:
+        """
+        Reserve `units` of today's budget before a call.
+        
+        The units are added first and taken back if they overshoot the budget, so concurrent callers
+        cannot all pass a check and then spend the same remaining units.
+        
+        Returns:
+            True if the units were reserved, False if the budget does not cover them
+        """
+        used = self.mongodb_client.increment_youtube_quota_used(self._today(), units)
+        if used > settings.YOUTUBE_DAILY_QUOTA:
+            self.refund(units)
+            return False
+        logger.debug(f"YouTube quota used today: {used}/{settings.YOUTUBE_DAILY_QUOTA}")
+        return True
+    
+    def refund(self, units: int) -> None:
+        """Give back reserved units that were not spent, e.g. for a call that never reached YouTube."""
+        self.mongodb_client.increment_youtube_quota_used(self._today(), -units)
+    
+    def _today(self) -> str:
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+class YouTubeSearchService:
+    """
+    Serves YouTube search and video lookups from a MongoDB cache before calling the API.
+    
+    Entries younger than `YOUTUBE_CACHE_TTL_SECONDS` are served as hits. Older entries are only
+    refreshed while the daily quota allows it; once the budget is nearly spent, stale entries are
+    served instead of calling the API.
+    """
+    
+    def __init__(self):
+        self.mongodb_client = get_mongodb_client()
+        self.quota = QuotaTracker()
+    
+    def search_videos(self, query: str, max_results: int = 3) -> List[Dict[str, Any]]:
+        """
+        Search YouTube for videos related to the given query
+        
+        Args:
+            query: The search term
+            max_results: Maximum number of results to return
+        
+        Returns:
+            List of video information dictionaries
+        """
+        token = get_cancel_token()
+        if token is not None:
+            token.raise_if_cancelled()
+        
+        key = f"search:{max_results}:{normalize_search_query(query)}"
+        entry = self.mongodb_client.get_youtube_cache_entries([key]).get(key)
+        if entry is not None and self._is_fresh(entry):
+            metrics.increment("youtube_cache_requests_total", kind="search", result="hit")
+            return entry["data"]
+        
+        cost = YOUTUBE_QUOTA_COSTS["search.list"]
+        if entry is not None and self.quota.is_nearly_spent(cost):
+            metrics.increment("youtube_cache_requests_total", kind="search", result="stale")
+            logger.info(f"YouTube quota nearly spent, serving stale results for '{query}'")
+            return entry["data"]
+        
+        if not self.quota.reserve(cost):
+            metrics.increment("youtube_cache_requests_total", kind="search", result="quota_exhausted")
+            logger.warning(f"YouTube quota exhausted, no results for '{query}'")
+            return []
+        
+        metrics.increment("youtube_cache_requests_total", kind="search", result="miss")
+        request = get_youtube_client().search().list(
+            q=query,
+            part="snippet",
+            type="video",
+            maxResults=max_results
+        )
+        
+        try:
+            response = self._execute(request, "search.list")
+        except HttpError as e:
+            # Fall back to stale results if the API refuses the call (e.g. quotaExceeded)
+            if entry is not None:
+                logger.warning(f"YouTube search failed, serving stale results for '{query}': {str(e)}")
+                return entry["data"]
+            raise
+        
+        results = []
+        for item in response.get("items", []):
+            video_id = item["id"]["videoId"]
+            title = item["snippet"]["title"]
+            description = item["snippet"]["description"]
+            
+            results.append({
+                "url": f"https://youtu.be/{video_id}",
+                "title": title,
+                "description": description
+            })
+        
+        self.mongodb_client.upsert_youtube_cache_entry(key, "search", results)
+        return results
+    
+    def get_video_snippets(self, video_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Get the title and description of videos, coalescing uncached IDs into batched API calls.
+        
+        Args:
+            video_ids: YouTube video IDs
+        
+        Returns:
+            Dictionary mapping video IDs to their title and description (unknown videos are omitted)
+        """
+        keys = {video_id: f"video:{video_id}" for video_id in dict.fromkeys(video_ids)}
+        entries = self.mongodb_client.get_youtube_cache_entries(list(keys.values()))
+        
+        snippets = {}
+        to_fetch = []
+        for video_id, key in keys.items():
+            entry = entries.get(key)
+            if entry is not None and self._is_fresh(entry):
+                metrics.increment("youtube_cache_requests_total", kind="video", result="hit")
+                snippets[video_id] = entry["data"]
+            else:
+                to_fetch.append(video_id)
+        
+        for start in range(0, len(to_fetch), MAX_VIDEO_IDS_PER_CALL):
+            batch = to_fetch[start:start + MAX_VIDEO_IDS_PER_CALL]
+            cost = YOUTUBE_QUOTA_COSTS["videos.list"]
+            
+            stale = {video_id: entries[keys[video_id]] for video_id in batch if keys[video_id] in entries}
+            serve_stale = len(stale) == len(batch) and self.quota.is_nearly_spent(cost)
+            if serve_stale or not self.quota.reserve(cost):
+                metrics.increment("youtube_cache_requests_total", len(batch), kind="video", result="stale")
+                snippets.update({video_id: entry["data"] for video_id, entry in stale.items()})
+                continue
+            
+            request = get_youtube_client().videos().list(
+                part="snippet",
+                id=",".join(batch)
+            )
+            try:
+                response = self._execute(request, "videos.list")
+            except HttpError as e:
+                # Fall back to stale snippets if the API refuses the call (e.g. quotaExceeded)
+                logger.warning(f"YouTube video lookup failed, serving {len(stale)} stale snippets: {str(e)}")
+                metrics.increment("youtube_cache_requests_total", len(stale), kind="video", result="stale")
+                snippets.update({video_id: entry["data"] for video_id, entry in stale.items()})
+                continue
+            
+            metrics.increment("youtube_cache_requests_total", len(batch), kind="video", result="miss")
+            
+            for item in response.get("items", []):
+                snippet = {
+                    "title": item["snippet"]["title"],
+                    "description": item["snippet"]["description"],
+                }
+                snippets[item["id"]] = snippet
+                self.mongodb_client.upsert_youtube_cache_entry(keys[item["id"]], "video", snippet)
+        
+        return snippets
+    
+    def _execute(self, request, method: str) -> dict:
+        """Execute a request whose quota units are already reserved."""
+        start_time = time.perf_counter()
+        try:
+            response = request.execute(http=get_youtube_http())
+        except HttpError:
+            # YouTube charges quota for calls it answered, even with an error
+            usage_recorder.record_youtube(method, time.perf_counter() - start_time)
+            raise
+        except Exception:
+            # The call never reached YouTube, e.g. a DNS, connection or socket timeout error
+            self.quota.refund(YOUTUBE_QUOTA_COSTS[method])
+            raise
+        usage_recorder.record_youtube(method, time.perf_counter() - start_time)
+        return response
+    
+    def _is_fresh(self, entry: dict) -> bool:
+        fetched_at = entry["fetched_at"]
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - fetched_at < timedelta(seconds=settings.YOUTUBE_CACHE_TTL_SECONDS)
+
+@lru_cache
+def get_youtube_search_service() -> YouTubeSearchService:
+    """Get a singleton instance of the YouTube search service."""
+    return YouTubeSearchService()
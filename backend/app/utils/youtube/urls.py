@@ -0,0 +1,28 @@
+# Path: app/utils/youtube/urls.py
+# Description: Parsing of YouTube video URLs.
+
+import re
+from typing import Optional
+
+YOUTUBE_URL_PATTERNS = [
+    re.compile(r'(?:https?:\/\/)?(?:www\.|m\.)?youtube\.com\/watch\?(?:[^#\s]*&)?v=([^&#\s]+)'),
+    re.compile(r'(?:https?:\/\/)?(?:www\.)?youtu\.be\/([^\?#\s]+)'),
+    re.compile(r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/embed\/([^\?#\s]+)'),
+    re.compile(r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/shorts\/([^\?#\s]+)'),
+]
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Extract the video ID from a YouTube URL.
+    
+    Args:
+        url: A YouTube watch, short, embed or youtu.be URL
+    
+    Returns:
+        The video ID, or None if the URL is not a YouTube video URL
+    """
+    for pattern in YOUTUBE_URL_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
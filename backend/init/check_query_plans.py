@@ -0,0 +1,198 @@
+import sys, uuid
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional
+from pymongo import MongoClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Select
+from app.config import get_settings
+from app.utils.postgres import Subject, Exam, Reference, Chunks
+from app.utils.postgres.base import engine
+
+settings = get_settings()
+
+def _postgres_plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _postgres_plan_nodes(child)
+
+def check_postgres_plan(name: str, statement: Select, table: str, index: str) -> Optional[str]:
+    """
+    Check that the planner can serve a query from an index rather than scanning a whole table.
+    
+    Sequential scans are disabled while explaining, as on small tables the planner prefers them
+    even when an index applies; a sequential scan left in the plan means no index can serve it.
+    
+    Args:
+        name: Name of the query shape, for the report
+        statement: The query, shaped as the endpoints build it
+        table: The table that must not be scanned
+        index: The index expected to serve the query
+    
+    Returns:
+        The failure, or None if the plan uses the index
+    """
+    # Expand IN lists into one parameter each, as the driver cannot bind the placeholder of a list
+    compiled = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True})
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params)
+        plan = result.scalar()[0]["Plan"]
+        connection.rollback()
+    
+    nodes = [node for node in _postgres_plan_nodes(plan) if node.get("Relation Name") == table]
+    if any(node["Node Type"] == "Seq Scan" for node in nodes):
+        return f"{name}: sequential scan on {table}"
+    if not any(node.get("Index Name") == index for node in _postgres_plan_nodes(plan)):
+        return f"{name}: {index} is not used"
+    return None
+
+def _mongo_plan_stages(stage: dict) -> Iterator[dict]:
+    yield stage
+    if "inputStage" in stage:
+        yield from _mongo_plan_stages(stage["inputStage"])
+    for child in stage.get("inputStages", []):
+        yield from _mongo_plan_stages(child)
+
+def check_mongo_plan(name: str, collection, query: dict, key: List[str]) -> Optional[str]:
+    """
+    Check that MongoDB serves a query from an index rather than scanning a whole collection.
+    
+    Args:
+        name: Name of the query shape, for the report
+        collection: The collection
+        query: The query filter, as built by the MongoDB client
+        key: Fields of the index expected to serve the query
+    
+    Returns:
+        The failure, or None if the winning plan scans the index
+    """
+    winning_plan = collection.find(query).explain()["queryPlanner"]["winningPlan"]
+    # Plans of the slot-based engine wrap the query plan
+    stages = list(_mongo_plan_stages(winning_plan.get("queryPlan", winning_plan)))
+    
+    if any(stage["stage"] == "COLLSCAN" for stage in stages):
+        return f"{name}: collection scan on {collection.name}"
+    if not any(list(stage.get("keyPattern", {})) == key for stage in stages if stage["stage"] == "IXSCAN"):
+        return f"{name}: no index on {', '.join(key)} is used"
+    return None
+
+def run_check(check: Callable[..., Optional[str]], name: str, *args) -> Optional[str]:
+    """
+    Run one plan check, reporting an error as its failure so that the other checks still run.
+    
+    Args:
+        check: The check function
+        name: Name of the query shape, for the report
+        args: Further arguments of the check
+    
+    Returns:
+        The failure, or None if the check passed
+    """
+    try:
+        return check(name, *args)
+    except Exception as e:
+        return f"{name}: check failed with {type(e).__name__}: {e}"
+
+def check_query_plans() -> List[str]:
+    """
+    Check the plans of the hot lookup paths against their indexes, to catch a dropped index or a
+    query that stopped matching one.
+    
+    Returns:
+        The failures, empty if every query uses its index
+    """
+    exam_id, reference_id, chunk_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    failures = []
+    
+    failures.append(run_check(
+        check_postgres_plan,
+        "subjects by name",
+        select(Subject).order_by(Subject.name).limit(settings.LIST_PAGE_DEFAULT_LIMIT + 1),
+        "subjects",
+        "unique_subject_name",
+    ))
+    failures.append(run_check(
+        check_postgres_plan,
+        "upcoming exams",
+        select(Exam)
+        .where(Exam.exam_datetime >= now)
+        .order_by(Exam.exam_datetime, Exam.id)
+        .limit(settings.LIST_PAGE_DEFAULT_LIMIT + 1),
+        "exams",
+        "ix_exams_exam_datetime_id",
+    ))
+    failures.append(run_check(
+        check_postgres_plan,
+        "previous exams",
+        select(Exam)
+        .where(Exam.exam_datetime < now)
+        .order_by(Exam.exam_datetime.desc(), Exam.id.desc())
+        .limit(settings.LIST_PAGE_DEFAULT_LIMIT + 1),
+        "exams",
+        "ix_exams_exam_datetime_id",
+    ))
+    failures.append(run_check(
+        check_postgres_plan,
+        "references by exam",
+        select(Reference)
+        .where(Reference.exam_id == exam_id)
+        .order_by(Reference.file_name, Reference.id)
+        .limit(settings.LIST_PAGE_DEFAULT_LIMIT + 1),
+        "references",
+        "ix_references_exam_id_file_name_id",
+    ))
+    failures.append(run_check(
+        check_postgres_plan,
+        "chunks by references",
+        select(Chunks)
+        .where(Chunks.reference_id.in_([reference_id, uuid.uuid4()]))
+        .order_by(Chunks.reference_id, Chunks.chunk_number),
+        "chunks",
+        "unique_chunk_number_per_reference",
+    ))
+    
+    client = MongoClient(settings.get_mongo_uri(), serverSelectionTimeoutMS=5000)
+    try:
+        mongo_db = client[settings.MONGO_DB]
+        failures.append(run_check(
+            check_mongo_plan,
+            "chunks by id",
+            mongo_db[settings.MONGO_COLLECTION_REFERENCES_CHUNKS],
+            {"chunk_id": {"$in": [str(chunk_id), str(uuid.uuid4())]}},
+            ["chunk_id"],
+        ))
+        failures.append(run_check(
+            check_mongo_plan,
+            "mindmap by exam",
+            mongo_db[settings.MONGO_COLLECTION_MINDMAPS],
+            {"exam_id": str(exam_id)},
+            ["exam_id"],
+        ))
+        failures.append(run_check(
+            check_mongo_plan,
+            "mindmap nodes by path",
+            mongo_db[settings.MONGO_COLLECTION_MINDMAP_NODES],
+            {"exam_id": str(exam_id), "version": "0", "path": {"$in": ["0", "0.1"]}},
+            ["exam_id", "version", "path"],
+        ))
+        failures.append(run_check(
+            check_mongo_plan,
+            "context cache by exam",
+            mongo_db[settings.MONGO_COLLECTION_CONTEXT_CACHE],
+            {"exam_id": str(exam_id)},
+            ["exam_id"],
+        ))
+    finally:
+        client.close()
+    
+    return [failure for failure in failures if failure]
+
+if __name__ == "__main__":
+    failures = check_query_plans()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("All query plans use their indexes")
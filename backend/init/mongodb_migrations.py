@@ -27,5 +27,74 @@ def create_collection_if_not_exists() -> None:
         # Insert initial empty document to ensure database creation
         collection.insert_one({"_id": "schema_version", "version": 1})
 
+    # Create the collections of caches, jobs and mindmaps if they don't exist, their indexes are
+    # ensured below
+    for collection_name in (
+        settings.MONGO_COLLECTION_CONTEXT_CACHE,
+        settings.MONGO_COLLECTION_YOUTUBE_CACHE,
+        settings.MONGO_COLLECTION_YOUTUBE_QUOTA,
+        settings.MONGO_COLLECTION_MINDMAP_JOBS,
+        settings.MONGO_COLLECTION_MINDMAP_NOTES,
+        settings.MONGO_COLLECTION_MINDMAP_NODES,
+        settings.MONGO_COLLECTION_LLM_CACHE,
+        settings.MONGO_COLLECTION_MINDMAPS,
+    ):
+        if collection_name not in db.list_collection_names():
+            db.create_collection(collection_name)
+
+    # Ensure the indexes, also on collections created implicitly by a write before this migration
+    # ran or created before the indexes were added (creating an index that already exists is a no-op)
+
+    # Cached chat contexts are invalidated by exam
+    db[settings.MONGO_COLLECTION_CONTEXT_CACHE].create_index([("exam_id", ASCENDING)])
+
+    # Stale YouTube entries are kept for serving while the quota is nearly spent
+    db[settings.MONGO_COLLECTION_YOUTUBE_CACHE].create_index(
+        [("fetched_at", ASCENDING)],
+        expireAfterSeconds=settings.YOUTUBE_CACHE_MAX_STALE_SECONDS
+    )
+
+    # At most one active mindmap job per exam, concurrent submissions rely on it to collapse
+    db[settings.MONGO_COLLECTION_MINDMAP_JOBS].create_index(
+        [("exam_id", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"active": True}
+    )
+    db[settings.MONGO_COLLECTION_MINDMAP_JOBS].create_index(
+        [("finished_at", ASCENDING)],
+        expireAfterSeconds=settings.MINDMAP_JOB_RETENTION_SECONDS
+    )
+
+    # Leaf notes are deleted by exam
+    db[settings.MONGO_COLLECTION_MINDMAP_NOTES].create_index([("exam_id", ASCENDING)])
+
+    # Mindmap nodes, for subtrees by path prefix and for the top levels by depth
+    db[settings.MONGO_COLLECTION_MINDMAP_NODES].create_index(
+        [("exam_id", ASCENDING), ("version", ASCENDING), ("path", ASCENDING)],
+        unique=True
+    )
+    db[settings.MONGO_COLLECTION_MINDMAP_NODES].create_index(
+        [("exam_id", ASCENDING), ("version", ASCENDING), ("depth", ASCENDING)]
+    )
+
+    # LLM responses expire, the index also finds the oldest ones when over the size cap
+    db[settings.MONGO_COLLECTION_LLM_CACHE].create_index(
+        [("created_at", ASCENDING)],
+        expireAfterSeconds=settings.MINDMAP_LLM_CACHE_TTL_SECONDS
+    )
+
+    # Chunks are fetched by chunk_id, sparse as the schema version document has none
+    db[settings.MONGO_COLLECTION_REFERENCES_CHUNKS].create_index(
+        [("chunk_id", ASCENDING)],
+        unique=True,
+        sparse=True
+    )
+
+    # Mindmaps are fetched and upserted by exam_id, one per exam
+    db[settings.MONGO_COLLECTION_MINDMAPS].create_index(
+        [("exam_id", ASCENDING)],
+        unique=True
+    )
+
 if __name__ == "__main__":
     create_collection_if_not_exists()
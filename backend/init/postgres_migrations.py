@@ -0,0 +1,12 @@
+from sqlalchemy_utils import create_database, database_exists
+from app.config import get_settings
+
+settings = get_settings()
+
+def create_database_if_not_exists() -> None:
+    """Create the PostgreSQL database if it doesn't exist; tables are created by Alembic."""
+    if not database_exists(settings.get_postgres_uri()):
+        create_database(settings.get_postgres_uri())
+
+if __name__ == "__main__":
+    create_database_if_not_exists()
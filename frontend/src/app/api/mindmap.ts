@@ -13,20 +13,57 @@ export interface MindmapNode {
   is_last_subtopic: boolean;
   subtopics?: MindmapNode[];
   resources?: MindmapResource[];
+  path?: string; // Only set on nodes fetched with getMindmapNodes
+  child_count?: number;
 }
 
 export interface MindmapResponse {
   mindmap: MindmapNode;
 }
 
+export interface MindmapJob {
+  job_id: string;
+  exam_id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  stage: string;
+  completed?: number | null;
+  total?: number | null;
+  error?: string | null;
+}
+
+// How often to poll a running mindmap generation job
+const JOB_POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
 /**
- * Get mindmap for an exam
+ * Get the progress of a mindmap generation job
+ * @param examId The ID of the exam
+ * @param jobId The ID of the job
+ */
+export const getMindmapJob = async (
+  examId: string,
+  jobId: string
+): Promise<MindmapJob> => {
+  const response = await fetch(`/api/proxy/exams/${examId}/mindmap/jobs/${jobId}`);
+  
+  if (!response.ok) {
+    throw new Error(`Error: ${response.status}`);
+  }
+  
+  return await response.json() as MindmapJob;
+};
+
+/**
+ * Get mindmap for an exam, waiting for it to be generated if needed
  * @param examId The ID of the exam
  * @param refresh Whether to force regeneration of the mindmap (default: false)
+ * @param onProgress Called with the generation job while it is running
  */
 export const getMindmap = async (
   examId: string,
-  refresh: boolean = false
+  refresh: boolean = false,
+  onProgress?: (job: MindmapJob) => void
 ): Promise<MindmapResponse> => {
   try {
     const url = new URL(`/api/proxy/exams/${examId}/mindmap`, window.location.origin);
@@ -47,6 +84,22 @@ export const getMindmap = async (
     const data = await response.json();
     console.log('Mindmap data:', data);
     
+    // The mindmap is being generated in the background, poll the job until it finishes
+    if (response.status === 202) {
+      let job = data as MindmapJob;
+      while (job.status === 'queued' || job.status === 'running') {
+        onProgress?.(job);
+        await sleep(JOB_POLL_INTERVAL_MS);
+        job = await getMindmapJob(examId, job.job_id);
+      }
+      
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Mindmap generation failed');
+      }
+      
+      return getMindmap(examId, false, onProgress);
+    }
+    
     // Ensure the response always has a top-level mindmap field
     if (!('mindmap' in data)) {
       return { mindmap: data } as MindmapResponse;
@@ -56,4 +109,129 @@ export const getMindmap = async (
     console.error('Failed to fetch mindmap:', error);
     throw error;
   }
-};
\ No newline at end of file
+};
+export type MindmapStreamEvent =
+  | ({ event: 'job' } & MindmapJob)
+  | { event: 'stage'; stage: string; completed?: number | null; total?: number | null }
+  | { event: 'outline'; index: number; subtopic: MindmapNode }
+  | { event: 'skeleton'; mindmap: MindmapNode }
+  | { event: 'leaf'; node_path: string; videos: MindmapResource['data'][] }
+  | { event: 'subtree'; index: number; subtree: MindmapNode }
+  | { event: 'done'; mindmap: MindmapNode }
+  | { event: 'error'; detail: string }
+  | { event: 'keepalive' };
+
+/**
+ * Generate the mindmap of an exam, receiving it piece by piece as it is built
+ * @param examId The ID of the exam
+ * @param onEvent Called with every event of the generation, in order
+ * @param rebuild Whether to regenerate the mindmap from scratch (default: false)
+ */
+export const streamMindmap = async (
+  examId: string,
+  onEvent: (event: MindmapStreamEvent) => void,
+  rebuild: boolean = false
+): Promise<MindmapResponse> => {
+  const url = new URL(`/api/proxy/exams/${examId}/mindmap/stream`, window.location.origin);
+  if (rebuild) {
+    url.searchParams.append('rebuild', 'true');
+  }
+  
+  const response = await fetch(url.toString());
+  
+  if (!response.ok) {
+    throw new Error(`Error: ${response.status}`);
+  }
+  
+  // Another request is already generating this mindmap, wait for it instead
+  if (response.status === 202) {
+    const job = await response.json() as MindmapJob;
+    onEvent({ event: 'job', ...job });
+    return getMindmap(examId, false, (job) => onEvent({ event: 'job', ...job }));
+  }
+  
+  const reader = response.body?.getReader();
+  if (!reader) throw new Error('Failed to get stream reader');
+  
+  const decoder = new TextDecoder();
+  let buffer = '';
+  
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    
+    // Each event is one line of JSON
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() || ''; // Keep incomplete line in buffer
+    
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      
+      const event = JSON.parse(line) as MindmapStreamEvent;
+      onEvent(event);
+      
+      if (event.event === 'done') {
+        return { mindmap: event.mindmap };
+      }
+      if (event.event === 'error') {
+        throw new Error(event.detail);
+      }
+    }
+  }
+  
+  throw new Error('Mindmap stream ended unexpectedly');
+};
+
+/**
+ * Get the top levels of a mindmap, or of the subtree under one of its nodes
+ * @param examId The ID of the exam
+ * @param path Dot-separated subtopic indices of the subtree's root, e.g. "0.2" (default: the whole mindmap)
+ * @param depth Number of levels to fetch below the subtree's root (default: decided by the backend)
+ */
+export const getMindmapNodes = async (
+  examId: string,
+  path: string = '',
+  depth?: number
+): Promise<MindmapNode> => {
+  const url = new URL(`/api/proxy/exams/${examId}/mindmap/nodes`, window.location.origin);
+  if (path) {
+    url.searchParams.append('path', path);
+  }
+  if (depth !== undefined) {
+    url.searchParams.append('depth', depth.toString());
+  }
+  
+  const response = await fetch(url.toString());
+  
+  if (!response.ok) {
+    throw new Error(`Error: ${response.status}`);
+  }
+  
+  return await response.json() as MindmapNode;
+};
+
+export interface MindmapNodeNotes {
+  node_path: string;
+  title: string;
+  notes: string;
+  cached: boolean;
+}
+
+/**
+ * Get the notes of a mindmap leaf, generated on first request
+ * @param examId The ID of the exam
+ * @param nodePath Dot-separated subtopic indices from the root down to the leaf, e.g. "0.2.1"
+ */
+export const getMindmapNodeNotes = async (
+  examId: string,
+  nodePath: string
+): Promise<MindmapNodeNotes> => {
+  const response = await fetch(`/api/proxy/exams/${examId}/mindmap/nodes/${nodePath}/notes`);
+  
+  if (!response.ok) {
+    throw new Error(`Error: ${response.status}`);
+  }
+  
+  return await response.json() as MindmapNodeNotes;
+};
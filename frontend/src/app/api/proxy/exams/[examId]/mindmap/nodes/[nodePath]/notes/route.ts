@@ -0,0 +1,28 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+const API_URL =  'https://you-education.devasheeshmishra.com';
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: { examId: string; nodePath: string } }
+) {
+  try {
+    const { examId, nodePath } = params;
+    
+    const response = await fetch(`${API_URL}/api/v1/exams/${examId}/mindmap/nodes/${nodePath}/notes`, {
+      headers: {
+        'Accept': 'application/json',
+      },
+    });
+
+    const data = await response.json();
+    
+    return NextResponse.json(data, { status: response.status });
+  } catch (error) {
+    console.error('Proxy error:', error);
+    return NextResponse.json(
+      { error: 'Failed to fetch mindmap notes' },
+      { status: 500 }
+    );
+  }
+}
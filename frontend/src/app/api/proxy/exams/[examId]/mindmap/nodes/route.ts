@@ -0,0 +1,37 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+const API_URL =  'https://you-education.devasheeshmishra.com';
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: { examId: string } }
+) {
+  try {
+    const examId = params.examId;
+    
+    // Forward the path and depth parameters if they exist
+    const apiUrl = new URL(`${API_URL}/api/v1/exams/${examId}/mindmap/nodes`);
+    for (const name of ['path', 'depth']) {
+      const value = request.nextUrl.searchParams.get(name);
+      if (value) {
+        apiUrl.searchParams.append(name, value);
+      }
+    }
+    
+    const response = await fetch(apiUrl.toString(), {
+      headers: {
+        'Accept': 'application/json',
+      },
+    });
+
+    const data = await response.json();
+    
+    return NextResponse.json(data, { status: response.status });
+  } catch (error) {
+    console.error('Proxy error:', error);
+    return NextResponse.json(
+      { error: 'Failed to fetch mindmap nodes' },
+      { status: 500 }
+    );
+  }
+}
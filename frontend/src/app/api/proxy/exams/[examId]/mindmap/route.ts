@@ -19,11 +19,29 @@ export async function GET(
       apiUrl.searchParams.append('refresh', 'true');
     }
     
-    const response = await fetch(apiUrl.toString(), {
-      headers: {
-        'Accept': 'application/json',
-      },
-    });
+    // Let the backend answer 304 when the browser's copy is current
+    const headers: Record<string, string> = {
+      'Accept': 'application/json',
+    };
+    const ifNoneMatch = request.headers.get('if-none-match');
+    if (ifNoneMatch) {
+      headers['If-None-Match'] = ifNoneMatch;
+    }
+    
+    const response = await fetch(apiUrl.toString(), { headers, cache: 'no-store' });
+
+    // Forward the validators and staleness of the stored mindmap
+    const responseHeaders = new Headers();
+    for (const name of ['etag', 'cache-control', 'x-mindmap-stale', 'x-mindmap-job-id']) {
+      const value = response.headers.get(name);
+      if (value) {
+        responseHeaders.set(name, value);
+      }
+    }
+
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: responseHeaders });
+    }
 
     // If the mindmap is not found or no references available
     if (response.status === 404) {
@@ -35,7 +53,7 @@ export async function GET(
 
     const data = await response.json();
     
-    return NextResponse.json(data, { status: response.status });
+    return NextResponse.json(data, { status: response.status, headers: responseHeaders });
   } catch (error) {
     console.error('Proxy error:', error);
     return NextResponse.json(
@@ -0,0 +1,46 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+const API_URL = 'https://you-education.devasheeshmishra.com';
+
+export async function GET(
+  request: NextRequest,
+  { params }: { params: { examId: string } }
+) {
+  try {
+    const examId = params.examId;
+    
+    // Forward the rebuild parameter if it exists
+    const apiUrl = new URL(`${API_URL}/api/v1/exams/${examId}/mindmap/stream`);
+    if (request.nextUrl.searchParams.get('rebuild') === 'true') {
+      apiUrl.searchParams.append('rebuild', 'true');
+    }
+    
+    const response = await fetch(apiUrl.toString(), {
+      headers: {
+        'Accept': 'application/x-ndjson',
+      },
+    });
+
+    // Forward the event stream as-is
+    if (response.headers.get('content-type')?.includes('application/x-ndjson')) {
+      return new NextResponse(response.body, {
+        headers: {
+          'Content-Type': 'application/x-ndjson',
+          'Cache-Control': 'no-cache',
+          'Connection': 'keep-alive',
+        },
+      });
+    }
+
+    // For non-streaming responses (a job already running, or errors)
+    const data = await response.json().catch(() => ({}));
+    
+    return NextResponse.json(data, { status: response.status });
+  } catch (error) {
+    console.error('Proxy error:', error);
+    return NextResponse.json(
+      { error: 'Failed to stream mindmap' },
+      { status: 500 }
+    );
+  }
+}
@@ -9,7 +9,7 @@ export async function GET(
   try {
     const examId = params.examId;
     
-    const response = await fetch(`${API_URL}/api/v1/exams/${examId}/references`, {
+    const response = await fetch(`${API_URL}/api/v1/exams/${examId}/references${request.nextUrl.search}`, {
       headers: {
         'Accept': 'application/json',
       },
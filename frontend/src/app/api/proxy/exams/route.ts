@@ -2,9 +2,9 @@ import { NextRequest, NextResponse } from 'next/server';
 
 const API_URL = 'https://you-education.devasheeshmishra.com/api';
 
-export async function GET() {
+export async function GET(request: NextRequest) {
   try {
-    const response = await fetch(`${API_URL}/v1/exams`, {
+    const response = await fetch(`${API_URL}/v1/exams${request.nextUrl.search}`, {
       headers: {
         'Accept': 'application/json',
       },
@@ -4,7 +4,7 @@ const API_URL = 'https://you-education.devasheeshmishra.com';
 
 export async function GET(request: NextRequest) {
   try {
-    const response = await fetch(`${API_URL}/api/v1/subjects`, {
+    const response = await fetch(`${API_URL}/api/v1/subjects${request.nextUrl.search}`, {
       headers: {
         'Accept': 'application/json',
       },
@@ -8,6 +8,7 @@ export interface Reference {
 
 export interface ReferencesResponse {
   references: Reference[];
+  next_cursor?: string | null;
 }
 
 export interface ReferenceCreateRequest {
@@ -57,17 +58,26 @@ export const createReferenceFromUrl = async (
 };
 
 /**
- * Get all references for an exam
+ * Get all references for an exam, following the pages of the list
  */
 export const getExamReferences = async (examId: string): Promise<ReferencesResponse> => {
   try {
-    const response = await fetch(`/api/proxy/exams/${examId}/references`);
+    const references: Reference[] = [];
+    let cursor: string | null | undefined = null;
+    do {
+      const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`/api/proxy/exams/${examId}/references${query}`);
+      
+      if (!response.ok) {
+        throw new Error(`Error: ${response.status}`);
+      }
+      
+      const page: ReferencesResponse = await response.json();
+      references.push(...page.references);
+      cursor = page.next_cursor;
+    } while (cursor);
     
-    if (!response.ok) {
-      throw new Error(`Error: ${response.status}`);
-    }
-    
-    return await response.json();
+    return { references };
   } catch (error) {
     console.error('Failed to fetch references:', error);
     throw error;
@@ -7,6 +7,7 @@ export interface Subject {
 
 export interface SubjectsResponse {
   subjects: Subject[];
+  next_cursor?: string | null;
 }
 
 export interface CreateSubjectRequest {
@@ -20,15 +21,23 @@ export interface UpdateSubjectRequest {
 }
 
 /**
- * Fetch all available subjects
+ * Fetch all available subjects, following the pages of the list
  */
 export const getAllSubjects = async (): Promise<SubjectsResponse> => {
   try {
-    const response = await fetch('/api/proxy/subjects');
-    if (!response.ok) {
-      throw new Error(`Error: ${response.status}`);
-    }
-    return await response.json();
+    const subjects: Subject[] = [];
+    let cursor: string | null | undefined = null;
+    do {
+      const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`/api/proxy/subjects${query}`);
+      if (!response.ok) {
+        throw new Error(`Error: ${response.status}`);
+      }
+      const page: SubjectsResponse = await response.json();
+      subjects.push(...page.subjects);
+      cursor = page.next_cursor;
+    } while (cursor);
+    return { subjects };
   } catch (error) {
     console.error('Failed to fetch subjects:', error);
     throw error;
@@ -6,6 +6,7 @@ import MindmapPage from '@/components/mindmap';
 import Chat from '@/components/chat';
 import References from '@/components/resources';
 import Notes from '@/components/notes';
+import LeafNotes from '@/components/leaf_notes';
 import { motion } from 'framer-motion';
 import Link from 'next/link';
 import VideoDescription from '@/components/video_description';
@@ -224,6 +225,13 @@ const ExamPage = () => {
                   markdownContent={selectedNode.resource.data.content || ''}
                   className="h-full"
                 />
+              ) : selectedNode?.type === 'notes' ? (
+                <LeafNotes
+                  examId={examId}
+                  nodePath={selectedNode.nodePath}
+                  title={selectedNode.title}
+                  className="h-full"
+                />
               ) : (
                 <div className="flex items-center justify-center h-full text-center">
                   <p className="text-zinc-400">Select a leaf node to see details</p>
@@ -237,6 +245,18 @@ const ExamPage = () => {
                 <VideoDescription url={selectedNode.resource.data.url} />
               </div>
             )}
+
+            {/* Notes of the leaf below its video, generated on first open */}
+            {selectedNode?.type === 'youtube' && selectedNode.nodePath !== undefined && (
+              <div className="mt-2 w-full h-[400px]">
+                <LeafNotes
+                  examId={examId}
+                  nodePath={selectedNode.nodePath}
+                  title={selectedNode.title}
+                  className="h-full"
+                />
+              </div>
+            )}
           </motion.div>
         )}
 
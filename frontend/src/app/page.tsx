@@ -23,6 +23,45 @@ interface Exam {
 interface ExamsResponse {
   upcoming_exams: Exam[];
   previous_exams: Exam[];
+  upcoming_next_cursor?: string | null;
+  previous_next_cursor?: string | null;
+}
+
+type ExamBucket = 'upcoming' | 'previous';
+
+// Fetch the remaining pages of one bucket of the exams list
+async function fetchExamBucket(bucket: ExamBucket, cursor: string | null | undefined): Promise<Exam[]> {
+  const exams: Exam[] = [];
+  while (cursor) {
+    const response = await fetch(`/api/proxy/exams?bucket=${bucket}&cursor=${encodeURIComponent(cursor)}`);
+    if (!response.ok) {
+      throw new Error('Failed to fetch exams');
+    }
+    
+    const data: ExamsResponse = await response.json();
+    const page = bucket === 'upcoming' ? data.upcoming_exams : data.previous_exams;
+    exams.push(...(page || []));
+    cursor = bucket === 'upcoming' ? data.upcoming_next_cursor : data.previous_next_cursor;
+  }
+  return exams;
+}
+
+// Fetch every upcoming and previous exam; the first page carries both buckets
+async function fetchAllExams(): Promise<{ upcoming: Exam[]; previous: Exam[] }> {
+  const response = await fetch('/api/proxy/exams');
+  if (!response.ok) {
+    throw new Error('Failed to fetch exams');
+  }
+  
+  const data: ExamsResponse = await response.json();
+  const [upcoming, previous] = await Promise.all([
+    fetchExamBucket('upcoming', data.upcoming_next_cursor),
+    fetchExamBucket('previous', data.previous_next_cursor),
+  ]);
+  return {
+    upcoming: [...(data.upcoming_exams || []), ...upcoming],
+    previous: [...(data.previous_exams || []), ...previous],
+  };
 }
 
 export default function Home() {
@@ -47,15 +86,9 @@ function LandingPage() {
     const fetchExams = async () => {
       try {
         setLoading(true);
-        const response = await fetch('/api/proxy/exams');
-        
-        if (!response.ok) {
-          throw new Error('Failed to fetch exams');
-        }
-        
-        const data: ExamsResponse = await response.json();
-        setUpcomingExams(data.upcoming_exams || []);
-        setPastExams(data.previous_exams || []);
+        const exams = await fetchAllExams();
+        setUpcomingExams(exams.upcoming);
+        setPastExams(exams.previous);
       } catch (err) {
         console.error('Error fetching exams:', err);
         setError('Failed to load exams. Please try again later.');
@@ -100,14 +133,9 @@ function LandingPage() {
       }, 3000);
       
       // Then refresh the exams list
-      const examsResponse = await fetch('/api/proxy/exams');
-      if (!examsResponse.ok) {
-        throw new Error('Failed to refresh exams');
-      }
-      
-      const data: ExamsResponse = await examsResponse.json();
-      setUpcomingExams(data.upcoming_exams || []);
-      setPastExams(data.previous_exams || []);
+      const exams = await fetchAllExams();
+      setUpcomingExams(exams.upcoming);
+      setPastExams(exams.previous);
     } catch (err) {
       console.error('Error creating exam:', err);
       setError('Failed to create exam. Please try again.');
@@ -0,0 +1,60 @@
+'use client';
+import React, { useEffect, useState } from 'react';
+import Notes from '@/components/notes';
+import { getMindmapNodeNotes } from '@/app/api/mindmap';
+
+interface LeafNotesProps {
+  examId: string;
+  nodePath: string;
+  title: string;
+  className?: string;
+}
+
+// Notes of a mindmap leaf, written by the backend the first time they are opened
+const LeafNotes: React.FC<LeafNotesProps> = ({ examId, nodePath, title, className = '' }) => {
+  const [notes, setNotes] = useState<string | null>(null);
+  const [error, setError] = useState<string | null>(null);
+
+  useEffect(() => {
+    // Ignore the response if another leaf was selected in the meantime
+    let cancelled = false;
+    setNotes(null);
+    setError(null);
+
+    const fetchNotes = async () => {
+      try {
+        const response = await getMindmapNodeNotes(examId, nodePath);
+        if (!cancelled) setNotes(response.notes);
+      } catch (err) {
+        console.error('Error loading leaf notes:', err);
+        if (!cancelled) setError('Failed to load notes for this topic');
+      }
+    };
+
+    fetchNotes();
+    return () => {
+      cancelled = true;
+    };
+  }, [examId, nodePath]);
+
+  if (error) {
+    return (
+      <div className="text-red-400 bg-red-900/20 border border-red-700/30 rounded-md p-4">
+        <p>{error}</p>
+      </div>
+    );
+  }
+
+  if (notes === null) {
+    return (
+      <div className="flex flex-col justify-center items-center h-full">
+        <div className="animate-spin rounded-full h-10 w-10 border-t-2 border-b-2 border-indigo-500"></div>
+        <p className="mt-4 text-sm text-zinc-400">Writing notes for {title}...</p>
+      </div>
+    );
+  }
+
+  return <Notes title={title} markdownContent={notes} className={className} />;
+};
+
+export default LeafNotes;
@@ -16,26 +16,29 @@ type ApiNode = {
   resources?: ApiResource[];
 };
 
-// Map to store ApiNode resources by lowercased trimmed title
-const resourceMap = new Map<string, ApiNode>();
+// Leaf with its node path of subtopic indices, used to fetch its notes
+type LeafRecord = ApiNode & { nodePath: string };
+
+// Map to store leaves by lowercased trimmed title
+const resourceMap = new Map<string, LeafRecord>();
 
 // Convert API JSON to markdown and populate resourceMap
-function apiToMarkdown(node: ApiNode, level = 1): string {
-  if (node.is_last_subtopic && node.resources) {
+function apiToMarkdown(node: ApiNode, level = 1, nodePath = ''): string {
+  if (node.is_last_subtopic) {
     const key = node.title.trim().toLowerCase();
-    resourceMap.set(key, node);
+    resourceMap.set(key, { ...node, nodePath });
   }
   let md = `${'#'.repeat(level)} ${node.title}\n`;
   if (node.subtopics) {
-    node.subtopics.forEach(child => {
-      md += apiToMarkdown(child, level + 1);
+    node.subtopics.forEach((child, index) => {
+      md += apiToMarkdown(child, level + 1, nodePath ? `${nodePath}.${index}` : `${index}`);
     });
   }
   return md;
 }
 
 export default function MindmapPage({ onLeafClick }: { 
-  onLeafClick: (selection: { type?: string; title: string; resource: ApiResource }) => void
+  onLeafClick: (selection: { type?: string; title: string; resource?: ApiResource; nodePath: string }) => void
 }) {
   const params = useParams();
   const examId = params.id as string || "default";
@@ -154,10 +157,10 @@ export default function MindmapPage({ onLeafClick }: {
             nodeRecordFound: !!nodeRecord
           });
           
-          if (nodeRecord && nodeRecord.resources) {
+          if (nodeRecord) {
             console.log('Resources found:', {
               title: nodeRecord.title,
-              resourceCount: nodeRecord.resources.length,
+              resourceCount: nodeRecord.resources?.length || 0,
               resources: nodeRecord.resources
             });
             
@@ -167,10 +170,13 @@ export default function MindmapPage({ onLeafClick }: {
               svgRef.current.scrollIntoView({ behavior: 'smooth', block: 'center', inline: 'center' });
             }
             handleReset();
+            // Leaves without a video only have notes, fetched on demand
+            const resource = nodeRecord.resources?.[0];
             onLeafClick({
-              type: nodeRecord.resources[0].type,
+              type: resource?.type || 'notes',
               title: nodeRecord.title,
-              resource: nodeRecord.resources[0]
+              resource,
+              nodePath: nodeRecord.nodePath
             });
             handleReset();
           } else {